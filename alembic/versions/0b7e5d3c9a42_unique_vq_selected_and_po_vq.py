@@ -0,0 +1,32 @@
+"""unique purchase_order.vq_id, one SELECTED vendor_quotation per rfq
+
+Revision ID: 0b7e5d3c9a42
+Revises: f1a93c7e2b60
+Create Date: 2026-10-19 16:20:47.913205
+
+Dữ liệu cũ vi phạm luật (2 PO cùng VQ / 2 VQ SELECTED cùng RFQ) phải được
+xử lý tay trước khi upgrade.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0b7e5d3c9a42'
+down_revision: Union[str, None] = 'f1a93c7e2b60'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_unique_constraint('uq_purchase_order_vq_id', 'purchase_order', ['vq_id'])
+    op.create_index('ux_vendor_quotation_rfq_selected', 'vendor_quotation', ['rfq_id'], unique=True, postgresql_where=sa.text("status = 'SELECTED'"), sqlite_where=sa.text("status = 'SELECTED'"))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ux_vendor_quotation_rfq_selected', table_name='vendor_quotation', postgresql_where=sa.text("status = 'SELECTED'"), sqlite_where=sa.text("status = 'SELECTED'"))
+    op.drop_constraint('uq_purchase_order_vq_id', 'purchase_order', type_='unique')
@@ -0,0 +1,45 @@
+"""add paid_total, balance to vendor_invoice
+
+Revision ID: 27d18a7d0dfe
+Revises: 9d0282fbdec1
+Create Date: 2026-10-19 10:05:17.228410
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '27d18a7d0dfe'
+down_revision: Union[str, None] = '9d0282fbdec1'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('vendor_invoice', sa.Column('paid_total', sa.Numeric(precision=18, scale=2), server_default='0', nullable=False))
+    op.add_column('vendor_invoice', sa.Column('balance', sa.Numeric(precision=18, scale=2), server_default='0', nullable=False))
+
+    # backfill từ payment
+    op.execute("""
+        UPDATE vendor_invoice vi
+        SET paid_total = COALESCE(p.paid, 0),
+            balance = COALESCE(vi.total, 0) - COALESCE(p.paid, 0)
+        FROM (
+            SELECT v.id, SUM(pm.amount) AS paid
+            FROM vendor_invoice v LEFT JOIN payment pm ON pm.invoice_id = v.id
+            GROUP BY v.id
+        ) p
+        WHERE p.id = vi.id
+    """)
+    op.create_index(op.f('ix_vendor_invoice_balance'), 'vendor_invoice', ['balance'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_vendor_invoice_balance'), table_name='vendor_invoice')
+    op.drop_column('vendor_invoice', 'balance')
+    op.drop_column('vendor_invoice', 'paid_total')
@@ -0,0 +1,55 @@
+"""add invoice_match_line, vendor_invoice.match_status
+
+Revision ID: 2e417a15b752
+Revises: 27d18a7d0dfe
+Create Date: 2026-10-19 11:20:03.914562
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '2e417a15b752'
+down_revision: Union[str, None] = '27d18a7d0dfe'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('invoice_match_line',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('invoice_id', sa.Integer(), nullable=False),
+    sa.Column('po_id', sa.Integer(), nullable=True),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('invoiced_qty', sa.Numeric(precision=18, scale=3), nullable=True),
+    sa.Column('invoice_price', sa.Numeric(precision=18, scale=2), nullable=True),
+    sa.Column('ordered_qty', sa.Numeric(precision=18, scale=3), nullable=True),
+    sa.Column('po_price', sa.Numeric(precision=18, scale=2), nullable=True),
+    sa.Column('received_qty', sa.Numeric(precision=18, scale=3), nullable=True),
+    sa.Column('billed_qty', sa.Numeric(precision=18, scale=3), nullable=True),
+    sa.Column('qty_variance', sa.Numeric(precision=18, scale=3), nullable=True),
+    sa.Column('price_variance', sa.Numeric(precision=18, scale=2), nullable=True),
+    sa.Column('status', sa.String(length=20), nullable=False),
+    sa.Column('matched_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['invoice_id'], ['vendor_invoice.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['material_id'], ['material.id'], ),
+    sa.ForeignKeyConstraint(['po_id'], ['purchase_order.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_invoice_match_line_invoice_id'), 'invoice_match_line', ['invoice_id'], unique=False)
+    op.create_index(op.f('ix_invoice_match_line_status'), 'invoice_match_line', ['status'], unique=False)
+    op.add_column('vendor_invoice', sa.Column('match_status', sa.String(length=20), nullable=True))
+    op.create_index(op.f('ix_vendor_invoice_match_status'), 'vendor_invoice', ['match_status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_vendor_invoice_match_status'), table_name='vendor_invoice')
+    op.drop_column('vendor_invoice', 'match_status')
+    op.drop_index(op.f('ix_invoice_match_line_status'), table_name='invoice_match_line')
+    op.drop_index(op.f('ix_invoice_match_line_invoice_id'), table_name='invoice_match_line')
+    op.drop_table('invoice_match_line')
@@ -0,0 +1,32 @@
+"""add cache_version
+
+Revision ID: 3a7c9e1f5b24
+Revises: 8e2b4d6f1a37
+Create Date: 2026-10-19 18:40:17.226405
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3a7c9e1f5b24'
+down_revision: Union[str, None] = '8e2b4d6f1a37'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('cache_version',
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('version', sa.BigInteger(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('cache_version')
@@ -0,0 +1,45 @@
+"""add supplier_payment, payment.supplier_payment_id
+
+Revision ID: 4b8e1f0c6a2d
+Revises: 2e417a15b752
+Create Date: 2026-10-19 12:05:41.277310
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '4b8e1f0c6a2d'
+down_revision: Union[str, None] = '2e417a15b752'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('supplier_payment',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('amount', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('method', sa.String(length=30), nullable=True),
+    sa.Column('paid_at', sa.DateTime(), nullable=True),
+    sa.Column('note', sa.Text(), nullable=True),
+    sa.ForeignKeyConstraint(['supplier_id'], ['supplier.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_supplier_payment_supplier_id'), 'supplier_payment', ['supplier_id'], unique=False)
+    op.add_column('payment', sa.Column('supplier_payment_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_payment_supplier_payment_id'), 'payment', ['supplier_payment_id'], unique=False)
+    op.create_foreign_key('payment_supplier_payment_id_fkey', 'payment', 'supplier_payment', ['supplier_payment_id'], ['id'], ondelete='CASCADE')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('payment_supplier_payment_id_fkey', 'payment', type_='foreignkey')
+    op.drop_index(op.f('ix_payment_supplier_payment_id'), table_name='payment')
+    op.drop_column('payment', 'supplier_payment_id')
+    op.drop_index(op.f('ix_supplier_payment_supplier_id'), table_name='supplier_payment')
+    op.drop_table('supplier_payment')
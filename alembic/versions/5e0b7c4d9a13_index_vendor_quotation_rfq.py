@@ -0,0 +1,30 @@
+"""index vendor_quotation.rfq_id, vendor_quotation_line.vq_id
+
+Revision ID: 5e0b7c4d9a13
+Revises: c3f5d2a8b917
+Create Date: 2026-10-19 14:02:55.418730
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5e0b7c4d9a13'
+down_revision: Union[str, None] = 'c3f5d2a8b917'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_vendor_quotation_rfq_id'), 'vendor_quotation', ['rfq_id'], unique=False)
+    op.create_index(op.f('ix_vendor_quotation_line_vq_id'), 'vendor_quotation_line', ['vq_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_vendor_quotation_line_vq_id'), table_name='vendor_quotation_line')
+    op.drop_index(op.f('ix_vendor_quotation_rfq_id'), table_name='vendor_quotation')
@@ -0,0 +1,105 @@
+"""index foreign keys and status filter columns
+
+Revision ID: 6c4f2e9b1d85
+Revises: 0b7e5d3c9a42
+Create Date: 2026-10-19 17:05:12.408311
+
+Kiểm tra lại bằng: python -m utils.index_check
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '6c4f2e9b1d85'
+down_revision: Union[str, None] = '0b7e5d3c9a42'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(op.f('ix_goods_receipt_po_id'), 'goods_receipt', ['po_id'], unique=False)
+    op.create_index(op.f('ix_goods_receipt_status'), 'goods_receipt', ['status'], unique=False)
+    op.create_index(op.f('ix_gr_line_gr_id'), 'gr_line', ['gr_id'], unique=False)
+    op.create_index(op.f('ix_gr_line_material_id'), 'gr_line', ['material_id'], unique=False)
+    op.create_index(op.f('ix_gr_line_po_line_id'), 'gr_line', ['po_line_id'], unique=False)
+    op.create_index(op.f('ix_invoice_line_invoice_id'), 'invoice_line', ['invoice_id'], unique=False)
+    op.create_index(op.f('ix_invoice_line_material_id'), 'invoice_line', ['material_id'], unique=False)
+    op.create_index(op.f('ix_invoice_match_line_material_id'), 'invoice_match_line', ['material_id'], unique=False)
+    op.create_index(op.f('ix_invoice_match_line_po_id'), 'invoice_match_line', ['po_id'], unique=False)
+    op.create_index(op.f('ix_material_unit_id'), 'material', ['unit_id'], unique=False)
+    op.create_index(op.f('ix_material_price_history_supplier_id'), 'material_price_history', ['supplier_id'], unique=False)
+    op.create_index(op.f('ix_payment_invoice_id'), 'payment', ['invoice_id'], unique=False)
+    op.create_index(op.f('ix_pr_line_material_id'), 'pr_line', ['material_id'], unique=False)
+    op.create_index(op.f('ix_pr_line_pr_id'), 'pr_line', ['pr_id'], unique=False)
+    op.create_index(op.f('ix_purchase_order_status'), 'purchase_order', ['status'], unique=False)
+    op.create_index(op.f('ix_purchase_order_supplier_id'), 'purchase_order', ['supplier_id'], unique=False)
+    op.create_index(op.f('ix_purchase_order_item_material_id'), 'purchase_order_item', ['material_id'], unique=False)
+    op.create_index(op.f('ix_purchase_order_item_po_id'), 'purchase_order_item', ['po_id'], unique=False)
+    op.create_index(op.f('ix_purchase_requisition_requester_id'), 'purchase_requisition', ['requester_id'], unique=False)
+    op.create_index(op.f('ix_purchase_requisition_status'), 'purchase_requisition', ['status'], unique=False)
+    op.create_index(op.f('ix_purchase_return_gr_id'), 'purchase_return', ['gr_id'], unique=False)
+    op.create_index(op.f('ix_purchase_return_status'), 'purchase_return', ['status'], unique=False)
+    op.create_index(op.f('ix_qc_line_gr_line_id'), 'qc_line', ['gr_line_id'], unique=False)
+    op.create_index(op.f('ix_qc_line_qc_id'), 'qc_line', ['qc_id'], unique=False)
+    op.create_index(op.f('ix_qc_report_gr_id'), 'qc_report', ['gr_id'], unique=False)
+    op.create_index(op.f('ix_qc_report_status'), 'qc_report', ['status'], unique=False)
+    op.create_index(op.f('ix_return_line_gr_line_id'), 'return_line', ['gr_line_id'], unique=False)
+    op.create_index(op.f('ix_return_line_return_id'), 'return_line', ['return_id'], unique=False)
+    op.create_index(op.f('ix_rfq_pr_id'), 'rfq', ['pr_id'], unique=False)
+    op.create_index(op.f('ix_rfq_status'), 'rfq', ['status'], unique=False)
+    op.create_index(op.f('ix_rfq_line_material_id'), 'rfq_line', ['material_id'], unique=False)
+    op.create_index(op.f('ix_rfq_line_rfq_id'), 'rfq_line', ['rfq_id'], unique=False)
+    op.create_index(op.f('ix_stock_movement_material_id'), 'stock_movement', ['material_id'], unique=False)
+    op.create_index('ix_stock_movement_ref_type_ref_id', 'stock_movement', ['ref_type', 'ref_id'], unique=False)
+    op.create_index(op.f('ix_vendor_invoice_po_id'), 'vendor_invoice', ['po_id'], unique=False)
+    op.create_index(op.f('ix_vendor_invoice_status'), 'vendor_invoice', ['status'], unique=False)
+    op.create_index(op.f('ix_vendor_quotation_status'), 'vendor_quotation', ['status'], unique=False)
+    op.create_index(op.f('ix_vendor_quotation_supplier_id'), 'vendor_quotation', ['supplier_id'], unique=False)
+    op.create_index(op.f('ix_vendor_quotation_line_material_id'), 'vendor_quotation_line', ['material_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_vendor_quotation_line_material_id'), table_name='vendor_quotation_line')
+    op.drop_index(op.f('ix_vendor_quotation_supplier_id'), table_name='vendor_quotation')
+    op.drop_index(op.f('ix_vendor_quotation_status'), table_name='vendor_quotation')
+    op.drop_index(op.f('ix_vendor_invoice_status'), table_name='vendor_invoice')
+    op.drop_index(op.f('ix_vendor_invoice_po_id'), table_name='vendor_invoice')
+    op.drop_index('ix_stock_movement_ref_type_ref_id', table_name='stock_movement')
+    op.drop_index(op.f('ix_stock_movement_material_id'), table_name='stock_movement')
+    op.drop_index(op.f('ix_rfq_line_rfq_id'), table_name='rfq_line')
+    op.drop_index(op.f('ix_rfq_line_material_id'), table_name='rfq_line')
+    op.drop_index(op.f('ix_rfq_status'), table_name='rfq')
+    op.drop_index(op.f('ix_rfq_pr_id'), table_name='rfq')
+    op.drop_index(op.f('ix_return_line_return_id'), table_name='return_line')
+    op.drop_index(op.f('ix_return_line_gr_line_id'), table_name='return_line')
+    op.drop_index(op.f('ix_qc_report_status'), table_name='qc_report')
+    op.drop_index(op.f('ix_qc_report_gr_id'), table_name='qc_report')
+    op.drop_index(op.f('ix_qc_line_qc_id'), table_name='qc_line')
+    op.drop_index(op.f('ix_qc_line_gr_line_id'), table_name='qc_line')
+    op.drop_index(op.f('ix_purchase_return_status'), table_name='purchase_return')
+    op.drop_index(op.f('ix_purchase_return_gr_id'), table_name='purchase_return')
+    op.drop_index(op.f('ix_purchase_requisition_status'), table_name='purchase_requisition')
+    op.drop_index(op.f('ix_purchase_requisition_requester_id'), table_name='purchase_requisition')
+    op.drop_index(op.f('ix_purchase_order_item_po_id'), table_name='purchase_order_item')
+    op.drop_index(op.f('ix_purchase_order_item_material_id'), table_name='purchase_order_item')
+    op.drop_index(op.f('ix_purchase_order_supplier_id'), table_name='purchase_order')
+    op.drop_index(op.f('ix_purchase_order_status'), table_name='purchase_order')
+    op.drop_index(op.f('ix_pr_line_pr_id'), table_name='pr_line')
+    op.drop_index(op.f('ix_pr_line_material_id'), table_name='pr_line')
+    op.drop_index(op.f('ix_payment_invoice_id'), table_name='payment')
+    op.drop_index(op.f('ix_material_price_history_supplier_id'), table_name='material_price_history')
+    op.drop_index(op.f('ix_material_unit_id'), table_name='material')
+    op.drop_index(op.f('ix_invoice_match_line_po_id'), table_name='invoice_match_line')
+    op.drop_index(op.f('ix_invoice_match_line_material_id'), table_name='invoice_match_line')
+    op.drop_index(op.f('ix_invoice_line_material_id'), table_name='invoice_line')
+    op.drop_index(op.f('ix_invoice_line_invoice_id'), table_name='invoice_line')
+    op.drop_index(op.f('ix_gr_line_po_line_id'), table_name='gr_line')
+    op.drop_index(op.f('ix_gr_line_material_id'), table_name='gr_line')
+    op.drop_index(op.f('ix_gr_line_gr_id'), table_name='gr_line')
+    op.drop_index(op.f('ix_goods_receipt_status'), table_name='goods_receipt')
+    op.drop_index(op.f('ix_goods_receipt_po_id'), table_name='goods_receipt')
@@ -0,0 +1,52 @@
+"""material_price_history
+
+Revision ID: 8d2c6a1f4e57
+Revises: 5e0b7c4d9a13
+Create Date: 2026-10-19 15:11:08.204517
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d2c6a1f4e57'
+down_revision: Union[str, None] = '5e0b7c4d9a13'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('material_price_history',
+    sa.Column('id', sa.Integer(), autoincrement=True, nullable=False),
+    sa.Column('material_id', sa.Integer(), nullable=False),
+    sa.Column('supplier_id', sa.Integer(), nullable=False),
+    sa.Column('price_date', sa.Date(), nullable=False),
+    sa.Column('price', sa.Numeric(precision=18, scale=2), nullable=False),
+    sa.Column('qty', sa.Numeric(precision=18, scale=3), nullable=False),
+    sa.Column('source', sa.String(length=10), nullable=False),
+    sa.Column('po_id', sa.Integer(), nullable=True),
+    sa.Column('invoice_id', sa.Integer(), nullable=True),
+    sa.Column('recorded_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['invoice_id'], ['vendor_invoice.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['material_id'], ['material.id'], ),
+    sa.ForeignKeyConstraint(['po_id'], ['purchase_order.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['supplier_id'], ['supplier.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_material_price_history_invoice_id'), 'material_price_history', ['invoice_id'], unique=False)
+    op.create_index('ix_material_price_history_material_date', 'material_price_history', ['material_id', 'price_date'], unique=False)
+    op.create_index('ix_material_price_history_material_supplier_date', 'material_price_history', ['material_id', 'supplier_id', 'price_date'], unique=False)
+    op.create_index(op.f('ix_material_price_history_po_id'), 'material_price_history', ['po_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_material_price_history_po_id'), table_name='material_price_history')
+    op.drop_index('ix_material_price_history_material_supplier_date', table_name='material_price_history')
+    op.drop_index('ix_material_price_history_material_date', table_name='material_price_history')
+    op.drop_index(op.f('ix_material_price_history_invoice_id'), table_name='material_price_history')
+    op.drop_table('material_price_history')
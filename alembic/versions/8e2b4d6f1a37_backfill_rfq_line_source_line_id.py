@@ -0,0 +1,41 @@
+"""backfill rfq_line.source_line_id for RFQs created from a PR
+
+Revision ID: 8e2b4d6f1a37
+Revises: 6c4f2e9b1d85
+Create Date: 2026-10-19 18:02:41.530918
+
+RFQ nhập tay (create_rfq) / tạo trước c3f5d2a8b917 chưa có source_line_id:
+gán dòng PR cùng pr_id + material_id.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8e2b4d6f1a37'
+down_revision: Union[str, None] = '6c4f2e9b1d85'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.execute("""
+        UPDATE rfq_line
+        SET source_line_id = (
+            SELECT MIN(pl.id)
+            FROM pr_line pl
+            JOIN rfq r ON r.pr_id = pl.pr_id
+            WHERE r.id = rfq_line.rfq_id
+              AND pl.material_id = rfq_line.material_id
+        )
+        WHERE source_line_id IS NULL
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # chỉ là dữ liệu suy ra từ pr_id + material_id, giữ nguyên khi downgrade
+    pass
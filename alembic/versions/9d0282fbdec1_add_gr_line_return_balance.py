@@ -0,0 +1,61 @@
+"""add gr_line_return_balance
+
+Revision ID: 9d0282fbdec1
+Revises: 67bce026d5b6
+Create Date: 2026-10-19 09:12:41.503118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '9d0282fbdec1'
+down_revision: Union[str, None] = '67bce026d5b6'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('gr_line_return_balance',
+    sa.Column('gr_line_id', sa.Integer(), nullable=False),
+    sa.Column('gr_id', sa.Integer(), nullable=False),
+    sa.Column('accepted_qty', sa.Numeric(precision=18, scale=3), nullable=False),
+    sa.Column('returned_qty', sa.Numeric(precision=18, scale=3), nullable=False),
+    sa.Column('returnable_qty', sa.Numeric(precision=18, scale=3), nullable=False),
+    sa.ForeignKeyConstraint(['gr_id'], ['goods_receipt.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['gr_line_id'], ['gr_line.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('gr_line_id')
+    )
+    op.create_index(op.f('ix_gr_line_return_balance_gr_id'), 'gr_line_return_balance', ['gr_id'], unique=False)
+
+    # backfill từ QC PASSED + phiếu trả POSTED
+    op.execute("""
+        INSERT INTO gr_line_return_balance
+            (gr_line_id, gr_id, accepted_qty, returned_qty, returnable_qty)
+        SELECT gl.id, gl.gr_id,
+               COALESCE(acc.qty, 0), COALESCE(ret.qty, 0),
+               GREATEST(COALESCE(acc.qty, 0) - COALESCE(ret.qty, 0), 0)
+        FROM gr_line gl
+        LEFT JOIN (
+            SELECT ql.gr_line_id, SUM(COALESCE(ql.accepted_qty, 0)) AS qty
+            FROM qc_line ql JOIN qc_report qr ON qr.id = ql.qc_id
+            WHERE qr.status = 'PASSED'
+            GROUP BY ql.gr_line_id
+        ) acc ON acc.gr_line_id = gl.id
+        LEFT JOIN (
+            SELECT rl.gr_line_id, SUM(rl.qty) AS qty
+            FROM return_line rl JOIN purchase_return pr ON pr.id = rl.return_id
+            WHERE pr.status = 'POSTED'
+            GROUP BY rl.gr_line_id
+        ) ret ON ret.gr_line_id = gl.id
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_gr_line_return_balance_gr_id'), table_name='gr_line_return_balance')
+    op.drop_table('gr_line_return_balance')
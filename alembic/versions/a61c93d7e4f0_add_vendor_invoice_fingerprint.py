@@ -0,0 +1,33 @@
+"""add vendor_invoice.fingerprint + near-duplicate index
+
+Revision ID: a61c93d7e4f0
+Revises: 4b8e1f0c6a2d
+Create Date: 2026-10-19 12:48:10.532904
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a61c93d7e4f0'
+down_revision: Union[str, None] = '4b8e1f0c6a2d'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('vendor_invoice', sa.Column('fingerprint', sa.String(length=64), nullable=True))
+    op.create_index(op.f('ix_vendor_invoice_fingerprint'), 'vendor_invoice', ['fingerprint'], unique=False)
+    op.create_index('ix_vendor_invoice_supplier_total_issued', 'vendor_invoice', ['supplier_id', 'total', 'issued_at'], unique=False)
+    # backfill fingerprint: python -m jobs.rebuild_invoice_fingerprints
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_vendor_invoice_supplier_total_issued', table_name='vendor_invoice')
+    op.drop_index(op.f('ix_vendor_invoice_fingerprint'), table_name='vendor_invoice')
+    op.drop_column('vendor_invoice', 'fingerprint')
@@ -0,0 +1,93 @@
+"""backfill vendor_invoice.fingerprint
+
+Revision ID: b7d41e9a2c68
+Revises: 3a7c9e1f5b24
+Create Date: 2026-10-19 19:12:05.418263
+
+HĐ tạo trước a61c93d7e4f0 chưa có fingerprint -> find_duplicates() không
+thấy trùng với HĐ cũ. Tính theo lô (keyset theo id), cùng công thức
+compute_fingerprint của dao.invoice.
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+from dao.invoice import compute_fingerprint
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7d41e9a2c68'
+down_revision: Union[str, None] = '3a7c9e1f5b24'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 2000
+
+vendor_invoice = sa.table(
+    'vendor_invoice',
+    sa.column('id', sa.Integer),
+    sa.column('supplier_id', sa.Integer),
+    sa.column('issued_at', sa.Date),
+    sa.column('total', sa.Numeric(18, 2)),
+    sa.column('fingerprint', sa.String(64)),
+)
+invoice_line = sa.table(
+    'invoice_line',
+    sa.column('invoice_id', sa.Integer),
+    sa.column('material_id', sa.Integer),
+    sa.column('qty', sa.Numeric(18, 3)),
+    sa.column('price', sa.Numeric(18, 2)),
+)
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    conn = op.get_bind()
+    last_id = 0
+    while True:
+        invs = conn.execute(
+            sa.select(
+                vendor_invoice.c.id,
+                vendor_invoice.c.supplier_id,
+                vendor_invoice.c.issued_at,
+                vendor_invoice.c.total,
+            )
+            .where(vendor_invoice.c.id > last_id, vendor_invoice.c.fingerprint.is_(None))
+            .order_by(vendor_invoice.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not invs:
+            return
+        ids = [r.id for r in invs]
+        lines = {i: [] for i in ids}
+        for ln in conn.execute(
+            sa.select(
+                invoice_line.c.invoice_id,
+                invoice_line.c.material_id,
+                invoice_line.c.qty,
+                invoice_line.c.price,
+            ).where(invoice_line.c.invoice_id.in_(ids))
+        ):
+            lines[ln.invoice_id].append(ln)
+        conn.execute(
+            vendor_invoice.update()
+            .where(vendor_invoice.c.id == sa.bindparam('b_id'))
+            .values(fingerprint=sa.bindparam('b_fingerprint')),
+            [
+                {
+                    'b_id': r.id,
+                    'b_fingerprint': compute_fingerprint(
+                        r.supplier_id, r.issued_at, r.total, lines[r.id]
+                    ),
+                }
+                for r in invs
+            ],
+        )
+        last_id = ids[-1]
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # giá trị suy ra từ dữ liệu HĐ, giữ nguyên khi downgrade
+    pass
@@ -0,0 +1,44 @@
+"""add source_line_id to rfq_line, vendor_quotation_line, purchase_order_item
+
+Revision ID: c3f5d2a8b917
+Revises: a61c93d7e4f0
+Create Date: 2026-10-19 13:31:26.804117
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f5d2a8b917'
+down_revision: Union[str, None] = 'a61c93d7e4f0'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('rfq_line', sa.Column('source_line_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_rfq_line_source_line_id'), 'rfq_line', ['source_line_id'], unique=False)
+    op.create_foreign_key('rfq_line_source_line_id_fkey', 'rfq_line', 'pr_line', ['source_line_id'], ['id'], ondelete='SET NULL')
+    op.add_column('vendor_quotation_line', sa.Column('source_line_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_vendor_quotation_line_source_line_id'), 'vendor_quotation_line', ['source_line_id'], unique=False)
+    op.create_foreign_key('vendor_quotation_line_source_line_id_fkey', 'vendor_quotation_line', 'rfq_line', ['source_line_id'], ['id'], ondelete='SET NULL')
+    op.add_column('purchase_order_item', sa.Column('source_line_id', sa.Integer(), nullable=True))
+    op.create_index(op.f('ix_purchase_order_item_source_line_id'), 'purchase_order_item', ['source_line_id'], unique=False)
+    op.create_foreign_key('purchase_order_item_source_line_id_fkey', 'purchase_order_item', 'vendor_quotation_line', ['source_line_id'], ['id'], ondelete='SET NULL')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('purchase_order_item_source_line_id_fkey', 'purchase_order_item', type_='foreignkey')
+    op.drop_index(op.f('ix_purchase_order_item_source_line_id'), table_name='purchase_order_item')
+    op.drop_column('purchase_order_item', 'source_line_id')
+    op.drop_constraint('vendor_quotation_line_source_line_id_fkey', 'vendor_quotation_line', type_='foreignkey')
+    op.drop_index(op.f('ix_vendor_quotation_line_source_line_id'), table_name='vendor_quotation_line')
+    op.drop_column('vendor_quotation_line', 'source_line_id')
+    op.drop_constraint('rfq_line_source_line_id_fkey', 'rfq_line', type_='foreignkey')
+    op.drop_index(op.f('ix_rfq_line_source_line_id'), table_name='rfq_line')
+    op.drop_column('rfq_line', 'source_line_id')
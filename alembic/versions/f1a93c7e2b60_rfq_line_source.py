@@ -0,0 +1,36 @@
+"""rfq_line_source
+
+Revision ID: f1a93c7e2b60
+Revises: 8d2c6a1f4e57
+Create Date: 2026-10-19 15:48:31.660291
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f1a93c7e2b60'
+down_revision: Union[str, None] = '8d2c6a1f4e57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('rfq_line_source',
+    sa.Column('rfq_line_id', sa.Integer(), nullable=False),
+    sa.Column('pr_line_id', sa.Integer(), nullable=False),
+    sa.Column('qty', sa.Numeric(precision=18, scale=3), nullable=False),
+    sa.ForeignKeyConstraint(['pr_line_id'], ['pr_line.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['rfq_line_id'], ['rfq_line.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('rfq_line_id', 'pr_line_id'),
+    sa.UniqueConstraint('pr_line_id')
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('rfq_line_source')
@@ -9,6 +9,10 @@ from db.models.purchase_requisition import PurchaseRequisitionStatus
 from flask_login import login_required
 from blueprint import blue_print
 from admin.setup import init_admin
+from utils.sql_profiler import init_sql_profiler
+from utils.db_pool import configure_engines
+from utils.read_replica import init_read_replica
+from utils.template_cache import init_template_cache
 
 load_dotenv()
 
@@ -16,6 +20,8 @@ app = Flask(__name__, template_folder="templates", static_folder="static")
 app.secret_key = os.getenv("SECRET_KEY", "dev_secret")
 app.config["SQLALCHEMY_DATABASE_URI"] = os.getenv("DATABASE_URL")
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+configure_engines(app)  # pool / statement_timeout theo env (chỉ Postgres)
+init_template_cache(app)  # bytecode Jinja trên đĩa (JINJA_CACHE_DIR)
 
 
 db.init_app(app)
@@ -41,6 +47,8 @@ def load_user(user_id):
 
 init_admin(app)  # tạo /admin
 blue_print(app)  # đăng ký các blueprint khác
+init_sql_profiler(app)  # SQL_PROFILE=1: đếm câu lệnh / Server-Timing
+init_read_replica(app)  # REPLICA_DATABASE_URL: ghim primary sau khi ghi
 # debug: in danh sách route trước khi run
 # for r in app.url_map.iter_rules():
 #     print("ROUTE:", r)
@@ -0,0 +1,399 @@
+# bench/dao_bench.py
+# Benchmark các đường nóng của DAO trên dữ liệu thật / dữ liệu sinh bởi
+# bench.generate_data: thời gian (median / p95) + số câu lệnh SQL mỗi lần gọi.
+# Mỗi lần chạy nằm trong bench.harness.rollback_session() -> DB không đổi.
+#
+# Chạy:
+#   python -m bench.dao_bench [--repeat 20] [--only create_gr,list_]
+#   python -m bench.dao_bench --save bench/baseline.json
+#   python -m bench.dao_bench --compare bench/baseline.json [--tolerance 20]
+#   python -m bench.dao_bench --sqlite        (SQLite in-memory + seed_flow, không cần
+#                                              Postgres; số câu lệnh vẫn so được)
+# --compare: exit 1 nếu số câu lệnh tăng hoặc median chậm hơn quá tolerance %.
+import argparse
+import json
+import platform
+import statistics
+import time
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from sqlalchemy import exists, func, select
+from configs import db
+from db.models.goods_receipt import GoodsReceipt, GRStatus
+from db.models.invoice_payment import VendorInvoice, PaymentStatus
+from db.models.inventory import StockMovement
+from db.models.purchase import PurchaseOrder, PurchaseOrderItem, POStatus
+from db.models.qc import QCReport, QCStatus
+from dao import (
+    goods_receipt as gr_dao,
+    inventory as inv_stock_dao,
+    invoice as inv_dao,
+    material as material_dao,
+    payment as pay_dao,
+    purchase as po_dao,
+    purchase_requisition as pr_dao,
+    purchase_return as ret_dao,
+    qc as qc_dao,
+    rfq as rfq_dao,
+    supplier as supplier_dao,
+    supplier_payment as sp_dao,
+    unit as unit_dao,
+    vendor_quotation as vq_dao,
+)
+from bench.harness import QueryCounter, rollback_session, seed_flow, sqlite_app
+
+# số đối tượng mẫu lấy cho mỗi case (lần chạy thứ i dùng mẫu i % SAMPLE)
+SAMPLE = 50
+
+
+class Case:
+    """
+    prepare(i) -> args: chạy trong rollback_session, KHÔNG tính giờ.
+    run(*args): phần được đo. prepare trả None -> bỏ qua lần chạy đó.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        run: Callable,
+        prepare: Optional[Callable[[int], Optional[tuple]]] = None,
+    ):
+        self.name = name
+        self.run = run
+        self.prepare = prepare or (lambda i: ())
+
+
+def _ids(stmt) -> List[int]:
+    return list(db.session.execute(stmt.limit(SAMPLE)).scalars())
+
+
+def _nth(ids: List[int], i: int) -> Optional[int]:
+    return ids[i % len(ids)] if ids else None
+
+
+# ---------- chọn dữ liệu mẫu (1 lần, ngoài phần đo) ----------
+def _sample_ids() -> Dict[str, List[int]]:
+    has_gr = exists().where(GoodsReceipt.po_id == PurchaseOrder.id)
+    return {
+        # PO CONFIRMED chưa nhận -> create_gr nhận đủ phần còn lại
+        "po_open": _ids(
+            select(PurchaseOrder.id)
+            .where(PurchaseOrder.status == POStatus.CONFIRMED, ~has_gr)
+            .order_by(PurchaseOrder.id.desc())
+        ),
+        "po_received": _ids(
+            select(PurchaseOrder.id).where(has_gr).order_by(PurchaseOrder.id.desc())
+        ),
+        "qc_pending": _ids(
+            select(QCReport.id)
+            .join(GoodsReceipt, GoodsReceipt.id == QCReport.gr_id)
+            .where(
+                QCReport.status == QCStatus.PENDING,
+                GoodsReceipt.status == GRStatus.POSTED,
+            )
+            .order_by(QCReport.id.desc())
+        ),
+        "gr_passed": _ids(
+            select(QCReport.gr_id)
+            .where(QCReport.status == QCStatus.PASSED)
+            .order_by(QCReport.gr_id.desc())
+        ),
+        "inv_open": _ids(
+            select(VendorInvoice.id)
+            .where(
+                VendorInvoice.status.in_(
+                    [PaymentStatus.VALIDATED, PaymentStatus.PARTIALLY_PAID]
+                ),
+                VendorInvoice.balance > 0,
+            )
+            .order_by(VendorInvoice.id.desc())
+        ),
+        "materials_active": list(
+            db.session.execute(
+                select(StockMovement.material_id)
+                .group_by(StockMovement.material_id)
+                .order_by(func.count().desc())
+                .limit(200)
+            ).scalars()
+        ),
+        "invoices_recent": list(
+            db.session.execute(
+                select(VendorInvoice.id).order_by(VendorInvoice.id.desc()).limit(500)
+            ).scalars()
+        ),
+    }
+
+
+def _receive_all_lines(po_id: int) -> List[Dict]:
+    return [
+        {
+            "po_line_id": ln["po_line_id"],
+            "material_id": ln["material_id"],
+            "qty": ln["remaining"],
+        }
+        for ln in po_dao.po_lines_with_remaining(po_id)
+        if ln["remaining"] > 0
+    ]
+
+
+def build_cases(ids: Dict[str, List[int]]) -> List[Case]:
+    def prep_create_gr(i):
+        po_id = _nth(ids["po_open"], i)
+        lines = _receive_all_lines(po_id) if po_id else []
+        return (po_id, "draft", lines) if lines else None
+
+    def prep_update_gr(i):
+        args = prep_create_gr(i)
+        if not args:
+            return None
+        gr = gr_dao.create_gr(*args)
+        half = [dict(ln, qty=round(ln["qty"] / 2, 3)) for ln in args[2]]
+        return (gr.id, gr.po_id, "checked", half)
+
+    def prep_finalize_qc(i):
+        qc_id = _nth(ids["qc_pending"], i)
+        if not qc_id:
+            return None
+        qc = qc_dao.get_qc(qc_id)
+        lines = [
+            {
+                "gr_line_id": ln.gr_line_id,
+                "result": "pass",
+                "accepted_qty": float(ln.gr_line.qty),
+            }
+            for ln in qc.lines
+        ]
+        return (qc_id, "passed", lines)
+
+    def prep_create_return(i):
+        gr_id = _nth(ids["gr_passed"], i)
+        if not gr_id:
+            return None
+        remain = ret_dao.remaining_to_return_by_gr(gr_id)
+        lines = [
+            {"gr_line_id": gid, "qty": round(q / 2, 3), "reason": "bench"}
+            for gid, q in remain.items()
+            if q > 0.002
+        ][:3]
+        return (gr_id, "posted", lines) if lines else None
+
+    def prep_create_invoice(i):
+        po_id = _nth(ids["po_received"], i)
+        if not po_id:
+            return None
+        po = db.session.get(PurchaseOrder, po_id)
+        items = db.session.execute(
+            select(
+                PurchaseOrderItem.material_id,
+                PurchaseOrderItem.qty,
+                PurchaseOrderItem.price,
+            ).where(PurchaseOrderItem.po_id == po_id)
+        ).all()
+        lines = [
+            {"material_id": m, "qty": float(q), "price": float(p)} for m, q, p in items
+        ]
+        return (po.supplier_id, po_id, "draft", lines)
+
+    def prep_payment(i):
+        inv_id = _nth(ids["inv_open"], i)
+        if not inv_id:
+            return None
+        inv = db.session.get(VendorInvoice, inv_id)
+        return (inv_id, round(float(inv.balance) / 2, 2) or 0.01, "bank")
+
+    def one(key):
+        return lambda i: (_nth(ids[key], i),) if ids[key] else None
+
+    def all_of(key):
+        return lambda i: (ids[key],) if ids[key] else None
+
+    return [
+        Case("create_gr", gr_dao.create_gr, prep_create_gr),
+        Case("update_gr", gr_dao.update_gr, prep_update_gr),
+        Case(
+            "po_lines_with_remaining",
+            po_dao.po_lines_with_remaining,
+            one("po_received"),
+        ),
+        Case("finalize_qc", qc_dao.finalize_qc, prep_finalize_qc),
+        Case(
+            "remaining_to_return_by_gr",
+            ret_dao.remaining_to_return_by_gr,
+            one("gr_passed"),
+        ),
+        Case("create_return", ret_dao.create_return, prep_create_return),
+        Case("create_invoice", inv_dao.create_invoice, prep_create_invoice),
+        Case("create_payment", pay_dao.create_payment, prep_payment),
+        Case(
+            "recompute_statuses", inv_dao.recompute_statuses, all_of("invoices_recent")
+        ),
+        Case(
+            "sync_stock_items",
+            inv_stock_dao.sync_stock_items,
+            all_of("materials_active"),
+        ),
+        Case("list_prs", pr_dao.list_prs),
+        Case("list_rfqs", rfq_dao.list_rfqs),
+        Case("list_vqs", vq_dao.list_vqs),
+        Case("list_purchases", po_dao.list_purchases),
+        Case("list_purchases_confirmed", po_dao.list_purchases_confirmed),
+        Case("list_grs", gr_dao.list_grs),
+        Case("list_qcs", qc_dao.list_qcs),
+        Case("list_returns", ret_dao.list_returns),
+        Case("list_invoices", inv_dao.list_invoices),
+        Case("list_invoice_register", inv_dao.list_invoice_register),
+        Case("list_open_invoices", inv_dao.list_open_invoices),
+        Case("list_supplier_payments", sp_dao.list_supplier_payments),
+        Case("list_materials", material_dao.list_materials),
+        Case("list_suppliers", supplier_dao.list_suppliers),
+        Case("list_units", unit_dao.list_units),
+    ]
+
+
+def _p95(values: List[float]) -> float:
+    s = sorted(values)
+    return s[min(len(s) - 1, int(round(0.95 * (len(s) - 1))))]
+
+
+def run_case(case: Case, repeat: int, warmup: int = 1) -> Optional[Dict]:
+    times: List[float] = []
+    queries: List[int] = []
+    db_ms: List[float] = []
+    errors: List[str] = []
+    for i in range(warmup + repeat):
+        with rollback_session():
+            args = case.prepare(i)
+            if args is None:
+                continue
+            try:
+                with QueryCounter() as counter:
+                    case.run(*args)
+            except ValueError as ex:  # dữ liệu mẫu không hợp lệ cho nghiệp vụ
+                errors.append(str(ex))
+                continue
+        if i < warmup:
+            continue
+        times.append(counter.elapsed * 1000)
+        queries.append(counter.stats.count)
+        db_ms.append(counter.stats.duration * 1000)
+    if errors:
+        print(f"- {case.name}: {len(errors)} lần lỗi nghiệp vụ, ví dụ: {errors[0]}")
+    if not times:
+        return None
+    return {
+        "runs": len(times),
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(_p95(times), 3),
+        "db_ms": round(statistics.median(db_ms), 3),
+        "queries": int(statistics.median(queries)),
+        "queries_max": max(queries),
+    }
+
+
+def compare(current: Dict, baseline: Dict, tolerance_pct: float) -> List[str]:
+    """Danh sách hồi quy: số câu lệnh tăng / median chậm hơn tolerance %."""
+    problems = []
+    for name, cur in current["cases"].items():
+        base = baseline.get("cases", {}).get(name)
+        if not base:
+            continue
+        if cur["queries"] > base["queries"]:
+            problems.append(f"{name}: queries {base['queries']} -> {cur['queries']}")
+        limit = base["median_ms"] * (1 + tolerance_pct / 100)
+        if cur["median_ms"] > limit:
+            problems.append(
+                f"{name}: median {base['median_ms']:.1f} -> {cur['median_ms']:.1f} ms"
+            )
+    return problems
+
+
+def _print_table(results: Dict[str, Dict], baseline: Optional[Dict]) -> None:
+    base_cases = (baseline or {}).get("cases", {})
+    print(
+        f"{'case':28} {'runs':>4} {'median ms':>10} {'p95 ms':>9} {'db ms':>8} "
+        f"{'queries':>8}" + ("   vs baseline" if baseline else "")
+    )
+    for name, r in results.items():
+        line = (
+            f"{name:28} {r['runs']:>4} {r['median_ms']:>10.2f} {r['p95_ms']:>9.2f} "
+            f"{r['db_ms']:>8.2f} {r['queries']:>8}"
+        )
+        b = base_cases.get(name)
+        if b:
+            dt = (r["median_ms"] / b["median_ms"] - 1) * 100 if b["median_ms"] else 0
+            line += f"   {dt:+6.1f}%  q {b['queries']}->{r['queries']}"
+        print(line)
+
+
+def main():
+    ap = argparse.ArgumentParser(description="DAO hot path benchmark")
+    ap.add_argument("--repeat", type=int, default=20)
+    ap.add_argument("--warmup", type=int, default=1)
+    ap.add_argument("--only", help="lọc case theo tiền tố, phân cách bằng dấu phẩy")
+    ap.add_argument("--save", help="ghi kết quả JSON (baseline)")
+    ap.add_argument("--compare", help="so với baseline JSON")
+    ap.add_argument("--tolerance", type=float, default=20.0, help="%% chậm hơn cho phép")
+    ap.add_argument(
+        "--sqlite", action="store_true", help="SQLite in-memory + dữ liệu seed_flow"
+    )
+    ap.add_argument("--seed-chains", type=int, default=40, help="dùng với --sqlite")
+    args = ap.parse_args()
+
+    if args.sqlite:
+        app = sqlite_app()
+        with app.app_context():
+            seed_flow(args.seed_chains)
+    else:
+        from app import app
+    with app.app_context():
+        run(args)
+
+
+def run(args):
+    ids = _sample_ids()
+    db.session.rollback()
+    cases = build_cases(ids)
+    if args.only:
+        prefixes = tuple(p.strip() for p in args.only.split(",") if p.strip())
+        cases = [c for c in cases if c.name.startswith(prefixes)]
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)
+
+    results: Dict[str, Dict] = {}
+    t0 = time.perf_counter()
+    for case in cases:
+        r = run_case(case, args.repeat, args.warmup)
+        if r is None:
+            print(f"- {case.name}: bỏ qua (không có dữ liệu mẫu)")
+            continue
+        results[case.name] = r
+    print(f"\n{len(results)} case trong {time.perf_counter() - t0:.1f}s\n")
+    _print_table(results, baseline)
+
+    report = {
+        "created_at": datetime.now().isoformat(timespec="seconds"),
+        "dialect": db.engine.dialect.name,
+        "python": platform.python_version(),
+        "repeat": args.repeat,
+        "cases": results,
+    }
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2, ensure_ascii=False)
+        print(f"\n✓ Đã ghi {args.save}")
+    if baseline:
+        problems = compare(report, baseline, args.tolerance)
+        if problems:
+            print("\n✗ Hồi quy so với baseline:")
+            for p in problems:
+                print(f"  {p}")
+            raise SystemExit(1)
+        print("\n✓ Không có hồi quy so với baseline")
+
+
+if __name__ == "__main__":
+    main()
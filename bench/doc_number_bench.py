@@ -0,0 +1,83 @@
+# bench/doc_number_bench.py
+# Đo throughput cấp số chứng từ khi nhiều worker cùng insert song song.
+# Mỗi worker: next_number() + INSERT vào bảng tạm có UNIQUE -> không được trùng.
+# Chạy (cần Postgres): python -m bench.doc_number_bench [--workers 16] [--per-worker 500]
+import argparse
+import threading
+import time
+from sqlalchemy import text
+from configs import db
+from dao import doc_number
+from bench.harness import requires_postgres
+from app import app
+
+TABLE = "bench_doc_number"
+
+
+def _worker(doc_type, n, year, errors):
+    with app.app_context():
+        try:
+            for _ in range(n):
+                no = doc_number.next_number(doc_type, year)
+                db.session.execute(
+                    text(f"INSERT INTO {TABLE} (doc_no) VALUES (:no)"), {"no": no}
+                )
+                db.session.commit()
+        except Exception as ex:  # ghi lại để báo cáo, không dừng các worker khác
+            db.session.rollback()
+            errors.append(repr(ex))
+        finally:
+            db.session.remove()
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Doc number sequence throughput")
+    ap.add_argument("--type", default="PO")
+    ap.add_argument("--year", type=int, default=1999, help="năm riêng cho bench")
+    ap.add_argument("--workers", type=int, default=16)
+    ap.add_argument("--per-worker", type=int, default=500)
+    run(ap.parse_args())
+
+
+@requires_postgres
+def run(args):
+    db.session.execute(text(f"DROP TABLE IF EXISTS {TABLE}"))
+    db.session.execute(text(f"CREATE TABLE {TABLE} (doc_no varchar(50) PRIMARY KEY)"))
+    db.session.commit()
+
+    errors = []
+    threads = [
+        threading.Thread(
+            target=_worker, args=(args.type, args.per_worker, args.year, errors)
+        )
+        for _ in range(args.workers)
+    ]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    total, distinct = db.session.execute(
+        text(f"SELECT count(*), count(DISTINCT doc_no) FROM {TABLE}")
+    ).one()
+    db.session.execute(text(f"DROP TABLE {TABLE}"))
+    db.session.execute(
+        text(f"DROP SEQUENCE IF EXISTS {doc_number.sequence_name(args.type, args.year)}")
+    )
+    db.session.commit()
+
+    expected = args.workers * args.per_worker
+    print(f"workers={args.workers} per_worker={args.per_worker} elapsed={elapsed:.2f}s")
+    print(f"inserted={total}/{expected} distinct={distinct} rate={total / elapsed:.0f}/s")
+    if errors:
+        print(f"✗ {len(errors)} worker lỗi, ví dụ: {errors[0]}")
+    if errors or total != expected or distinct != total:
+        raise SystemExit(1)
+    print("✓ Không trùng số chứng từ")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
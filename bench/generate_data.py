@@ -0,0 +1,587 @@
+# bench/generate_data.py
+# Sinh dữ liệu tổng hợp quy mô lớn cho benchmark: NCC, vật tư và chuỗi mua hàng
+# PR -> RFQ -> VQ -> PO -> GR -> QC -> (trả hàng) -> hóa đơn -> thanh toán + tồn kho.
+# Nạp bằng COPY (psycopg2 copy_expert) theo lô, 1 transaction; id tự cấp rồi
+# setval lại sequence. Các bảng dẫn xuất (giá, số dư trả, đối chiếu, fingerprint)
+# dựng lại bằng các hàm rebuild sẵn có (bỏ qua bằng --no-derive).
+#
+# Cần Postgres + đã chạy seed.py / seed_user.py (đơn vị tính, user).
+# Chạy: python -m bench.generate_data [--chains 20000] [--materials 2000]
+#           [--suppliers 300] [--months 24] [--seed 42]
+# ~35 dòng / chuỗi: --chains 300000 ~ 10 triệu dòng.
+import argparse
+import io
+import json
+import math
+import random
+import time
+from bisect import bisect
+from datetime import datetime, timedelta
+from itertools import accumulate
+from typing import Dict, List, Sequence
+
+from sqlalchemy import text
+from configs import db
+from bench.harness import requires_postgres
+from app import app
+
+# số dòng đệm / bảng trước khi đẩy 1 lệnh COPY
+CHUNK_ROWS = 50_000
+
+COLUMNS: Dict[str, Sequence[str]] = {
+    "supplier": ("id", "code", "name", "phone", "email", "is_active"),
+    "material": ("id", "sku", "name", "category", "unit_id", "attrs", "is_active"),
+    "purchase_requisition": ("id", "requester_id", "status", "note"),
+    "pr_line": ("id", "pr_id", "material_id", "qty"),
+    "rfq": ("id", "pr_id", "status"),
+    "rfq_line": ("id", "rfq_id", "material_id", "qty", "source_line_id"),
+    "vendor_quotation": ("id", "rfq_id", "supplier_id", "status"),
+    "vendor_quotation_line": (
+        "id",
+        "vq_id",
+        "material_id",
+        "qty",
+        "price",
+        "source_line_id",
+    ),
+    "purchase_order": (
+        "id",
+        "po_no",
+        "supplier_id",
+        "status",
+        "order_date",
+        "expected_date",
+        "subtotal",
+        "tax",
+        "total",
+        "vq_id",
+    ),
+    "purchase_order_item": (
+        "id",
+        "po_id",
+        "material_id",
+        "qty",
+        "price",
+        "line_total",
+        "source_line_id",
+    ),
+    "goods_receipt": ("id", "po_id", "status", "received_at"),
+    "gr_line": ("id", "gr_id", "material_id", "po_line_id", "qty"),
+    "qc_report": ("id", "gr_id", "status", "checked_at"),
+    "qc_line": ("id", "qc_id", "gr_line_id", "result", "accepted_qty"),
+    "purchase_return": ("id", "gr_id", "status", "created_at"),
+    "return_line": ("id", "return_id", "gr_line_id", "qty", "reason"),
+    "stock_movement": (
+        "id",
+        "material_id",
+        "ref_type",
+        "ref_id",
+        "qty_change",
+        "moved_at",
+    ),
+    "vendor_invoice": (
+        "id",
+        "supplier_id",
+        "po_id",
+        "issued_at",
+        "status",
+        "total",
+        "paid_total",
+        "balance",
+    ),
+    "invoice_line": ("id", "invoice_id", "material_id", "qty", "price", "line_total"),
+    "payment": ("id", "invoice_id", "amount", "method", "paid_at"),
+}
+
+CATEGORIES = ["Nguyên liệu chính", "Phụ gia", "Bao bì", "Hương liệu", "Vật tư phụ"]
+RETURN_REASONS = ["Hàng lỗi", "Sai quy cách", "Hết hạn sử dụng", "Giao thừa"]
+
+
+def _copy_value(v) -> str:
+    """Giá trị -> ô COPY text format (\\N = NULL, escape \\ tab xuống dòng)."""
+    if v is None:
+        return "\\N"
+    if isinstance(v, bool):
+        return "t" if v else "f"
+    if isinstance(v, float):
+        return f"{v:.3f}"
+    if isinstance(v, (dict, list)):
+        v = json.dumps(v, ensure_ascii=False)
+    s = str(v)
+    if "\\" in s or "\t" in s or "\n" in s or "\r" in s:
+        s = (
+            s.replace("\\", "\\\\")
+            .replace("\t", "\\t")
+            .replace("\n", "\\n")
+            .replace("\r", "\\r")
+        )
+    return s
+
+
+class CopyLoader:
+    """Đệm dòng theo bảng, đẩy COPY khi đủ CHUNK_ROWS; cấp id tăng dần."""
+
+    def __init__(self, cursor, chunk_rows: int = CHUNK_ROWS):
+        self.cursor = cursor
+        self.chunk_rows = chunk_rows
+        self.buffers: Dict[str, List[str]] = {t: [] for t in COLUMNS}
+        self.counts: Dict[str, int] = {t: 0 for t in COLUMNS}
+        self.next_id: Dict[str, int] = {}
+        for t in COLUMNS:
+            cursor.execute(f"SELECT COALESCE(MAX(id), 0) FROM {t}")
+            self.next_id[t] = cursor.fetchone()[0] + 1
+
+    def new_id(self, table: str) -> int:
+        i = self.next_id[table]
+        self.next_id[table] = i + 1
+        return i
+
+    def add(self, table: str, *values) -> None:
+        buf = self.buffers[table]
+        buf.append("\t".join(_copy_value(v) for v in values))
+        if len(buf) >= self.chunk_rows:
+            # đẩy mọi bảng theo thứ tự cha -> con để không vi phạm khóa ngoại
+            self.flush_all()
+
+    def flush(self, table: str) -> None:
+        buf = self.buffers[table]
+        if not buf:
+            return
+        data = io.StringIO("\n".join(buf) + "\n")
+        cols = ", ".join(COLUMNS[table])
+        self.cursor.copy_expert(f"COPY {table} ({cols}) FROM STDIN", data)
+        self.counts[table] += len(buf)
+        buf.clear()
+
+    def flush_all(self) -> None:
+        # theo thứ tự khai báo = thứ tự phụ thuộc khóa ngoại
+        for t in COLUMNS:
+            self.flush(t)
+
+    def reset_sequences(self) -> None:
+        for t in COLUMNS:
+            self.cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{t}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 1) FROM {t}))"
+            )
+
+
+def _zipf_cum_weights(n: int, s: float = 1.1) -> List[float]:
+    """Trọng số cộng dồn Zipf: vài vật tư / NCC chiếm phần lớn giao dịch."""
+    return list(accumulate(1.0 / math.pow(rank, s) for rank in range(1, n + 1)))
+
+
+class Generator:
+    def __init__(self, loader: CopyLoader, args, unit_ids, user_ids):
+        self.L = loader
+        self.args = args
+        self.rnd = random.Random(args.seed)
+        self.unit_ids = unit_ids
+        self.user_ids = user_ids
+        self.end = datetime.now().replace(microsecond=0)
+        self.start = self.end - timedelta(days=30 * args.months)
+
+    # ---------- phân phối ----------
+    def _pick(self, items, cum):
+        return items[bisect(cum, self.rnd.random() * cum[-1])]
+
+    def _qty(self) -> float:
+        # lognormal: đa số vài chục, đuôi dài vài nghìn
+        return round(max(1.0, self.rnd.lognormvariate(3.5, 1.0)), 3)
+
+    def _line_count(self) -> int:
+        # hình học, trung bình ~4 dòng / chứng từ
+        n = 1
+        while n < 30 and self.rnd.random() < 0.75:
+            n += 1
+        return n
+
+    def _price(self, mid: int, sid: int, at: datetime) -> float:
+        years = (at - self.start).days / 365.0
+        drift = 1 + self.args.inflation * years  # trượt giá theo thời gian
+        factor = self.supplier_factor[sid]
+        noise = self.rnd.gauss(1.0, 0.03)
+        return round(self.base_price[mid] * factor * drift * noise, 2)
+
+    def _after(self, at: datetime, lo_days: float, hi_days: float) -> datetime:
+        return at + timedelta(days=self.rnd.uniform(lo_days, hi_days))
+
+    # ---------- danh mục ----------
+    def masters(self) -> None:
+        L, rnd = self.L, self.rnd
+        self.supplier_ids, self.supplier_factor = [], {}
+        for _ in range(self.args.suppliers):
+            sid = L.new_id("supplier")
+            L.add(
+                "supplier",
+                sid,
+                f"SYN-S{sid:06d}",
+                f"NCC tổng hợp {sid}",
+                f"09{rnd.randrange(10**8):08d}",
+                f"ncc{sid}@example.com",
+                rnd.random() > 0.03,
+            )
+            self.supplier_ids.append(sid)
+            self.supplier_factor[sid] = max(0.7, rnd.gauss(1.0, 0.06))
+
+        self.material_ids, self.base_price = [], {}
+        for _ in range(self.args.materials):
+            mid = L.new_id("material")
+            L.add(
+                "material",
+                mid,
+                f"SYN-M{mid:07d}",
+                f"Vật tư tổng hợp {mid}",
+                rnd.choice(CATEGORIES),
+                rnd.choice(self.unit_ids),
+                {"shelf_life_days": rnd.choice([90, 180, 365, 730])},
+                True,
+            )
+            self.material_ids.append(mid)
+            self.base_price[mid] = round(math.exp(rnd.gauss(10.5, 1.2)), -1)
+
+        # thứ hạng phổ biến ngẫu nhiên (không phải id nhỏ nhất luôn hot nhất)
+        rnd.shuffle(self.material_ids)
+        rnd.shuffle(self.supplier_ids)
+        self.material_cum = _zipf_cum_weights(len(self.material_ids))
+        self.supplier_cum = _zipf_cum_weights(len(self.supplier_ids))
+
+    # ---------- 1 chuỗi mua hàng ----------
+    def chain(self) -> None:
+        L, rnd = self.L, self.rnd
+        at = self.start + timedelta(
+            seconds=rnd.random() * (self.end - self.start).total_seconds()
+        )
+
+        # PR
+        pr_status = rnd.choices(
+            ["APPROVED", "DRAFT", "SUBMITTED", "REJECTED"], [90, 5, 3, 2]
+        )[0]
+        pr_id = L.new_id("purchase_requisition")
+        L.add("purchase_requisition", pr_id, rnd.choice(self.user_ids), pr_status, None)
+        mids = {
+            self._pick(self.material_ids, self.material_cum)
+            for _ in range(self._line_count())
+        }
+        lines = []  # [(pr_line_id, material_id, qty)]
+        for mid in mids:
+            lid = L.new_id("pr_line")
+            qty = self._qty()
+            L.add("pr_line", lid, pr_id, mid, qty)
+            lines.append((lid, mid, qty))
+        if pr_status != "APPROVED":
+            return
+
+        # RFQ (copy dòng PR)
+        rfq_ok = rnd.random() < 0.95
+        rfq_id = L.new_id("rfq")
+        L.add("rfq", rfq_id, pr_id, "APPROVED" if rfq_ok else "DRAFT")
+        rfq_lines = []
+        for pr_lid, mid, qty in lines:
+            lid = L.new_id("rfq_line")
+            L.add("rfq_line", lid, rfq_id, mid, qty, pr_lid)
+            rfq_lines.append((lid, mid, qty))
+        if not rfq_ok:
+            return
+
+        # VQ: 1-4 NCC báo giá, chọn NCC tổng tiền thấp nhất
+        n_vq = min(
+            len(self.supplier_ids), rnd.choices([1, 2, 3, 4], [15, 35, 35, 15])[0]
+        )
+        sids = set()
+        while len(sids) < n_vq:
+            sids.add(self._pick(self.supplier_ids, self.supplier_cum))
+        quotes = []  # (total, vq_id, sid, [(vq_line_id, mid, qty, price)])
+        for sid in sids:
+            vq_id = L.new_id("vendor_quotation")
+            qlines = [
+                (L.new_id("vendor_quotation_line"), mid, qty, self._price(mid, sid, at))
+                for _, mid, qty in rfq_lines
+            ]
+            quotes.append((sum(q * p for _, _, q, p in qlines), vq_id, sid, qlines))
+        quotes.sort()
+        selected = quotes[0] if rnd.random() < 0.95 else None
+        for q in quotes:
+            status = (
+                "SELECTED"
+                if q is selected
+                else ("REJECTED" if selected else "RECEIVED")
+            )
+            L.add("vendor_quotation", q[1], rfq_id, q[2], status)
+            for (vql_id, mid, qty, price), (rfq_lid, _, _) in zip(q[3], rfq_lines):
+                L.add("vendor_quotation_line", vql_id, q[1], mid, qty, price, rfq_lid)
+        if selected is None:
+            return
+
+        # PO từ VQ được chọn
+        _, vq_id, sid, qlines = selected
+        order_at = self._after(at, 1, 10)
+        po_status = rnd.choices(["CONFIRMED", "DRAFT", "CANCELLED"], [94, 3, 3])[0]
+        po_id = L.new_id("purchase_order")
+        items = []  # (po_item_id, mid, qty, price)
+        for _, mid, qty, price in qlines:
+            items.append((L.new_id("purchase_order_item"), mid, qty, price))
+        subtotal = round(sum(q * p for _, _, q, p in items), 2)
+        tax = round(subtotal * 0.1, 2)
+        received = (
+            po_status == "CONFIRMED" and order_at < self.end and rnd.random() < 0.92
+        )
+        if received:
+            po_status = "COMPLETED"
+        L.add(
+            "purchase_order",
+            po_id,
+            f"SYN-PO-{po_id:08d}",
+            sid,
+            po_status,
+            order_at,
+            self._after(order_at, 3, 20),
+            subtotal,
+            tax,
+            round(subtotal + tax, 2),
+            vq_id,
+        )
+        for (item_id, mid, qty, price), (vql_id, *_) in zip(items, qlines):
+            L.add(
+                "purchase_order_item",
+                item_id,
+                po_id,
+                mid,
+                qty,
+                price,
+                round(qty * price, 2),
+                vql_id,
+            )
+        if not received:
+            return
+
+        # GR (10% giao thiếu)
+        gr_at = self._after(order_at, 3, 20)
+        gr_id = L.new_id("goods_receipt")
+        L.add("goods_receipt", gr_id, po_id, "POSTED", gr_at)
+        gr_lines = []  # (gr_line_id, mid, qty, price)
+        for item_id, mid, qty, price in items:
+            got = qty if rnd.random() > 0.1 else round(qty * rnd.uniform(0.6, 0.99), 3)
+            gl_id = L.new_id("gr_line")
+            L.add("gr_line", gl_id, gr_id, mid, item_id, got)
+            gr_lines.append((gl_id, mid, got, price))
+
+        # QC: đạt -> nhập kho QC_PASS theo accepted_qty
+        qc_status = rnd.choices(["PASSED", "FAILED", "PENDING"], [90, 5, 5])[0]
+        qc_at = self._after(gr_at, 0, 3)
+        qc_id = L.new_id("qc_report")
+        L.add(
+            "qc_report",
+            qc_id,
+            gr_id,
+            qc_status,
+            None if qc_status == "PENDING" else qc_at,
+        )
+        accepted = []  # (gr_line_id, mid, accepted_qty, price)
+        for gl_id, mid, got, price in gr_lines:
+            ok = qc_status == "PASSED" and rnd.random() > 0.05
+            if ok:
+                acc = got
+            elif qc_status == "PASSED":
+                acc = round(got * rnd.uniform(0, 0.9), 3)  # đạt 1 phần
+            else:
+                acc = 0
+            L.add(
+                "qc_line",
+                L.new_id("qc_line"),
+                qc_id,
+                gl_id,
+                "pass" if ok else "fail",
+                acc,
+            )
+            accepted.append((gl_id, mid, acc, price))
+        if qc_status != "PASSED":
+            return
+        for _, mid, acc, _ in accepted:
+            if acc > 0:
+                L.add(
+                    "stock_movement",
+                    L.new_id("stock_movement"),
+                    mid,
+                    "QC_PASS",
+                    qc_id,
+                    acc,
+                    qc_at,
+                )
+
+        # trả hàng (3%): 1 phần số đạt, POSTED -> movement RETURN âm
+        if rnd.random() < 0.03:
+            ret_at = self._after(qc_at, 1, 10)
+            ret_id = L.new_id("purchase_return")
+            L.add("purchase_return", ret_id, gr_id, "POSTED", ret_at)
+            for gl_id, mid, acc, _ in accepted:
+                if acc <= 0 or rnd.random() < 0.5:
+                    continue
+                back = round(acc * rnd.uniform(0.05, 0.5), 3)
+                L.add(
+                    "return_line",
+                    L.new_id("return_line"),
+                    ret_id,
+                    gl_id,
+                    back,
+                    rnd.choice(RETURN_REASONS),
+                )
+                L.add(
+                    "stock_movement",
+                    L.new_id("stock_movement"),
+                    mid,
+                    "RETURN",
+                    ret_id,
+                    -back,
+                    ret_at,
+                )
+
+        # hóa đơn NCC theo số đạt (5% lệch giá)
+        if rnd.random() > 0.9:
+            return
+        inv_at = self._after(qc_at, 0, 15)
+        inv_id = L.new_id("vendor_invoice")
+        inv_lines = []
+        for _, mid, acc, price in accepted:
+            if acc <= 0:
+                continue
+            p = (
+                price
+                if rnd.random() > 0.05
+                else round(price * rnd.uniform(1.01, 1.1), 2)
+            )
+            inv_lines.append((mid, acc, p, round(acc * p, 2)))
+        total = round(sum(t for *_, t in inv_lines), 2)
+        inv_status = rnd.choices(
+            ["PAID", "PARTIALLY_PAID", "VALIDATED", "DRAFT", "CANCELED"],
+            [70, 10, 12, 5, 3],
+        )[0]
+        payments = []
+        if inv_status == "PAID":
+            first = round(total * rnd.choice([1, 1, 0.5, 0.3]), 2)
+            payments = [first, round(total - first, 2)] if first < total else [total]
+        elif inv_status == "PARTIALLY_PAID":
+            payments = [round(total * rnd.uniform(0.1, 0.9), 2)]
+        paid = round(sum(payments), 2)
+        L.add(
+            "vendor_invoice",
+            inv_id,
+            sid,
+            po_id,
+            inv_at.date(),
+            inv_status,
+            total,
+            paid,
+            round(total - paid, 2),
+        )
+        for mid, acc, p, t in inv_lines:
+            L.add("invoice_line", L.new_id("invoice_line"), inv_id, mid, acc, p, t)
+        pay_at = inv_at
+        for amount in payments:
+            if amount <= 0:
+                continue
+            pay_at = self._after(pay_at, 10, 60)
+            L.add(
+                "payment",
+                L.new_id("payment"),
+                inv_id,
+                amount,
+                rnd.choice(["bank", "bank", "bank", "cash"]),
+                pay_at,
+            )
+
+
+def _sync_stock_items() -> None:
+    # tương đương dao.inventory.sync_stock_items cho toàn bộ vật tư, 1 câu lệnh
+    db.session.execute(text("""
+            INSERT INTO stock_item (material_id, qty_on_hand)
+            SELECT material_id, SUM(qty_change) FROM stock_movement GROUP BY material_id
+            ON CONFLICT (material_id) DO UPDATE SET qty_on_hand = EXCLUDED.qty_on_hand
+            """))
+
+
+def _derive() -> None:
+    """Dựng lại bảng dẫn xuất bằng đúng code của app."""
+    from dao import invoice as inv_dao
+    from dao import invoice_match as inv_match
+    from dao import price_history, return_balance
+
+    steps = [
+        ("stock_item", _sync_stock_items),
+        ("gr_line_return_balance", return_balance.rebuild_all),
+        ("material_price_history", price_history.rebuild_all),
+    ]
+    for name, fn in steps:
+        t0 = time.perf_counter()
+        fn()
+        db.session.commit()
+        print(f"  {name}: {time.perf_counter() - t0:.1f}s")
+    t0 = time.perf_counter()
+    inv_dao.rebuild_fingerprints()
+    inv_match.rematch_all(include_closed=True)
+    print(f"  fingerprint + invoice_match_line: {time.perf_counter() - t0:.1f}s")
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Synthetic procurement data via COPY")
+    ap.add_argument("--chains", type=int, default=20000, help="số PR (chuỗi mua hàng)")
+    ap.add_argument("--materials", type=int, default=2000)
+    ap.add_argument("--suppliers", type=int, default=300)
+    ap.add_argument("--months", type=int, default=24, help="khoảng lịch sử")
+    ap.add_argument("--inflation", type=float, default=0.05, help="trượt giá / năm")
+    ap.add_argument("--seed", type=int, default=42)
+    ap.add_argument("--chunk-rows", type=int, default=CHUNK_ROWS)
+    ap.add_argument("--no-derive", action="store_true", help="bỏ qua bảng dẫn xuất")
+    generate(ap.parse_args())
+
+
+@requires_postgres
+def generate(args):
+    unit_ids = db.session.execute(text("SELECT id FROM unit")).scalars().all()
+    user_ids = (
+        db.session.execute(text("SELECT id FROM user_account WHERE is_active"))
+        .scalars()
+        .all()
+    )
+    if not unit_ids or not user_ids:
+        raise SystemExit(
+            "Chưa có đơn vị tính / user: chạy seed.py và seed_user.py trước."
+        )
+    db.session.commit()
+
+    t0 = time.perf_counter()
+    raw = db.engine.raw_connection()
+    try:
+        cur = raw.cursor()
+        loader = CopyLoader(cur, chunk_rows=args.chunk_rows)
+        gen = Generator(loader, args, unit_ids, user_ids)
+        gen.masters()
+        for i in range(args.chains):
+            gen.chain()
+            if (i + 1) % 10000 == 0:
+                print(f"  {i + 1}/{args.chains} chuỗi, {time.perf_counter() - t0:.0f}s")
+        loader.flush_all()
+        loader.reset_sequences()
+        raw.commit()
+    except Exception:
+        raw.rollback()
+        raise
+    finally:
+        raw.close()
+
+    elapsed = time.perf_counter() - t0
+    total = sum(loader.counts.values())
+    for t, n in loader.counts.items():
+        print(f"{t:24} {n:>12,}")
+    print(f"✓ COPY {total:,} dòng trong {elapsed:.1f}s ({total / elapsed:,.0f} dòng/s)")
+
+    if not args.no_derive:
+        print("Dựng lại bảng dẫn xuất...")
+        _derive()
+    db.session.execute(text("ANALYZE"))
+    db.session.commit()
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
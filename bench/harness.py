@@ -0,0 +1,236 @@
+# bench/harness.py
+# Hạ tầng dùng chung cho benchmark / kiểm thử DAO:
+#   - rollback_session(): db.session chạy trong 1 transaction ngoài, commit() của
+#     DAO chỉ giải phóng SAVEPOINT, ra khỏi khối thì rollback toàn bộ -> chạy
+#     bench ghi dữ liệu nhiều lần trên cùng bộ dữ liệu mà không làm bẩn DB.
+#   - QueryCounter: đếm câu lệnh / thời gian DB trong 1 khối (dùng lại
+#     RequestStats của utils.sql_profiler).
+#   - sqlite_app() + seed_flow(): chạy DAO trên SQLite in-memory (không cần
+#     Postgres); đường chỉ chạy được trên Postgres đánh dấu @requires_postgres.
+#     replica_url: DB thứ 2 đóng vai replica (kiểm tra utils.read_replica),
+#     pool báo cáo cũng trỏ vào đó như configure_engines khi có replica.
+#   Bộ test (tests/conftest.py) dùng lại sqlite_app() + rollback_session() làm
+#   fixture; test cần Postgres đánh dấu @pytest.mark.postgres (bỏ qua trên SQLite).
+import functools
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from flask import Flask
+from sqlalchemy import event
+from sqlalchemy.orm import Session, scoped_session, sessionmaker
+from configs import db, login
+from db import models  # noqa: F401  đăng ký toàn bộ model vào metadata
+from utils.sql_profiler import RequestStats
+
+
+def is_postgres() -> bool:
+    return db.engine.dialect.name == "postgresql"
+
+
+def requires_postgres(fn):
+    """Đánh dấu đường chỉ chạy trên Postgres (COPY, sequence...): dừng rõ ràng."""
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        if not is_postgres():
+            raise SystemExit(f"{fn.__module__}.{fn.__name__} cần Postgres.")
+        return fn(*args, **kwargs)
+
+    wrapper.requires_postgres = True
+    return wrapper
+
+
+def _sqlite_transactions(engine) -> None:
+    """
+    pysqlite tự BEGIN/COMMIT theo cách riêng -> SAVEPOINT của rollback_session
+    không hoạt động. Tắt chế độ đó để SQLAlchemy tự phát BEGIN; bật khóa ngoại
+    (ON DELETE CASCADE như Postgres).
+    """
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, _record):
+        dbapi_conn.isolation_level = None
+        cur = dbapi_conn.cursor()
+        cur.execute("PRAGMA foreign_keys=ON")
+        cur.close()
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+
+def sqlite_app(url: str = "sqlite://", replica_url: Optional[str] = None) -> Flask:
+    """
+    Flask app tối giản cho DAO trên SQLite (mặc định in-memory: Flask-SQLAlchemy
+    dùng StaticPool -> 1 kết nối chung). Tạo sẵn toàn bộ bảng (cả trên replica).
+    """
+    from utils.db_pool import REPORTS_BIND
+    from utils.read_replica import REPLICA_BIND, init_read_replica
+
+    app = Flask(__name__)
+    app.config["SQLALCHEMY_DATABASE_URI"] = url
+    app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+    app.config["TESTING"] = True
+    app.secret_key = "bench"
+    if replica_url:
+        app.config["SQLALCHEMY_BINDS"] = {
+            REPLICA_BIND: replica_url,
+            REPORTS_BIND: replica_url,
+        }
+        app.config["REPORTS_ON_REPLICA"] = True
+    db.init_app(app)
+    login.init_app(app)
+    init_read_replica(app)
+    with app.app_context():
+        for engine in db.engines.values():
+            _sqlite_transactions(engine)
+            db.metadata.create_all(engine)
+    return app
+
+
+@contextmanager
+def rollback_session() -> Iterator[Session]:
+    """
+    Thay db.session bằng session gắn vào 1 connection đang mở transaction
+    (join_transaction_mode="create_savepoint"); khôi phục + rollback khi thoát.
+    """
+    conn = db.engine.connect()
+    outer = conn.begin()
+    original = db.session
+    original.remove()
+    db.session = scoped_session(
+        sessionmaker(
+            bind=conn,
+            join_transaction_mode="create_savepoint",
+            expire_on_commit=False,
+        )
+    )
+    try:
+        yield db.session()
+    finally:
+        db.session.remove()
+        db.session = original
+        outer.rollback()
+        conn.close()
+
+
+_TX = ("BEGIN", "SAVEPOINT", "RELEASE", "ROLLBACK")
+
+
+class QueryCounter:
+    """
+    with QueryCounter() as qc:
+        dao.list_grs()
+    qc.stats.count, qc.stats.duration, qc.elapsed
+    """
+
+    def __init__(self, engine=None):
+        self.engine = engine
+        self.stats = RequestStats()
+        self.elapsed = 0.0
+        self._t0: Optional[float] = None
+
+    def _before(self, conn, cursor, statement, parameters, context, executemany):
+        if context is not None:
+            context._bench_start = time.perf_counter()
+
+    def _after(self, conn, cursor, statement, parameters, context, executemany):
+        start = getattr(context, "_bench_start", None)
+        # SAVEPOINT / BEGIN của rollback_session không phải việc của DAO
+        if start is not None and not statement.lstrip().upper().startswith(_TX):
+            self.stats.add(statement, time.perf_counter() - start)
+
+    def __enter__(self) -> "QueryCounter":
+        self.engine = self.engine or db.engine
+        event.listen(self.engine, "before_cursor_execute", self._before)
+        event.listen(self.engine, "after_cursor_execute", self._after)
+        self._t0 = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.elapsed = time.perf_counter() - self._t0
+        event.remove(self.engine, "before_cursor_execute", self._before)
+        event.remove(self.engine, "after_cursor_execute", self._after)
+
+
+def seed_flow(chains: int = 20) -> Dict[str, int]:
+    """
+    Bộ dữ liệu nhỏ đi qua đúng các DAO (PR -> RFQ -> VQ -> PO -> GR -> QC ->
+    hóa đơn), đủ trạng thái cho mọi case của bench.dao_bench:
+      i % 4 == 0: PO CONFIRMED chưa nhận
+      i % 4 == 1: GR POSTED + QC PENDING
+      còn lại   : QC PASSED + hóa đơn VALIDATED
+    """
+    from db.models import Material, Supplier, Unit, User
+    from db.models.purchase_requisition import PurchaseRequisitionStatus
+    from db.models.user import UserRole
+    from dao import goods_receipt as gr_dao
+    from dao import invoice as inv_dao
+    from dao import purchase_requisition as pr_dao
+    from dao import qc as qc_dao
+    from dao import rfq as rfq_dao
+    from dao import vendor_quotation as vq_dao
+
+    unit = Unit(code="KG", name="Kilogram", base_factor=1)
+    db.session.add(unit)
+    db.session.flush()
+    mats = [
+        Material(sku=f"MAT-{i:03d}", name=f"Vật tư {i}", unit_id=unit.id)
+        for i in range(10)
+    ]
+    sups = [Supplier(code=f"NCC-{i:03d}", name=f"NCC {i}") for i in range(4)]
+    user = User(username="bench", password_hash="!", role=UserRole.ADMIN)
+    db.session.add_all(mats + sups + [user])
+    db.session.commit()
+
+    for i in range(chains):
+        picked = [mats[(i + k) % len(mats)] for k in range(3)]
+        pr = pr_dao.create_pr(
+            user.id,
+            None,
+            [{"material_id": m.id, "qty": 10 + k} for k, m in enumerate(picked)],
+        )
+        pr.status = PurchaseRequisitionStatus.APPROVED
+        db.session.commit()
+
+        rfq = rfq_dao.create_rfq_from_pr(pr.id, "approved")
+        sup = sups[i % len(sups)]
+        vq = vq_dao.create_vq_from_rfq(rfq.id, sup.id)
+        vq_lines = [
+            {
+                "material_id": ln.material_id,
+                "qty": float(ln.qty),
+                "price": 100 + ln.material_id,
+            }
+            for ln in rfq.lines
+        ]
+        vq_dao.update_vq(vq.id, rfq.id, sup.id, "selected", vq_lines)
+        po = vq_dao.create_po_from_vq(vq.id, f"PO-BENCH-{i:05d}", status="CONFIRMED")
+        if i % 4 == 0:
+            continue
+
+        gr = gr_dao.create_gr(
+            po.id,
+            "posted",
+            [{"material_id": ln["material_id"], "qty": ln["qty"]} for ln in vq_lines],
+        )
+        qc = qc_dao.create_qc(
+            gr.id,
+            "pending",
+            [{"gr_line_id": ln.id, "result": "pass"} for ln in gr.lines],
+        )
+        if i % 4 == 1:
+            continue
+
+        qc_dao.finalize_qc(
+            qc.id,
+            "passed",
+            [
+                {"gr_line_id": ln.id, "result": "pass", "accepted_qty": float(ln.qty)}
+                for ln in gr.lines
+            ],
+        )
+        inv_dao.create_invoice(sup.id, po.id, "validated", vq_lines)
+
+    return {"materials": len(mats), "suppliers": len(sups), "chains": chains}
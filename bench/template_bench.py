@@ -0,0 +1,68 @@
+# bench/template_bench.py
+# Đo thời gian nạp template lúc worker còn "lạnh" (cache trong bộ nhớ của
+# jinja_env rỗng): compile từ mã nguồn vs nạp từ FileSystemBytecodeCache.
+# Mỗi lượt dùng 1 Environment mới (overlay của app.jinja_env) -> đúng tình
+# huống worker vừa khởi động. Không cần DB.
+# Chạy: python -m bench.template_bench [--repeat 5] [--only goods_receipt_form]
+import argparse
+import statistics
+import tempfile
+import time
+from jinja2 import FileSystemBytecodeCache
+from app import app
+
+HEAVY = (
+    "receipt/goods_receipt_form.html",
+    "invoice/invoice_form.html",
+    "qc/qc_form.html",
+)
+
+
+def _cold_load(names, bytecode_cache) -> dict:
+    env = app.jinja_env.overlay(cache_size=400, bytecode_cache=bytecode_cache)
+    times = {}
+    for name in names:
+        t0 = time.perf_counter()
+        env.get_template(name)
+        times[name] = time.perf_counter() - t0
+    return times
+
+
+def _measure(names, bytecode_cache, repeat) -> dict:
+    runs = [_cold_load(names, bytecode_cache) for _ in range(repeat)]
+    return {n: statistics.median(r[n] for r in runs) * 1000 for n in names}
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Cold template load: compile vs bytecode")
+    ap.add_argument("--repeat", type=int, default=5)
+    ap.add_argument("--only", help="chỉ template có tên chứa chuỗi này")
+    args = ap.parse_args()
+
+    names = sorted(app.jinja_env.list_templates(extensions=["html"]))
+    if args.only:
+        names = [n for n in names if args.only in n]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        bcc = FileSystemBytecodeCache(tmp)
+        _cold_load(names, bcc)  # precompile vào cache tạm
+        compiled = _measure(names, None, args.repeat)
+        cached = _measure(names, bcc, args.repeat)
+
+    print(f"{'template':<45}{'compile ms':>12}{'bytecode ms':>13}{'speedup':>9}")
+    shown = [n for n in HEAVY if n in names] or names[:10]
+    for n in shown:
+        print(
+            f"{n:<45}{compiled[n]:>12.2f}{cached[n]:>13.2f}"
+            f"{compiled[n] / max(cached[n], 1e-9):>8.1f}x"
+        )
+    total_c, total_b = sum(compiled.values()), sum(cached.values())
+    print(
+        f"{f'ALL ({len(names)} templates)':<45}{total_c:>12.2f}{total_b:>13.2f}"
+        f"{total_c / max(total_b, 1e-9):>8.1f}x"
+    )
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
@@ -13,6 +13,8 @@ from routes.qc import qc_bp
 from routes.invoice import invoice_bp
 from routes.payment import payment_bp
 from routes.purchase_return import preturn_bp
+from routes.report import report_bp
+from routes.health import health_bp
 
 
 def blue_print(app):
@@ -31,3 +33,5 @@ def blue_print(app):
     app.register_blueprint(invoice_bp)
     app.register_blueprint(payment_bp)
     app.register_blueprint(preturn_bp)
+    app.register_blueprint(report_bp)
+    app.register_blueprint(health_bp)
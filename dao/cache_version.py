@@ -0,0 +1,55 @@
+# dao/cache_version.py
+"""
+Phiên bản cache lưu trong DB (bảng cache_version) -> invalidate có hiệu lực
+trên mọi worker, không chỉ process vừa ghi:
+
+    version = cache_version.current("ap_aging")
+    cache.get_or_set("ap_aging", key, build, version=version)
+    ...
+    cache_version.bump("ap_aging")   # sau commit của DAO ghi
+
+Đọc version trước khi dựng, tăng version sau commit -> kết quả dựng trước
+commit luôn mang version cũ và bị bỏ ở lần đọc sau.
+"""
+
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from configs import db
+from db.models.cache_version import CacheVersion
+from utils.read_replica import on_primary
+
+
+def current(name: str, bind=None) -> int:
+    """Version hiện tại (0 nếu chưa có). Mặc định đọc primary; bind: engine khác."""
+    stmt = select(CacheVersion.version).where(CacheVersion.name == name)
+    if bind is not None:
+        return db.session.execute(stmt, bind_arguments={"bind": bind}).scalar() or 0
+    with on_primary():
+        return db.session.execute(stmt).scalar() or 0
+
+
+def bump(*names: Optional[str]) -> None:
+    """Tăng version (tạo dòng nếu chưa có) rồi commit."""
+    try:
+        for name in filter(None, names):
+            res = db.session.execute(
+                update(CacheVersion)
+                .where(CacheVersion.name == name)
+                .values(version=CacheVersion.version + 1)
+            )
+            if res.rowcount:
+                continue
+            try:
+                with db.session.begin_nested():
+                    db.session.add(CacheVersion(name=name, version=1))
+            except IntegrityError:  # worker khác vừa tạo cùng lúc
+                db.session.execute(
+                    update(CacheVersion)
+                    .where(CacheVersion.name == name)
+                    .values(version=CacheVersion.version + 1)
+                )
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
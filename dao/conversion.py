@@ -0,0 +1,148 @@
+# dao/conversion.py
+"""
+Chuyển dòng giữa các chứng từ mua hàng bằng 1 câu INSERT ... SELECT / bước,
+không đưa từng dòng lên Python:
+
+    PR  -> RFQ : pr_line               -> rfq_line              (source_line_id = pr_line.id)
+    RFQ -> VQ  : rfq_line              -> vendor_quotation_line (source_line_id = rfq_line.id)
+    VQ  -> PO  : vendor_quotation_line -> purchase_order_item   (source_line_id = vq_line.id)
+    PO  -> GR  : purchase_order_item   -> gr_line (phần còn lại, po_line_id = po item id)
+
+Các hàm chỉ ghi vào session (không commit), trả về số dòng đã chèn.
+Validate header do DAO gọi đảm nhận.
+"""
+from typing import Dict, List
+from sqlalchemy import func, select, literal, case, true
+from configs import db
+from db.models.purchase_requisition import PRLine
+from db.models.rfq import RFQLine
+from db.models.vendor_quotation import VendorQuotation, VendorQuotationLine
+from db.models.purchase import PurchaseOrderItem
+from db.models.goods_receipt import GoodsReceipt, GRLine, GRStatus
+
+_QTY = db.Numeric(18, 3)
+_MONEY = db.Numeric(18, 2)
+
+
+def _insert_from(table, cols, src) -> int:
+    db.session.flush()
+    res = db.session.execute(table.insert().from_select(cols, src))
+    return res.rowcount or 0
+
+
+def line_stats(line_model, parent_col: str, parent_id: int) -> Dict:
+    """1 câu aggregate để validate trước khi copy: {count, min_qty, min_price}."""
+    parent = getattr(line_model, parent_col)
+    cols = [func.count(line_model.id), func.min(line_model.qty)]
+    has_price = hasattr(line_model, "price")
+    if has_price:
+        cols.append(func.min(line_model.price))
+    row = db.session.execute(select(*cols).where(parent == int(parent_id))).one()
+    return {
+        "count": int(row[0] or 0),
+        "min_qty": row[1],
+        "min_price": row[2] if has_price else None,
+    }
+
+
+def pr_to_rfq(pr_id: int, rfq_id: int) -> int:
+    src = select(
+        literal(int(rfq_id)), PRLine.material_id, PRLine.qty, PRLine.id
+    ).where(PRLine.pr_id == int(pr_id), PRLine.qty > 0).order_by(PRLine.id)
+    return _insert_from(
+        RFQLine.__table__, ["rfq_id", "material_id", "qty", "source_line_id"], src
+    )
+
+
+def rfq_to_vqs(rfq_id: int, vq_ids: List[int]) -> int:
+    """Copy dòng RFQ sang nhiều VQ cùng lúc (giá = 0, NCC điền sau)."""
+    ids = [int(x) for x in vq_ids or []]
+    if not ids:
+        return 0
+    vq = VendorQuotation.__table__
+    src = (
+        select(
+            vq.c.id,
+            RFQLine.material_id,
+            RFQLine.qty,
+            literal(0, _MONEY),
+            RFQLine.id,
+        )
+        .select_from(RFQLine)
+        .join(vq, true())  # tích Descartes: mỗi VQ nhận đủ các dòng RFQ
+        .where(RFQLine.rfq_id == int(rfq_id), RFQLine.qty > 0, vq.c.id.in_(ids))
+        .order_by(vq.c.id, RFQLine.id)
+    )
+    return _insert_from(
+        VendorQuotationLine.__table__,
+        ["vq_id", "material_id", "qty", "price", "source_line_id"],
+        src,
+    )
+
+
+def rfq_to_vq(rfq_id: int, vq_id: int) -> int:
+    return rfq_to_vqs(rfq_id, [vq_id])
+
+
+def vq_line_total_expr():
+    """line_total = round(qty * round(price, 2), 2) — dùng chung cho subtotal PO."""
+    price = func.round(VendorQuotationLine.price, 2)
+    return func.round(VendorQuotationLine.qty * price, 2)
+
+
+def vq_subtotal(vq_id: int):
+    return db.session.execute(
+        select(func.coalesce(func.sum(vq_line_total_expr()), 0)).where(
+            VendorQuotationLine.vq_id == int(vq_id)
+        )
+    ).scalar()
+
+
+def vq_to_po(vq_id: int, po_id: int) -> int:
+    src = select(
+        literal(int(po_id)),
+        VendorQuotationLine.material_id,
+        VendorQuotationLine.qty,
+        func.round(VendorQuotationLine.price, 2),
+        vq_line_total_expr(),
+        VendorQuotationLine.id,
+    ).where(VendorQuotationLine.vq_id == int(vq_id)).order_by(VendorQuotationLine.id)
+    return _insert_from(
+        PurchaseOrderItem.__table__,
+        ["po_id", "material_id", "qty", "price", "line_total", "source_line_id"],
+        src,
+    )
+
+
+def po_remaining_to_gr(po_id: int, gr_id: int) -> int:
+    """Chèn vào GR phần còn lại của từng PO item (ordered - đã nhận CHECKED/POSTED)."""
+    received = (
+        select(
+            GRLine.po_line_id.label("po_line_id"),
+            func.sum(GRLine.qty).label("qty"),
+        )
+        .join(GoodsReceipt, GoodsReceipt.id == GRLine.gr_id)
+        .where(
+            GoodsReceipt.po_id == int(po_id),
+            GoodsReceipt.status.in_([GRStatus.CHECKED, GRStatus.POSTED]),
+            GoodsReceipt.id != int(gr_id),
+        )
+        .group_by(GRLine.po_line_id)
+        .subquery("received")
+    )
+    remaining = PurchaseOrderItem.qty - func.coalesce(received.c.qty, 0)
+    src = (
+        select(
+            literal(int(gr_id)),
+            PurchaseOrderItem.material_id,
+            PurchaseOrderItem.id,
+            case((remaining > 0, remaining), else_=0),
+        )
+        .select_from(PurchaseOrderItem)
+        .outerjoin(received, received.c.po_line_id == PurchaseOrderItem.id)
+        .where(PurchaseOrderItem.po_id == int(po_id), remaining > 0)
+        .order_by(PurchaseOrderItem.id)
+    )
+    return _insert_from(
+        GRLine.__table__, ["gr_id", "material_id", "po_line_id", "qty"], src
+    )
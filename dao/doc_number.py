@@ -0,0 +1,140 @@
+# dao/doc_number.py
+"""
+Cấp số chứng từ (PO, GR, INV, RET) bằng sequence của Postgres, mỗi
+(loại chứng từ, năm) 1 sequence riêng: doc_seq_po_2026, ...
+
+- nextval() không khóa bảng và không rollback -> có thể hụt số (gap) nhưng
+  không bao giờ trùng, kể cả khi nhiều người lưu cùng lúc.
+- Định dạng cấu hình qua env DOC_NUMBER_FORMAT_<TYPE>, ví dụ
+  DOC_NUMBER_FORMAT_PO="PO{year}-{seq:06d}" (biến: year, seq).
+- Số nhập tay / cấp trước khi có sequence: sequence mới tạo được đẩy qua số
+  lớn nhất đang có cùng định dạng; số cấp ra trùng số nhập tay thì bỏ qua
+  và lấy số kế tiếp.
+"""
+import itertools
+import os
+import re
+import threading
+from datetime import date
+from typing import Dict, Optional
+from sqlalchemy import text
+from sqlalchemy.exc import IntegrityError
+from configs import db
+
+DEFAULT_FORMATS = {
+    "PO": "PO-{year}-{seq:05d}",
+    "GR": "GR-{year}-{seq:05d}",
+    "INV": "INV-{year}-{seq:05d}",
+    "RET": "RET-{year}-{seq:05d}",
+}
+
+# cột lưu số chứng từ (chung với số nhập tay) -> tránh cấp số đã có
+_NUMBER_COLUMNS = {"PO": ("purchase_order", "po_no")}
+
+_lock = threading.Lock()
+_known_sequences = set()
+# fallback cho DB không có sequence (SQLite dev/test) — chỉ an toàn trong 1 process
+_local_counters: Dict[str, itertools.count] = {}
+
+
+def _doc_type(doc_type: str) -> str:
+    t = (doc_type or "").strip().upper()
+    if t not in DEFAULT_FORMATS:
+        raise ValueError(f"Loại chứng từ không hỗ trợ: {doc_type}")
+    return t
+
+
+def number_format(doc_type: str) -> str:
+    t = _doc_type(doc_type)
+    return os.getenv(f"DOC_NUMBER_FORMAT_{t}", DEFAULT_FORMATS[t])
+
+
+def sequence_name(doc_type: str, year: int) -> str:
+    # tên ghép từ whitelist + số nguyên -> an toàn khi đưa vào DDL
+    return f"doc_seq_{_doc_type(doc_type).lower()}_{int(year)}"
+
+
+def number_pattern(doc_type: str, year: int) -> str:
+    """Regex (cú pháp dùng chung Python / Postgres) của số theo định dạng, nhóm 1 = seq."""
+    prefix, suffix = re.split(r"\{seq[^}]*\}", number_format(doc_type), maxsplit=1)
+    return (
+        "^"
+        + re.escape(prefix.format(year=year))
+        + r"(\d+)"
+        + re.escape(suffix.format(year=year))
+        + "$"
+    )
+
+
+def _align_sequence(conn, name: str, doc_type: str, year: int) -> None:
+    """Đẩy sequence qua số lớn nhất đang có trong bảng (không bao giờ lùi)."""
+    t = _doc_type(doc_type)
+    if t not in _NUMBER_COLUMNS:
+        return
+    table, col = _NUMBER_COLUMNS[t]
+    top = conn.execute(
+        text(
+            f"SELECT max(substring({col} from :p)::bigint) FROM {table} "
+            f"WHERE {col} ~ :p"
+        ),
+        {"p": number_pattern(t, year)},
+    ).scalar()
+    if top:
+        conn.execute(
+            text(f"SELECT setval(:name, GREATEST(:v, last_value), true) FROM {name}"),
+            {"name": name, "v": int(top)},
+        )
+
+
+def _ensure_sequence(name: str, doc_type: str, year: int) -> None:
+    """
+    CREATE SEQUENCE IF NOT EXISTS + đẩy qua số đang có, trên kết nối autocommit
+    riêng (1 lần/process).
+    """
+    if name in _known_sequences:
+        return
+    with _lock:
+        if name in _known_sequences:
+            return
+        with db.engine.connect().execution_options(
+            isolation_level="AUTOCOMMIT"
+        ) as conn:
+            try:
+                conn.execute(text(f"CREATE SEQUENCE IF NOT EXISTS {name}"))
+            except IntegrityError:
+                pass  # process khác vừa tạo cùng lúc (race của IF NOT EXISTS)
+            _align_sequence(conn, name, doc_type, year)
+        _known_sequences.add(name)
+
+
+def _next_value(doc_type: str, year: int) -> int:
+    name = sequence_name(doc_type, year)
+    if db.engine.dialect.name != "postgresql":
+        with _lock:
+            counter = _local_counters.setdefault(name, itertools.count(1))
+            return next(counter)
+    _ensure_sequence(name, doc_type, year)
+    return db.session.execute(text("SELECT nextval(:name)"), {"name": name}).scalar()
+
+
+def _taken(doc_type: str, number: str) -> bool:
+    t = _doc_type(doc_type)
+    if t not in _NUMBER_COLUMNS:
+        return False
+    table, col = _NUMBER_COLUMNS[t]
+    return (
+        db.session.execute(
+            text(f"SELECT 1 FROM {table} WHERE {col} = :no LIMIT 1"), {"no": number}
+        ).first()
+        is not None
+    )
+
+
+def next_number(doc_type: str, year: Optional[int] = None) -> str:
+    """Số chứng từ kế tiếp, ví dụ next_number("PO") -> "PO-2026-00042"."""
+    year = int(year or date.today().year)
+    fmt = number_format(doc_type)
+    while True:
+        number = fmt.format(year=year, seq=_next_value(doc_type, year))
+        if not _taken(doc_type, number):  # số nhập tay trùng -> lấy số kế tiếp
+            return number
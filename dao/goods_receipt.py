@@ -6,7 +6,7 @@ from sqlalchemy import func
 from configs import db
 from db.models.goods_receipt import GoodsReceipt, GRLine, GRStatus
 from db.models.purchase import PurchaseOrder, POStatus, PurchaseOrderItem
-from dao import inventory as inv_dao
+from dao import inventory as inv_dao, conversion as conv
 
 EPS = 1e-9  # dung sai so hoc
 
@@ -68,6 +68,24 @@ def create_gr(po_id: int, status: str, lines: List[Dict]) -> GoodsReceipt:
     return gr
 
 
+def create_gr_from_po(po_id: int, status: str = "draft") -> GoodsReceipt:
+    """Tạo GR nhận toàn bộ phần còn lại của PO (1 câu INSERT ... SELECT)."""
+    po: PurchaseOrder = PurchaseOrder.query.get_or_404(int(po_id))
+    if po.status != POStatus.CONFIRMED:
+        raise ValueError("PO chưa CONFIRMED, không thể tạo GR.")
+
+    gr = GoodsReceipt(po_id=po.id, status=_to_gr_status(status))
+    db.session.add(gr)
+    db.session.flush()
+    if not conv.po_remaining_to_gr(po.id, gr.id):
+        db.session.rollback()
+        raise ValueError("PO đã nhận đủ hàng, không còn dòng nào để nhận.")
+
+    _after_save_status(gr)
+    _commit()
+    return gr
+
+
 def update_gr(gr_id: int, po_id: int, status: str, lines: List[Dict]) -> GoodsReceipt:
     gr = GoodsReceipt.query.get_or_404(gr_id)
     po = PurchaseOrder.query.get_or_404(int(po_id))
@@ -1,12 +1,17 @@
 # dao/invoice.py
-from typing import Optional, List, Dict
+import hashlib
+import os
+from typing import Optional, List, Dict, Iterable
 from decimal import Decimal
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from sqlalchemy.exc import SQLAlchemyError
-from sqlalchemy import func, exists
+from sqlalchemy import func, exists, select, update, case, literal, and_
+from sqlalchemy.orm import selectinload
 from configs import db
 from db.models.invoice_payment import VendorInvoice, InvoiceLine, PaymentStatus, Payment
 from db.models.purchase import PurchaseOrder
+from db.models.supplier import Supplier
+from dao import invoice_match as inv_match, report as report_dao, price_history
 
 _INV_FORM_TO_ENUM = {
     "draft": PaymentStatus.DRAFT,
@@ -18,6 +23,10 @@ _INV_FORM_TO_ENUM = {
 }
 
 
+# số ngày lệch ngày HĐ vẫn coi là "gần trùng" (cùng NCC + cùng tổng tiền)
+DUPLICATE_WINDOW_DAYS = int(os.getenv("INVOICE_DUPLICATE_WINDOW_DAYS", "7"))
+
+
 def _to_inv_status(v: Optional[str]) -> PaymentStatus:
     if not v:
         return PaymentStatus.DRAFT
@@ -47,6 +56,8 @@ def _commit():
     except SQLAlchemyError:
         db.session.rollback()
         raise
+    # số dư hóa đơn thay đổi -> báo cáo tuổi nợ phải tính lại
+    report_dao.invalidate_ap_aging()
 
 
 def list_invoices() -> List[VendorInvoice]:
@@ -55,8 +66,87 @@ def list_invoices() -> List[VendorInvoice]:
     ).all()
 
 
+def _register_select():
+    """Cột header + đã trả/còn nợ (cột denormalized), không load lines/payments."""
+    return (
+        select(
+            VendorInvoice.id,
+            VendorInvoice.supplier_id,
+            Supplier.name.label("supplier_name"),
+            VendorInvoice.po_id,
+            PurchaseOrder.po_no,
+            VendorInvoice.issued_at,
+            VendorInvoice.status,
+            VendorInvoice.total,
+            VendorInvoice.paid_total.label("paid"),
+            VendorInvoice.balance,
+        )
+        .select_from(VendorInvoice)
+        .outerjoin(Supplier, Supplier.id == VendorInvoice.supplier_id)
+        .outerjoin(PurchaseOrder, PurchaseOrder.id == VendorInvoice.po_id)
+    )
+
+
+def list_invoice_register(
+    page: int = 1, per_page: int = 50, status: Optional[str] = None
+) -> Dict:
+    """
+    Sổ hóa đơn có phân trang: trả về {items, total, page, per_page, pages}.
+    items là Row (id, supplier_name, po_no, issued_at, status, total, paid, balance).
+    """
+    page = max(1, int(page or 1))
+    per_page = max(1, min(int(per_page or 50), 500))
+
+    stmt = _register_select()
+    count_stmt = select(func.count()).select_from(VendorInvoice)
+    if status:
+        st = _to_inv_status(status)
+        stmt = stmt.where(VendorInvoice.status == st)
+        count_stmt = count_stmt.where(VendorInvoice.status == st)
+
+    total = db.session.execute(count_stmt).scalar() or 0
+    items = db.session.execute(
+        stmt.order_by(
+            VendorInvoice.issued_at.desc().nullslast(), VendorInvoice.id.desc()
+        )
+        .limit(per_page)
+        .offset((page - 1) * per_page)
+    ).all()
+    return {
+        "items": items,
+        "total": total,
+        "page": page,
+        "per_page": per_page,
+        "pages": max(1, -(-total // per_page)),
+    }
+
+
+def list_open_invoices(
+    supplier_id: Optional[int] = None, min_balance=None, limit: int = 200
+) -> List:
+    """Hóa đơn còn nợ (balance > 0), sắp theo balance giảm dần — dùng index balance."""
+    stmt = _register_select().where(
+        VendorInvoice.balance > max(_d(min_balance), Decimal("0")),
+        VendorInvoice.status != PaymentStatus.CANCELED,
+    )
+    if supplier_id:
+        stmt = stmt.where(VendorInvoice.supplier_id == int(supplier_id))
+    return db.session.execute(
+        stmt.order_by(VendorInvoice.balance.desc(), VendorInvoice.id).limit(limit)
+    ).all()
+
+
+def list_invoice_options() -> List:
+    """Danh sách gọn (id, supplier_name, total, balance...) cho dropdown chọn hóa đơn."""
+    return db.session.execute(
+        _register_select().order_by(VendorInvoice.id.desc())
+    ).all()
+
+
 def get_invoice(invoice_id: int) -> Optional[VendorInvoice]:
-    return VendorInvoice.query.get(invoice_id)
+    return VendorInvoice.query.options(
+        selectinload(VendorInvoice.lines), selectinload(VendorInvoice.payments)
+    ).get(invoice_id)
 
 
 def _calc_total(lines: List[Dict]) -> Decimal:
@@ -85,19 +175,95 @@ def _validate_supplier_matches_po(supplier_id, po_id):
         raise ValueError("Supplier của hóa đơn phải trùng Supplier của PO.")
 
 
-def _paid_sum(invoice_id: int) -> Decimal:
-    s = (
-        db.session.query(func.sum(Payment.amount))
-        .filter(Payment.invoice_id == invoice_id)
-        .scalar()
+def apply_payment_delta(invoice_id: int, delta) -> None:
+    """Cộng/trừ paid_total theo delta và tính lại balance trong 1 câu UPDATE (atomic)."""
+    delta = _d(delta)
+    if delta == 0:
+        return
+    new_paid = VendorInvoice.paid_total + delta
+    db.session.execute(
+        update(VendorInvoice)
+        .where(VendorInvoice.id == int(invoice_id))
+        .values(
+            paid_total=new_paid,
+            balance=func.coalesce(VendorInvoice.total, 0) - new_paid,
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def rebuild_paid_totals(invoice_ids: Optional[List[int]] = None) -> None:
+    """
+    Tính lại paid_total/balance từ tổng Payment (group theo hóa đơn).
+    invoice_ids=None: toàn bộ (job sửa dữ liệu); ngược lại chỉ các hóa đơn đó.
+    """
+    paid = (
+        select(func.coalesce(func.sum(Payment.amount), 0))
+        .where(Payment.invoice_id == VendorInvoice.id)
+        .scalar_subquery()
     )
-    return _d(s)
+    stmt = update(VendorInvoice).values(
+        paid_total=paid, balance=func.coalesce(VendorInvoice.total, 0) - paid
+    )
+    if invoice_ids is None:
+        db.session.execute(stmt.execution_options(synchronize_session=False))
+        return
+    ids = sorted({int(x) for x in invoice_ids})
+    if ids:
+        db.session.execute(
+            stmt.where(VendorInvoice.id.in_(ids)).execution_options(
+                synchronize_session="fetch"
+            )
+        )
+
+
+def recompute_statuses(invoice_ids: List[int]) -> None:
+    """
+    Bản set-based của _update_status_by_payments: 1 câu UPDATE ... CASE
+    cho cả lô hóa đơn (dựa trên paid_total đã cập nhật).
+    """
+    ids = sorted({int(x) for x in invoice_ids or []})
+    if not ids:
+        return
+    st_type = VendorInvoice.__table__.c.status.type
+    paid = func.coalesce(VendorInvoice.paid_total, 0)
+    total = func.coalesce(VendorInvoice.total, 0)
+
+    def _st(v: PaymentStatus):
+        return literal(v, st_type)
+
+    new_status = case(
+        (VendorInvoice.status == PaymentStatus.CANCELED, VendorInvoice.status),
+        (total <= 0, _st(PaymentStatus.PAID)),
+        (
+            and_(
+                paid <= 0,
+                VendorInvoice.status.in_(
+                    [PaymentStatus.DRAFT, PaymentStatus.VALIDATED]
+                ),
+            ),
+            VendorInvoice.status,
+        ),
+        (paid <= 0, _st(PaymentStatus.VALIDATED)),
+        (paid < total, _st(PaymentStatus.PARTIALLY_PAID)),
+        else_=_st(PaymentStatus.PAID),
+    )
+    db.session.execute(
+        update(VendorInvoice)
+        .where(VendorInvoice.id.in_(ids))
+        .values(status=new_status)
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def _sync_balance(inv: VendorInvoice) -> None:
+    inv.balance = _d(inv.total) - _d(inv.paid_total)
 
 
 def _update_status_by_payments(inv: VendorInvoice) -> None:
     if inv.status == PaymentStatus.CANCELED:
         return
-    paid = _paid_sum(inv.id)
+    paid = _d(inv.paid_total)
     total = _d(inv.total)
     if total <= 0:
         inv.status = PaymentStatus.PAID
@@ -109,6 +275,149 @@ def _update_status_by_payments(inv: VendorInvoice) -> None:
     inv.status = PaymentStatus.PARTIALLY_PAID if paid < total else PaymentStatus.PAID
 
 
+def _rematch(inv: VendorInvoice, old_po_id: Optional[int] = None) -> None:
+    """Đối chiếu lại hóa đơn này + các hóa đơn cùng PO (cũ/mới)."""
+    if inv.po_id:
+        inv_match.match_invoices_for_po(inv.po_id)
+    else:
+        inv_match.match_invoices([inv.id])
+    if old_po_id and old_po_id != inv.po_id:
+        inv_match.match_invoices_for_po(old_po_id)
+
+
+def compute_fingerprint(
+    supplier_id: int,
+    issued_at: Optional[date],
+    total,
+    lines: Iterable,
+) -> str:
+    """
+    Dấu vân tay chuẩn hóa của hóa đơn: NCC | ngày | tổng | các dòng
+    (material_id, qty, price) đã làm tròn và sắp xếp -> sha256 hex.
+    lines: dict hoặc object có material_id/qty/price.
+    """
+
+    def _get(ln, k):
+        return ln.get(k) if isinstance(ln, dict) else getattr(ln, k)
+
+    parts = sorted(
+        (
+            int(_get(ln, "material_id")),
+            _d(_get(ln, "qty")).quantize(Decimal("0.001")),
+            _d(_get(ln, "price")).quantize(Decimal("0.01")),
+        )
+        for ln in lines or []
+    )
+    raw = "|".join(
+        [
+            str(int(supplier_id)),
+            issued_at.isoformat() if issued_at else "",
+            str(_d(total).quantize(Decimal("0.01"))),
+        ]
+        + [f"{m}:{q}:{p}" for m, q, p in parts]
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _refresh_fingerprint(inv: VendorInvoice) -> None:
+    db.session.flush()
+    lines = db.session.execute(
+        select(InvoiceLine.material_id, InvoiceLine.qty, InvoiceLine.price).where(
+            InvoiceLine.invoice_id == inv.id
+        )
+    ).all()
+    inv.fingerprint = compute_fingerprint(
+        inv.supplier_id, inv.issued_at, inv.total, lines
+    )
+
+
+def find_duplicates(inv: VendorInvoice) -> Dict[str, List[int]]:
+    """
+    HĐ trùng (cùng fingerprint) và gần trùng (cùng NCC + tổng, ngày HĐ lệch
+    <= DUPLICATE_WINDOW_DAYS). Chỉ dùng index, bỏ qua HĐ CANCELED.
+    """
+    base = select(VendorInvoice.id).where(
+        VendorInvoice.id != inv.id, VendorInvoice.status != PaymentStatus.CANCELED
+    )
+    exact = []
+    if inv.fingerprint:
+        exact = db.session.scalars(
+            base.where(VendorInvoice.fingerprint == inv.fingerprint).order_by(
+                VendorInvoice.id
+            )
+        ).all()
+
+    near_q = base.where(
+        VendorInvoice.supplier_id == inv.supplier_id,
+        VendorInvoice.total == inv.total,
+    )
+    if inv.issued_at:
+        win = timedelta(days=DUPLICATE_WINDOW_DAYS)
+        near_q = near_q.where(
+            VendorInvoice.issued_at.between(inv.issued_at - win, inv.issued_at + win)
+        )
+    else:
+        near_q = near_q.where(VendorInvoice.issued_at.is_(None))
+    near = [
+        i
+        for i in db.session.scalars(near_q.order_by(VendorInvoice.id)).all()
+        if i not in exact
+    ]
+    return {"exact": exact, "near": near}
+
+
+def rebuild_fingerprints(batch_size: int = 2000) -> int:
+    """Job: tính lại fingerprint cho toàn bộ hóa đơn theo lô (keyset theo id)."""
+    done, last_id = 0, 0
+    while True:
+        invs = db.session.execute(
+            select(
+                VendorInvoice.id,
+                VendorInvoice.supplier_id,
+                VendorInvoice.issued_at,
+                VendorInvoice.total,
+            )
+            .where(VendorInvoice.id > last_id)
+            .order_by(VendorInvoice.id)
+            .limit(batch_size)
+        ).all()
+        if not invs:
+            return done
+        ids = [r.id for r in invs]
+        lines: Dict[int, list] = {i: [] for i in ids}
+        for ln in db.session.execute(
+            select(
+                InvoiceLine.invoice_id,
+                InvoiceLine.material_id,
+                InvoiceLine.qty,
+                InvoiceLine.price,
+            ).where(InvoiceLine.invoice_id.in_(ids))
+        ):
+            lines[ln.invoice_id].append(ln)
+        db.session.execute(
+            update(VendorInvoice),
+            [
+                {
+                    "id": r.id,
+                    "fingerprint": compute_fingerprint(
+                        r.supplier_id, r.issued_at, r.total, lines[r.id]
+                    ),
+                }
+                for r in invs
+            ],
+        )
+        db.session.commit()
+        done += len(ids)
+        last_id = ids[-1]
+
+
+def _ensure_match_ok_for_validation(inv: VendorInvoice) -> None:
+    if inv.match_status == inv_match.EXCEPTION:
+        raise ValueError(
+            "Hóa đơn lệch đối chiếu 3 chiều (PO/GR/Hóa đơn), không thể VALIDATED."
+        )
+
+
 def create_invoice(
     supplier_id: int,
     po_id: Optional[int],
@@ -122,6 +431,7 @@ def create_invoice(
         po_id=int(po_id) if po_id else None,
         status=_to_inv_status(status),
         total=Decimal("0"),
+        paid_total=Decimal("0"),
         issued_at=_to_date(issued_at),
     )
     db.session.add(inv)
@@ -140,7 +450,15 @@ def create_invoice(
             )
         )
     inv.total = _calc_total(lines)
+    _sync_balance(inv)
+
+    _refresh_fingerprint(inv)
+    _rematch(inv)
+    if inv.status == PaymentStatus.VALIDATED:
+        _ensure_match_ok_for_validation(inv)
 
+    inv.duplicates = find_duplicates(inv)
+    price_history.refresh_for_invoice(inv.id)
     _commit()
     return inv
 
@@ -156,6 +474,7 @@ def update_invoice(
     inv = VendorInvoice.query.get_or_404(invoice_id)
     _ensure_editable(inv)
     _validate_supplier_matches_po(supplier_id, po_id)
+    old_status, old_po_id = inv.status, inv.po_id
 
     inv.supplier_id = int(supplier_id)
     inv.po_id = int(po_id) if po_id else None
@@ -183,11 +502,19 @@ def update_invoice(
                 )
             )
         inv.total = _calc_total(lines)
+        _sync_balance(inv)
 
     # cập nhật trạng thái (ưu tiên theo payments)
     inv.status = _to_inv_status(status)
     _update_status_by_payments(inv)
 
+    _refresh_fingerprint(inv)
+    _rematch(inv, old_po_id=old_po_id)
+    if old_status == PaymentStatus.DRAFT and inv.status == PaymentStatus.VALIDATED:
+        _ensure_match_ok_for_validation(inv)
+
+    inv.duplicates = find_duplicates(inv)
+    price_history.refresh_for_invoice(inv.id)
     _commit()
     return inv
 
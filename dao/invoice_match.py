@@ -0,0 +1,261 @@
+# dao/invoice_match.py
+import os
+from datetime import datetime
+from decimal import Decimal
+from typing import Iterable, List, Optional
+from sqlalchemy import func, case, select, delete, update, exists, literal, and_
+from configs import db
+from db.models.invoice_payment import VendorInvoice, InvoiceLine, PaymentStatus
+from db.models.invoice_match import InvoiceMatchLine
+from db.models.purchase import PurchaseOrderItem
+from db.models.goods_receipt import GoodsReceipt, GRLine
+from db.models.qc import QCReport, QCLine, QCStatus
+
+# Dung sai (%) cho đối chiếu 3 chiều, cấu hình qua env
+QTY_TOLERANCE_PCT = float(os.getenv("MATCH_QTY_TOLERANCE_PCT", "0"))
+PRICE_TOLERANCE_PCT = float(os.getenv("MATCH_PRICE_TOLERANCE_PCT", "0"))
+
+EPS_QTY = Decimal("0.0005")
+EPS_PRICE = Decimal("0.005")
+
+MATCHED = "MATCHED"
+EXCEPTION = "EXCEPTION"
+NO_PO = "NO_PO"
+
+# hóa đơn đã ghi sổ: tính vào tổng đã xuất HĐ của PO (DRAFT đang nhập thì không)
+POSTED_STATUSES = (
+    PaymentStatus.VALIDATED,
+    PaymentStatus.PARTIALLY_PAID,
+    PaymentStatus.PAID,
+)
+
+
+def _pct(v: Optional[float], default: float) -> Decimal:
+    return Decimal(str(default if v is None else v)) / Decimal("100")
+
+
+def _match_select(invoice_ids: List[int], qty_tol: Decimal, price_tol: Decimal):
+    """
+    1 câu SELECT cho cả lô hóa đơn:
+      HĐ (gộp theo vật tư) x PO (ordered/giá) x QC PASSED (received) x tổng đã xuất HĐ.
+    Tổng đã xuất HĐ = HĐ đã ghi sổ (POSTED_STATUSES) + chính HĐ đang đối chiếu nếu
+    nó chưa ghi sổ -> bản DRAFT đang nhập không làm HĐ đã VALIDATED bị EXCEPTION.
+    """
+    po_scope = select(VendorInvoice.po_id).where(
+        VendorInvoice.id.in_(invoice_ids), VendorInvoice.po_id.isnot(None)
+    )
+
+    inv = (
+        select(
+            InvoiceLine.invoice_id.label("invoice_id"),
+            VendorInvoice.po_id.label("po_id"),
+            InvoiceLine.material_id.label("material_id"),
+            VendorInvoice.status.in_(POSTED_STATUSES).label("posted"),
+            func.sum(InvoiceLine.qty).label("qty"),
+            func.sum(InvoiceLine.line_total).label("amount"),
+        )
+        .join(VendorInvoice, VendorInvoice.id == InvoiceLine.invoice_id)
+        .where(InvoiceLine.invoice_id.in_(invoice_ids))
+        .group_by(
+            InvoiceLine.invoice_id,
+            VendorInvoice.po_id,
+            VendorInvoice.status,
+            InvoiceLine.material_id,
+        )
+        .subquery("inv")
+    )
+    po = (
+        select(
+            PurchaseOrderItem.po_id.label("po_id"),
+            PurchaseOrderItem.material_id.label("material_id"),
+            func.sum(PurchaseOrderItem.qty).label("qty"),
+            func.sum(PurchaseOrderItem.line_total).label("amount"),
+        )
+        .where(PurchaseOrderItem.po_id.in_(po_scope))
+        .group_by(PurchaseOrderItem.po_id, PurchaseOrderItem.material_id)
+        .subquery("po")
+    )
+    recv = (
+        select(
+            GoodsReceipt.po_id.label("po_id"),
+            GRLine.material_id.label("material_id"),
+            func.sum(func.coalesce(QCLine.accepted_qty, 0)).label("qty"),
+        )
+        .select_from(QCLine)
+        .join(QCReport, QCReport.id == QCLine.qc_id)
+        .join(GRLine, GRLine.id == QCLine.gr_line_id)
+        .join(GoodsReceipt, GoodsReceipt.id == GRLine.gr_id)
+        .where(QCReport.status == QCStatus.PASSED, GoodsReceipt.po_id.in_(po_scope))
+        .group_by(GoodsReceipt.po_id, GRLine.material_id)
+        .subquery("recv")
+    )
+    billed = (
+        select(
+            VendorInvoice.po_id.label("po_id"),
+            InvoiceLine.material_id.label("material_id"),
+            func.sum(InvoiceLine.qty).label("qty"),
+        )
+        .join(VendorInvoice, VendorInvoice.id == InvoiceLine.invoice_id)
+        .where(
+            VendorInvoice.status.in_(POSTED_STATUSES),
+            VendorInvoice.po_id.in_(po_scope),
+        )
+        .group_by(VendorInvoice.po_id, InvoiceLine.material_id)
+        .subquery("billed")
+    )
+
+    def _on(sub):
+        return and_(sub.c.po_id == inv.c.po_id, sub.c.material_id == inv.c.material_id)
+
+    base = (
+        select(
+            inv.c.invoice_id,
+            inv.c.po_id,
+            inv.c.material_id,
+            inv.c.qty.label("invoiced_qty"),
+            func.round(inv.c.amount / func.nullif(inv.c.qty, 0), 2).label(
+                "invoice_price"
+            ),
+            po.c.qty.label("ordered_qty"),
+            func.round(po.c.amount / func.nullif(po.c.qty, 0), 2).label("po_price"),
+            func.coalesce(recv.c.qty, 0).label("received_qty"),
+            (
+                func.coalesce(billed.c.qty, 0)
+                + case((inv.c.posted, 0), else_=inv.c.qty)
+            ).label("billed_qty"),
+        )
+        .select_from(inv)
+        .outerjoin(po, _on(po))
+        .outerjoin(recv, _on(recv))
+        .outerjoin(billed, _on(billed))
+        .subquery("b")
+    )
+
+    qty_var = base.c.billed_qty - base.c.received_qty
+    price_var = func.coalesce(base.c.invoice_price, 0) - func.coalesce(
+        base.c.po_price, 0
+    )
+    qty_bad = base.c.billed_qty > base.c.received_qty * literal(
+        1 + qty_tol, db.Numeric(18, 6)
+    ) + literal(EPS_QTY, db.Numeric(18, 6))
+    price_bad = func.abs(price_var) > func.coalesce(base.c.po_price, 0) * literal(
+        price_tol, db.Numeric(18, 6)
+    ) + literal(EPS_PRICE, db.Numeric(18, 6))
+
+    status = case(
+        (base.c.po_id.is_(None), NO_PO),
+        (base.c.ordered_qty.is_(None), "NOT_ON_PO"),
+        (and_(qty_bad, price_bad), "QTY_PRICE_VARIANCE"),
+        (qty_bad, "QTY_VARIANCE"),
+        (price_bad, "PRICE_VARIANCE"),
+        else_=MATCHED,
+    )
+    return select(
+        base.c.invoice_id,
+        base.c.po_id,
+        base.c.material_id,
+        base.c.invoiced_qty,
+        base.c.invoice_price,
+        base.c.ordered_qty,
+        base.c.po_price,
+        base.c.received_qty,
+        base.c.billed_qty,
+        qty_var,
+        price_var,
+        status,
+        literal(datetime.utcnow(), db.DateTime),
+    )
+
+
+def match_invoices(
+    invoice_ids: Iterable[int],
+    qty_tolerance_pct: Optional[float] = None,
+    price_tolerance_pct: Optional[float] = None,
+) -> None:
+    """
+    Đối chiếu lại 1 lô hóa đơn: DELETE kết quả cũ + INSERT ... SELECT + UPDATE
+    match_status header. Không commit (caller quyết định transaction).
+    """
+    ids = sorted({int(x) for x in invoice_ids or [] if x is not None})
+    if not ids:
+        return
+    db.session.flush()
+
+    t = InvoiceMatchLine.__table__
+    db.session.execute(delete(t).where(t.c.invoice_id.in_(ids)))
+    db.session.execute(
+        t.insert().from_select(
+            [
+                "invoice_id",
+                "po_id",
+                "material_id",
+                "invoiced_qty",
+                "invoice_price",
+                "ordered_qty",
+                "po_price",
+                "received_qty",
+                "billed_qty",
+                "qty_variance",
+                "price_variance",
+                "status",
+                "matched_at",
+            ],
+            _match_select(
+                ids,
+                _pct(qty_tolerance_pct, QTY_TOLERANCE_PCT),
+                _pct(price_tolerance_pct, PRICE_TOLERANCE_PCT),
+            ),
+        )
+    )
+
+    has_exception = exists().where(
+        t.c.invoice_id == VendorInvoice.id, t.c.status != MATCHED
+    )
+    db.session.execute(
+        update(VendorInvoice)
+        .where(VendorInvoice.id.in_(ids))
+        .values(
+            match_status=case(
+                (VendorInvoice.po_id.is_(None), NO_PO),
+                (has_exception, EXCEPTION),
+                else_=MATCHED,
+            )
+        )
+        .execution_options(synchronize_session="fetch")
+    )
+
+
+def match_invoices_for_po(po_id: Optional[int]) -> None:
+    """Đối chiếu lại mọi hóa đơn của 1 PO (billed/received dùng chung theo PO)."""
+    if not po_id:
+        return
+    ids = db.session.scalars(
+        select(VendorInvoice.id).where(VendorInvoice.po_id == int(po_id))
+    ).all()
+    match_invoices(ids)
+
+
+def rematch_all(batch_size: int = 2000, include_closed: bool = False) -> int:
+    """Job: đối chiếu lại toàn bộ hóa đơn theo lô (keyset theo id), commit mỗi lô."""
+    done, last_id = 0, 0
+    while True:
+        q = select(VendorInvoice.id).where(VendorInvoice.id > last_id)
+        if not include_closed:
+            q = q.where(
+                VendorInvoice.status.notin_([PaymentStatus.PAID, PaymentStatus.CANCELED])
+            )
+        ids = db.session.scalars(q.order_by(VendorInvoice.id).limit(batch_size)).all()
+        if not ids:
+            return done
+        match_invoices(ids)
+        db.session.commit()
+        done += len(ids)
+        last_id = ids[-1]
+
+
+def list_match_lines(invoice_id: int) -> List[InvoiceMatchLine]:
+    return (
+        InvoiceMatchLine.query.filter_by(invoice_id=int(invoice_id))
+        .order_by(InvoiceMatchLine.material_id)
+        .all()
+    )
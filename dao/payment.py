@@ -1,10 +1,11 @@
 # dao/payment.py
-from typing import Optional
+from typing import Optional, List, Dict
 from decimal import Decimal
+from sqlalchemy import insert
 from sqlalchemy.exc import SQLAlchemyError
 from configs import db
 from db.models.invoice_payment import Payment, VendorInvoice
-from dao import invoice as inv_dao
+from dao import invoice as inv_dao, report as report_dao
 
 
 def _d(x):
@@ -17,6 +18,37 @@ def _commit():
     except SQLAlchemyError:
         db.session.rollback()
         raise
+    # số dư hóa đơn thay đổi -> báo cáo tuổi nợ phải tính lại
+    report_dao.invalidate_ap_aging()
+
+
+def _refresh_invoice_status(invoice_id: int) -> None:
+    inv = db.session.get(VendorInvoice, invoice_id)
+    if inv:
+        inv_dao._update_status_by_payments(inv)
+
+
+def post_payments(rows: List[Dict]) -> List[int]:
+    """
+    Ghi nhiều Payment 1 lần (INSERT executemany) rồi tính lại paid_total/balance
+    và trạng thái cho các hóa đơn bị ảnh hưởng bằng 1 lần recompute theo nhóm.
+    Không commit. Trả về danh sách invoice_id đã cập nhật.
+    """
+    if not rows:
+        return []
+    db.session.execute(insert(Payment), rows)
+    ids = sorted({int(r["invoice_id"]) for r in rows})
+    inv_dao.rebuild_paid_totals(ids)
+    inv_dao.recompute_statuses(ids)
+    return ids
+
+
+def _ensure_not_allocation(p: Payment) -> None:
+    if p.supplier_payment_id:
+        raise ValueError(
+            f"Thanh toán thuộc chứng từ SP#{p.supplier_payment_id}, "
+            "hãy sửa/xóa trên chứng từ thanh toán."
+        )
 
 
 def get_payment(payment_id: int) -> Optional[Payment]:
@@ -29,8 +61,8 @@ def create_payment(invoice_id: int, amount, method: str) -> Payment:
     p = Payment(invoice_id=int(invoice_id), amount=_d(amount), method=method)
     db.session.add(p)
     db.session.flush()
-    inv = VendorInvoice.query.get(p.invoice_id)
-    inv_dao._update_status_by_payments(inv)
+    inv_dao.apply_payment_delta(p.invoice_id, p.amount)
+    _refresh_invoice_status(p.invoice_id)
     _commit()
     return p
 
@@ -39,22 +71,32 @@ def update_payment(payment_id: int, invoice_id: int, amount, method: str) -> Pay
     if Decimal(str(amount or 0)) <= 0:
         raise ValueError("Số tiền thanh toán phải > 0.")
     p = Payment.query.get_or_404(payment_id)
+    _ensure_not_allocation(p)
+    old_invoice_id, old_amount = p.invoice_id, _d(p.amount)
     p.invoice_id = int(invoice_id)
     p.amount = _d(amount)
     p.method = method
     db.session.flush()
-    inv = VendorInvoice.query.get(p.invoice_id)
-    inv_dao._update_status_by_payments(inv)
+
+    if p.invoice_id != old_invoice_id:
+        # chuyển payment sang hóa đơn khác -> trả lại số tiền cho hóa đơn cũ
+        inv_dao.apply_payment_delta(old_invoice_id, -old_amount)
+        inv_dao.apply_payment_delta(p.invoice_id, p.amount)
+        _refresh_invoice_status(old_invoice_id)
+    else:
+        inv_dao.apply_payment_delta(p.invoice_id, p.amount - old_amount)
+    _refresh_invoice_status(p.invoice_id)
     _commit()
     return p
 
 
 def delete_payment(payment_id: int) -> None:
     p = Payment.query.get_or_404(payment_id)
-    inv_id = p.invoice_id
+    _ensure_not_allocation(p)
+    inv_id, amount = p.invoice_id, _d(p.amount)
     db.session.delete(p)
     db.session.flush()
 
-    inv = VendorInvoice.query.get(inv_id)
-    inv_dao._update_status_by_payments(inv)
+    inv_dao.apply_payment_delta(inv_id, -amount)
+    _refresh_invoice_status(inv_id)
     _commit()
@@ -0,0 +1,139 @@
+# dao/payment_run.py
+"""
+Đợt thanh toán (payment run): chọn nhiều hóa đơn còn nợ, đề xuất số tiền,
+rồi ghi tất cả Payment trong 1 transaction:
+  - 1 câu INSERT executemany cho các Payment
+  - 1 câu UPDATE paid_total/balance từ tổng Payment theo hóa đơn
+  - 1 câu UPDATE ... CASE tính lại trạng thái
+Chưa có cột hạn thanh toán -> lọc/sắp theo ngày hóa đơn (issued_at).
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select
+from sqlalchemy.exc import SQLAlchemyError
+from configs import db
+from db.models.invoice_payment import VendorInvoice, PaymentStatus
+from dao import invoice as inv_dao, payment as pay_dao, report as report_dao
+
+# chỉ hóa đơn đã duyệt / trả một phần mới được đưa vào đợt thanh toán
+PAYABLE_STATUSES = [PaymentStatus.VALIDATED, PaymentStatus.PARTIALLY_PAID]
+
+OK = "OK"
+SKIPPED = "SKIPPED"
+
+
+def _d(x) -> Decimal:
+    return Decimal(str(x or 0))
+
+
+def _commit():
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    report_dao.invalidate_ap_aging()
+
+
+def propose_payment_run(
+    supplier_id: Optional[int] = None,
+    issued_before: Optional[object] = None,
+    min_balance=None,
+    limit: int = 500,
+) -> List[Dict]:
+    """
+    Đề xuất đợt thanh toán: hóa đơn còn nợ, lọc theo NCC / ngày HĐ / số dư,
+    hóa đơn cũ trước. Số tiền đề xuất = toàn bộ số còn nợ.
+    """
+    stmt = inv_dao._register_select().where(
+        VendorInvoice.status.in_(PAYABLE_STATUSES),
+        VendorInvoice.balance > max(_d(min_balance), Decimal("0")),
+    )
+    if supplier_id:
+        stmt = stmt.where(VendorInvoice.supplier_id == int(supplier_id))
+    cutoff = inv_dao._to_date(issued_before)
+    if cutoff:
+        stmt = stmt.where(VendorInvoice.issued_at <= cutoff)
+    rows = db.session.execute(
+        stmt.order_by(
+            VendorInvoice.issued_at.asc().nullsfirst(), VendorInvoice.id
+        ).limit(limit)
+    ).all()
+    return [dict(r._mapping, amount=r.balance) for r in rows]
+
+
+def _merge_items(items: Iterable[Dict]) -> Dict[int, Decimal]:
+    amounts: Dict[int, Decimal] = {}
+    for it in items or []:
+        if not it.get("invoice_id"):
+            continue
+        iid = int(it["invoice_id"])
+        amounts[iid] = amounts.get(iid, Decimal("0")) + _d(it.get("amount"))
+    return amounts
+
+
+def execute_payment_run(
+    items: Iterable[Dict], method: str = "bank", note: Optional[str] = None
+) -> List[Dict]:
+    """
+    items: [{invoice_id, amount}]. Hóa đơn không hợp lệ bị bỏ qua (SKIPPED),
+    các hóa đơn còn lại được thanh toán trong 1 commit.
+    Trả về báo cáo theo hóa đơn: {invoice_id, amount, result, message, status, balance}.
+    """
+    amounts = _merge_items(items)
+    if not amounts:
+        raise ValueError("Chưa chọn hóa đơn nào để thanh toán.")
+
+    invoices = {
+        inv.id: inv
+        for inv in db.session.scalars(
+            select(VendorInvoice)
+            .where(VendorInvoice.id.in_(list(amounts)))
+            .with_for_update()
+        )
+    }
+
+    report: Dict[int, Dict] = {}
+    to_pay: Dict[int, Decimal] = {}
+    for iid, amount in amounts.items():
+        inv = invoices.get(iid)
+        msg = None
+        if not inv:
+            msg = "Hóa đơn không tồn tại."
+        elif inv.status not in PAYABLE_STATUSES:
+            msg = f"Trạng thái {inv.status.value} không cho phép thanh toán."
+        elif amount <= 0:
+            msg = "Số tiền thanh toán phải > 0."
+        elif amount > _d(inv.balance):
+            msg = "Số tiền vượt quá số còn nợ."
+        report[iid] = {
+            "invoice_id": iid,
+            "amount": amount,
+            "result": SKIPPED if msg else OK,
+            "message": msg or "",
+        }
+        if not msg:
+            to_pay[iid] = amount
+
+    if to_pay:
+        paid_at = datetime.utcnow()
+        pay_dao.post_payments(
+            [
+                {
+                    "invoice_id": iid,
+                    "amount": amount,
+                    "method": method,
+                    "paid_at": paid_at,
+                    "note": note,
+                }
+                for iid, amount in to_pay.items()
+            ]
+        )
+        _commit()
+
+    for iid, r in report.items():
+        inv = invoices.get(iid)
+        r["status"] = inv.status.value if inv else None
+        r["balance"] = inv.balance if inv else None
+    return [report[iid] for iid in sorted(report)]
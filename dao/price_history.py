@@ -0,0 +1,210 @@
+# dao/price_history.py
+"""
+Bảng material_price_history: giá mua theo (vật tư, NCC, ngày), mỗi chứng từ
+nguồn 1 dòng / vật tư (giá bình quân gia quyền trên chứng từ).
+
+- PO lưu ở trạng thái CONFIRMED/COMPLETED -> refresh_for_po(po_id)
+- Hóa đơn NCC tạo/sửa (khác CANCELED)     -> refresh_for_invoice(invoice_id)
+- price_hints(material_ids, supplier_id)   -> giá gần nhất + bình quân 12 tháng,
+  1 câu SELECT cho cả lô vật tư (window function).
+Các hàm ghi chỉ ghi vào session, commit do DAO gọi đảm nhận (cùng transaction).
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, Optional
+from sqlalchemy import func, select, delete, literal, case
+from configs import db
+from db.models.price_history import MaterialPriceHistory
+from db.models.purchase import PurchaseOrder, PurchaseOrderItem, POStatus
+from db.models.invoice_payment import VendorInvoice, InvoiceLine, PaymentStatus
+
+SOURCE_PO = "PO"
+SOURCE_INV = "INV"
+
+# PO đã xác nhận mới được ghi nhận giá
+PO_PRICED_STATUSES = [POStatus.CONFIRMED, POStatus.COMPLETED]
+
+HINT_MONTHS = 12
+
+_COLS = ["material_id", "supplier_id", "price_date", "price", "qty", "source"]
+
+
+def _avg_price(line_total, qty):
+    return func.round(func.sum(line_total) / func.nullif(func.sum(qty), 0), 2)
+
+
+def _po_select(po_id: Optional[int]):
+    price_date = func.coalesce(func.date(PurchaseOrder.order_date), func.current_date())
+    stmt = (
+        select(
+            PurchaseOrderItem.material_id,
+            PurchaseOrder.supplier_id,
+            price_date,
+            _avg_price(PurchaseOrderItem.line_total, PurchaseOrderItem.qty),
+            func.sum(PurchaseOrderItem.qty),
+            literal(SOURCE_PO),
+            PurchaseOrder.id,
+        )
+        .join(PurchaseOrder, PurchaseOrder.id == PurchaseOrderItem.po_id)
+        .where(
+            PurchaseOrder.status.in_(PO_PRICED_STATUSES), PurchaseOrderItem.qty > 0
+        )
+        .group_by(
+            PurchaseOrder.id,
+            PurchaseOrder.supplier_id,
+            price_date,
+            PurchaseOrderItem.material_id,
+        )
+    )
+    if po_id is not None:
+        stmt = stmt.where(PurchaseOrder.id == int(po_id))
+    return stmt
+
+
+def _invoice_select(invoice_id: Optional[int]):
+    price_date = func.coalesce(VendorInvoice.issued_at, func.current_date())
+    stmt = (
+        select(
+            InvoiceLine.material_id,
+            VendorInvoice.supplier_id,
+            price_date,
+            _avg_price(InvoiceLine.line_total, InvoiceLine.qty),
+            func.sum(InvoiceLine.qty),
+            literal(SOURCE_INV),
+            VendorInvoice.id,
+        )
+        .join(VendorInvoice, VendorInvoice.id == InvoiceLine.invoice_id)
+        .where(VendorInvoice.status != PaymentStatus.CANCELED, InvoiceLine.qty > 0)
+        .group_by(
+            VendorInvoice.id,
+            VendorInvoice.supplier_id,
+            price_date,
+            InvoiceLine.material_id,
+        )
+    )
+    if invoice_id is not None:
+        stmt = stmt.where(VendorInvoice.id == int(invoice_id))
+    return stmt
+
+
+def _rebuild(po_id=None, invoice_id=None, *, po=True, invoice=True) -> None:
+    """DELETE + INSERT ... SELECT lại các dòng giá (1 chứng từ hoặc toàn bộ)."""
+    db.session.flush()
+    t = MaterialPriceHistory.__table__
+    if po:
+        purge = delete(t).where(t.c.source == SOURCE_PO)
+        if po_id is not None:
+            purge = purge.where(t.c.po_id == int(po_id))
+        db.session.execute(purge)
+        db.session.execute(
+            t.insert().from_select(_COLS + ["po_id"], _po_select(po_id))
+        )
+    if invoice:
+        purge = delete(t).where(t.c.source == SOURCE_INV)
+        if invoice_id is not None:
+            purge = purge.where(t.c.invoice_id == int(invoice_id))
+        db.session.execute(purge)
+        db.session.execute(
+            t.insert().from_select(_COLS + ["invoice_id"], _invoice_select(invoice_id))
+        )
+
+
+def refresh_for_po(po_id: int) -> None:
+    """Ghi lại giá của 1 PO (không còn CONFIRMED/COMPLETED -> xóa khỏi lịch sử)."""
+    _rebuild(po_id=int(po_id), invoice=False)
+
+
+def refresh_for_invoice(invoice_id: int) -> None:
+    """Ghi lại giá của 1 hóa đơn NCC (CANCELED -> xóa khỏi lịch sử)."""
+    _rebuild(invoice_id=int(invoice_id), po=False)
+
+
+def rebuild_all() -> None:
+    """Job backfill / sửa dữ liệu: dựng lại toàn bộ bảng từ PO và hóa đơn."""
+    _rebuild()
+
+
+def _months_back(d: date, months: int) -> date:
+    y, m = divmod(d.year * 12 + (d.month - 1) - int(months), 12)
+    return date(y, m + 1, min(d.day, 28))
+
+
+def price_hints(
+    material_ids: Iterable[int],
+    supplier_id: Optional[int] = None,
+    months: int = HINT_MONTHS,
+    as_of: Optional[date] = None,
+) -> Dict[int, Dict]:
+    """
+    Gợi ý giá cho nhiều vật tư trong 1 câu SELECT:
+      {material_id: {last_price, last_date, last_supplier_id,
+                     supplier_last_price, supplier_last_date,
+                     avg_price, avg_qty, samples}}
+    avg_price = bình quân gia quyền theo qty trong `months` tháng gần nhất.
+    supplier_last_*: giá gần nhất của chính NCC `supplier_id` (nếu truyền).
+    """
+    ids = sorted({int(x) for x in material_ids or [] if x})
+    if not ids:
+        return {}
+    h = MaterialPriceHistory
+    since = _months_back(as_of or date.today(), months)
+
+    ranked = (
+        select(
+            h.material_id,
+            h.supplier_id,
+            h.price_date,
+            h.price,
+            h.qty,
+            func.row_number()
+            .over(
+                partition_by=h.material_id,
+                order_by=(h.price_date.desc(), h.id.desc()),
+            )
+            .label("rn"),
+            func.row_number()
+            .over(
+                partition_by=(h.material_id, h.supplier_id),
+                order_by=(h.price_date.desc(), h.id.desc()),
+            )
+            .label("rn_sup"),
+        )
+        .where(h.material_id.in_(ids))
+        .subquery("ranked")
+    )
+    r = ranked.c
+    is_last = r.rn == 1
+    in_window = r.price_date >= since
+    is_sup_last = (r.rn_sup == 1) & (r.supplier_id == int(supplier_id or 0))
+
+    stmt = select(
+        r.material_id,
+        func.max(case((is_last, r.price))).label("last_price"),
+        func.max(case((is_last, r.price_date))).label("last_date"),
+        func.max(case((is_last, r.supplier_id))).label("last_supplier_id"),
+        func.max(case((is_sup_last, r.price))).label("supplier_last_price"),
+        func.max(case((is_sup_last, r.price_date))).label("supplier_last_date"),
+        func.sum(case((in_window, r.price * r.qty), else_=0)).label("amount"),
+        func.sum(case((in_window, r.qty), else_=0)).label("qty"),
+        func.count(case((in_window, 1))).label("samples"),
+    ).group_by(r.material_id)
+
+    out: Dict[int, Dict] = {}
+    for row in db.session.execute(stmt):
+        qty = Decimal(str(row.qty or 0))
+        avg = (
+            (Decimal(str(row.amount or 0)) / qty).quantize(Decimal("0.01"))
+            if qty > 0
+            else None
+        )
+        out[row.material_id] = {
+            "last_price": row.last_price,
+            "last_date": row.last_date,
+            "last_supplier_id": row.last_supplier_id,
+            "supplier_last_price": row.supplier_last_price,
+            "supplier_last_date": row.supplier_last_date,
+            "avg_price": avg,
+            "avg_qty": qty,
+            "samples": int(row.samples or 0),
+        }
+    return out
@@ -5,6 +5,8 @@ from decimal import Decimal
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func, case
 from configs import db
+from dao import doc_number, price_history
+from utils.db_errors import translate_integrity_errors
 from db.models.purchase import PurchaseOrder, PurchaseOrderItem, POStatus
 from db.models.goods_receipt import GoodsReceipt, GRLine, GRStatus
 from db.models.vendor_quotation import (
@@ -91,6 +93,13 @@ def get_po(po_id: int) -> Optional[PurchaseOrder]:
     return PurchaseOrder.query.get(po_id)
 
 
+# vi phạm ràng buộc DB -> thông báo nghiệp vụ (xem utils/db_errors.py)
+_UNIQUE_MESSAGES = {
+    "uq_purchase_order_vq_id": "VQ này đã được dùng để tạo PO khác.",
+    "purchase_order_po_no_key": "Số PO đã tồn tại, vui lòng nhập số khác.",
+}
+
+
 # ---------------- helpers ----------------
 def _require_selected_vq(vq_id: int) -> VendorQuotation:
     """Lấy VQ và đảm bảo VQ.SELECTED, nếu không raise lỗi."""
@@ -102,19 +111,6 @@ def _require_selected_vq(vq_id: int) -> VendorQuotation:
     return vq
 
 
-def _ensure_vq_not_used(vq_id: int, exclude_po_id: int | None = None) -> None:
-    """
-    Đảm bảo VQ chưa được gán cho PO nào khác (rule #1: one VQ -> one PO).
-    exclude_po_id: bỏ qua PO hiện tại khi update.
-    """
-    qry = PurchaseOrder.query.filter(PurchaseOrder.vq_id == int(vq_id))
-    if exclude_po_id:
-        qry = qry.filter(PurchaseOrder.id != int(exclude_po_id))
-    exists = db.session.query(qry.exists()).scalar()
-    if exists:
-        raise ValueError("VQ này đã được dùng để tạo PO khác.")
-
-
 def _parse_date(s: str | None):
     if not s:
         return None
@@ -130,6 +126,7 @@ def _commit():
 
 
 # ---------------- mutations ----------------
+@translate_integrity_errors(_UNIQUE_MESSAGES)
 def create_po(
     po_no: str,
     supplier_id: int,
@@ -142,8 +139,7 @@ def create_po(
     vq_id: int | None = None,
 ) -> PurchaseOrder:
     # Rule: bắt buộc VQ SELECTED + chưa bị dùng (rule #1)
-    vq = _require_selected_vq(vq_id)
-    _ensure_vq_not_used(vq.id)  # one VQ -> one PO
+    vq = _require_selected_vq(vq_id)  # one VQ -> one PO: uq_purchase_order_vq_id
 
     # (khuyến nghị) nhà cung cấp phải trùng với VQ
     if vq.supplier_id and int(supplier_id) != int(vq.supplier_id):
@@ -152,7 +148,7 @@ def create_po(
         )
 
     po = PurchaseOrder(
-        po_no=po_no.strip(),
+        po_no=(po_no or "").strip() or doc_number.next_number("PO"),
         supplier_id=int(supplier_id),
         status=_to_po_status(status),
         order_date=_parse_date(order_date),
@@ -163,10 +159,13 @@ def create_po(
         vq_id=int(vq.id),
     )
     db.session.add(po)
+    db.session.flush()
+    price_history.refresh_for_po(po.id)
     _commit()
     return po
 
 
+@translate_integrity_errors(_UNIQUE_MESSAGES)
 def update_po(
     po_id: int,
     po_no: str,
@@ -185,9 +184,9 @@ def update_po(
     if po.status == POStatus.CONFIRMED:
         raise ValueError("PO đã CONFIRMED, không thể chỉnh sửa.")
 
-    # Rule: nếu gán/đổi VQ -> VQ phải SELECTED và chưa bị dùng bởi PO khác (rule #1)
+    # Rule: nếu gán/đổi VQ -> VQ phải SELECTED và chưa bị dùng bởi PO khác (rule #1,
+    # unique uq_purchase_order_vq_id)
     vq = _require_selected_vq(vq_id)
-    _ensure_vq_not_used(vq.id, exclude_po_id=po.id)
 
     # (khuyến nghị) nhà cung cấp phải trùng với VQ
     if vq.supplier_id and int(supplier_id) != int(vq.supplier_id):
@@ -195,7 +194,7 @@ def update_po(
             "Nhà cung cấp của PO phải trùng với nhà cung cấp của VQ đã chọn."
         )
 
-    po.po_no = po_no.strip()
+    po.po_no = (po_no or "").strip() or po.po_no
     po.supplier_id = int(supplier_id)
     po.status = _to_po_status(status)
     po.order_date = _parse_date(order_date)
@@ -205,6 +204,7 @@ def update_po(
     po.total = Decimal(str(total or 0))
     po.vq_id = int(vq.id)
 
+    price_history.refresh_for_po(po.id)
     _commit()
     return po
 
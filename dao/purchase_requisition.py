@@ -1,4 +1,5 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable
+from sqlalchemy import select, update
 from sqlalchemy.exc import SQLAlchemyError
 from configs import db
 from db.models.purchase_requisition import (
@@ -9,6 +10,10 @@ from db.models.purchase_requisition import (
 from flask_login import current_user
 from db.models.user import UserRole
 
+# kết quả theo chứng từ của thao tác hàng loạt
+OK = "OK"
+SKIPPED = "SKIPPED"
+
 
 def get_pr_lines_as_dicts(pr_id: int) -> List[Dict]:
     """Trả về list dict [{'material_id':..,'qty':..}] từ PR."""
@@ -47,6 +52,14 @@ def create_pr(requester_id: int, note: str | None, lines: List[Dict]):
     return pr
 
 
+def _is_buyer() -> bool:
+    raw_role = getattr(current_user, "role", None)
+    role_value = (
+        raw_role.value if hasattr(raw_role, "value") else str(raw_role or "").upper()
+    )
+    return (role_value == UserRole.BUYER.value) or (role_value == "BUYER")
+
+
 def update_pr(
     pr_id: int,
     requester_id: int,
@@ -60,17 +73,11 @@ def update_pr(
     if pr.status == PurchaseRequisitionStatus.APPROVED:
         raise ValueError("PR đã APPROVED, không thể chỉnh sửa.")
 
-    raw_role = getattr(current_user, "role", None)
-    role_value = (
-        raw_role.value if hasattr(raw_role, "value") else str(raw_role or "").upper()
-    )
-    is_buyer = (role_value == UserRole.BUYER.value) or (role_value == "BUYER")
-
     status_upper = (status or "").upper()
     is_setting_to_approved = status_upper == PurchaseRequisitionStatus.APPROVED.value
 
     # BUYER: cấm chuyển sang APPROVED
-    if is_buyer and is_setting_to_approved:
+    if _is_buyer() and is_setting_to_approved:
         raise ValueError("Không được chuyển PR sang trạng thái APPROVED.")
 
     # ---- update fields ----
@@ -96,6 +103,68 @@ def update_pr(
     return pr
 
 
+def bulk_set_status(pr_ids: Iterable[int], status: str) -> List[Dict]:
+    """
+    Đổi trạng thái nhiều PR (duyệt/từ chối hàng loạt), không đụng tới dòng PR:
+      - 1 câu SELECT ... FOR UPDATE để kiểm tra
+      - 1 câu UPDATE cho các PR hợp lệ
+    Luật giống update_pr: PR đã APPROVED bị khóa, BUYER không được APPROVED.
+    Trả về [{id, result (OK/SKIPPED), message, status}].
+    """
+    try:
+        target = PurchaseRequisitionStatus((status or "").strip().upper())
+    except ValueError:
+        raise ValueError(f"Trạng thái PR không hợp lệ: {status}")
+    ids = sorted({int(x) for x in pr_ids or [] if x})
+    if not ids:
+        raise ValueError("Chưa chọn PR nào.")
+    if _is_buyer() and target == PurchaseRequisitionStatus.APPROVED:
+        raise ValueError("Không được chuyển PR sang trạng thái APPROVED.")
+
+    current = dict(
+        db.session.execute(
+            select(PurchaseRequisition.id, PurchaseRequisition.status)
+            .where(PurchaseRequisition.id.in_(ids))
+            .with_for_update()
+        ).all()
+    )
+
+    report: List[Dict] = []
+    ok_ids: List[int] = []
+    for pid in ids:
+        st = current.get(pid)
+        msg = None
+        if st is None:
+            msg = "PR không tồn tại."
+        elif st == PurchaseRequisitionStatus.APPROVED:
+            msg = "PR đã APPROVED, không thể chỉnh sửa."
+        elif st == target:
+            msg = f"PR đã ở trạng thái {target.value}."
+        report.append(
+            {
+                "id": pid,
+                "result": SKIPPED if msg else OK,
+                "message": msg or "",
+                "status": (st if msg else target).value if st else None,
+            }
+        )
+        if not msg:
+            ok_ids.append(pid)
+
+    if ok_ids:
+        db.session.execute(
+            update(PurchaseRequisition)
+            .where(
+                PurchaseRequisition.id.in_(ok_ids),
+                PurchaseRequisition.status != PurchaseRequisitionStatus.APPROVED,
+            )
+            .values(status=target)
+            .execution_options(synchronize_session="fetch")
+        )
+        _commit()
+    return report
+
+
 def delete_pr(pr_id: int):
     pr = PurchaseRequisition.query.get_or_404(pr_id)
     db.session.delete(pr)
@@ -1,12 +1,11 @@
 # dao/purchase_return.py
-from typing import Optional, List, Dict, Iterable
+from typing import Optional, List, Dict
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy import func
 from configs import db
 from db.models.purchase_return import PurchaseReturn, ReturnLine, PurchaseReturnStatus
 from db.models.goods_receipt import GRLine, GoodsReceipt
-from db.models.inventory import StockMovement
-from dao import inventory as inv_dao
+from dao import inventory as inv_dao, return_balance as ret_bal
 
 # Map từ form string -> Enum
 _RET_FORM_TO_ENUM = {
@@ -47,85 +46,38 @@ def _commit():
         raise
 
 
-# ----- helper: qty đã nhập kho theo QC_PASS cho từng GR line -----
-def _accepted_qty_map_for_gr(gr_id: int) -> dict[int, float]:
-    """
-    Tổng qty đã nhập kho từ QC_PASS theo từng GR line.
-    Tính từ StockMovement(ref_type='QC_PASS', +qty).
-    """
-    rows = (
-        db.session.query(
-            StockMovement.ref_id,
-            StockMovement.material_id,
-            func.sum(StockMovement.qty_change),
-        )
-        .filter(StockMovement.ref_type == "QC_PASS")
-        .group_by(StockMovement.ref_id, StockMovement.material_id)
-        .all()
-    )
-    # ref_id ở đây là qc_id; cần map về gr_line? -> ta suy luận qua QCLine đã được dùng khi post
-    # Đơn giản hơn: dựa trực tiếp trên bảng QCLine nếu bạn có accepted_qty; nhưng để độc lập, ta tính “được trả tối đa”
-    # theo từng gr_line bằng:
-    #   accepted_qty(gr_line) = SUM(QC_PASS movements của chính material và thuộc GR có line này)
-    # Vì movement không lưu gr_line_id, ta quay về cách trực tiếp:
-    #   Lấy accepted_qty từ QCLine nếu có cột accepted_qty. Nếu không có, coi PASS = full gr_line.qty.
-    from db.models.qc import QCLine, QCReport, QCStatus
-
-    q = (
-        db.session.query(QCLine.gr_line_id, func.sum(QCLine.accepted_qty))
-        .join(QCReport, QCReport.id == QCLine.qc_id)
-        .join(GRLine, GRLine.id == QCLine.gr_line_id)
-        .filter(QCReport.status == QCStatus.PASSED, GRLine.gr_id == gr_id)
-        .group_by(QCLine.gr_line_id)
-    )
-    acc = {gid: float(t or 0) for gid, t in q.all()}
-    # Nếu chưa có cột accepted_qty, fallback PASS = full line.qty
-    if not hasattr(QCLine, "accepted_qty"):
-        q2 = (
-            db.session.query(QCLine.gr_line_id, func.sum(GRLine.qty))
-            .join(QCReport, QCReport.id == QCLine.qc_id)
-            .join(GRLine, GRLine.id == QCLine.gr_line_id)
-            .filter(
-                QCReport.status == QCStatus.PASSED,
-                GRLine.gr_id == gr_id,
-                func.lower(QCLine.result) == "pass",
-            )
-            .group_by(QCLine.gr_line_id)
-        )
-        for gid, t in q2.all():
-            acc[gid] = float(t or 0)
-    return acc
+def _qty_by_gr_line(lines) -> dict[int, float]:
+    """Gộp qty theo gr_line_id (nhận list dict hoặc list ReturnLine)."""
+    out: dict[int, float] = {}
+    for ln in lines or []:
+        if isinstance(ln, dict):
+            gid, qty = int(ln["gr_line_id"]), float(ln["qty"] or 0)
+        else:
+            gid, qty = int(ln.gr_line_id), float(ln.qty or 0)
+        out[gid] = out.get(gid, 0.0) + qty
+    return out
 
 
-# ----- helper: qty đã POSTED trả về NCC theo từng GR line -----
-def _returned_qty_map_for_gr(
-    gr_id: int, exclude_return_id: int | None = None
-) -> dict[int, float]:
-    q = (
+def _posted_qty_map(return_id: int) -> dict[int, float]:
+    rows = (
         db.session.query(ReturnLine.gr_line_id, func.sum(ReturnLine.qty))
         .join(PurchaseReturn, PurchaseReturn.id == ReturnLine.return_id)
         .filter(
-            PurchaseReturn.gr_id == gr_id,
+            ReturnLine.return_id == return_id,
             PurchaseReturn.status == PurchaseReturnStatus.POSTED,
         )
+        .group_by(ReturnLine.gr_line_id)
+        .all()
     )
-    if exclude_return_id:
-        q = q.filter(PurchaseReturn.id != exclude_return_id)
-    q = q.group_by(ReturnLine.gr_line_id).all()
-    return {gid: float(t or 0) for gid, t in q}
+    return {gid: float(t or 0) for gid, t in rows}
 
 
-# API nội bộ: số còn có thể trả cho từng gr_line
+# API nội bộ: số còn có thể trả cho từng gr_line (đọc từ gr_line_return_balance)
 def remaining_to_return_by_gr(
     gr_id: int, exclude_return_id: int | None = None
 ) -> dict[int, float]:
-    acc = _accepted_qty_map_for_gr(gr_id)
-    ret = _returned_qty_map_for_gr(gr_id, exclude_return_id=exclude_return_id)
-    remain = {}
-    for gid, a in acc.items():
-        r = ret.get(gid, 0.0)
-        remain[gid] = max(0.0, a - r)
-    return remain
+    released = _posted_qty_map(exclude_return_id) if exclude_return_id else None
+    return ret_bal.remaining_for_gr(gr_id, released=released)
 
 
 # ========================= CRUD =========================
@@ -143,9 +95,7 @@ def create_return(gr_id: int, status: str, lines: List[Dict]) -> PurchaseReturn:
     db.session.flush()
 
     _assert_lines_belong_to_gr(gr_id=int(gr_id), lines=lines)
-    _validate_lines_against_remaining(
-        gr_id=int(gr_id), lines=lines, exclude_return_id=None
-    )
+    _validate_lines_against_remaining(gr_id=int(gr_id), lines=lines)
 
     for ln in lines or []:
         db.session.add(
@@ -157,6 +107,8 @@ def create_return(gr_id: int, status: str, lines: List[Dict]) -> PurchaseReturn:
             )
         )
     _post_if_needed(r)
+    if r.status == PurchaseReturnStatus.POSTED:
+        ret_bal.apply_returned_deltas(_qty_by_gr_line(lines))
     _commit()
     return r
 
@@ -176,6 +128,11 @@ def update_return(
     if old_status == PurchaseReturnStatus.POSTED and int(gr_id) != r.gr_id:
         raise ValueError("Phiếu trả hàng đã POSTED, không được đổi GR.")
 
+    # qty đã POSTED của chính phiếu này (được "nhả" lại khi validate/ghi cân đối)
+    old_posted = (
+        _qty_by_gr_line(r.lines) if old_status == PurchaseReturnStatus.POSTED else {}
+    )
+
     r.gr_id = int(gr_id)
     r.status = new_status
 
@@ -184,7 +141,7 @@ def update_return(
 
     _assert_lines_belong_to_gr(gr_id=r.gr_id, lines=lines)
     _validate_lines_against_remaining(
-        gr_id=r.gr_id, lines=lines, exclude_return_id=r.id
+        gr_id=r.gr_id, lines=lines, released=old_posted
     )
 
     for ln in lines or []:
@@ -198,6 +155,15 @@ def update_return(
         )
 
     _post_if_needed(r)
+    new_posted = (
+        _qty_by_gr_line(lines) if new_status == PurchaseReturnStatus.POSTED else {}
+    )
+    ret_bal.apply_returned_deltas(
+        {
+            gid: new_posted.get(gid, 0.0) - old_posted.get(gid, 0.0)
+            for gid in set(new_posted) | set(old_posted)
+        }
+    )
     _commit()
     return r
 
@@ -207,6 +173,9 @@ def delete_return(return_id: int) -> None:
     # rollback movement nếu đã POSTED
     if r.status == PurchaseReturnStatus.POSTED:
         inv_dao.remove_movements("RETURN", r.id)
+        ret_bal.apply_returned_deltas(
+            {gid: -qty for gid, qty in _qty_by_gr_line(r.lines).items()}
+        )
     db.session.delete(r)
     _commit()
 
@@ -241,9 +210,9 @@ def _post_if_needed(r: PurchaseReturn) -> None:
 
 # ========================= Validate =========================
 def _validate_lines_against_remaining(
-    gr_id: int, lines: List[Dict], exclude_return_id: int | None
+    gr_id: int, lines: List[Dict], released: Dict[int, float] | None = None
 ):
-    remain = remaining_to_return_by_gr(gr_id, exclude_return_id=exclude_return_id)
+    remain = ret_bal.remaining_for_gr(gr_id, released=released)
     for ln in lines or []:
         gid = int(ln["gr_line_id"])
         qty = float(ln["qty"] or 0)
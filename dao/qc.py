@@ -10,7 +10,8 @@ from db.models.qc import QCReport as QC, QCLine, QCStatus
 from db.models.goods_receipt import GoodsReceipt, GRLine as GoodsReceiptLine
 from db.models.inventory import StockMovement
 from db.models.material import Material
-from dao import inventory as inv_dao
+from dao import inventory as inv_dao, return_balance as ret_bal
+from dao import invoice_match as inv_match
 
 
 # ---------- helpers ----------
@@ -136,6 +137,10 @@ def create_qc(gr_id: Optional[int], status: str, lines: List[Dict]) -> QC:
 
         db.session.add(qc_line)
 
+    if qc.status == QCStatus.PASSED:
+        ret_bal.refresh_for_gr(qc.gr_id)
+        # số nhận đạt thay đổi -> đối chiếu lại hóa đơn của PO
+        inv_match.match_invoices_for_po(gr.po_id)
     _commit()
     return qc
 
@@ -235,6 +240,10 @@ def update_qc(
     _set_checked_at(old_status, new_status, qc)
 
     _save_qc_lines(qc, lines)
+    if qc.status == QCStatus.PASSED:
+        ret_bal.refresh_for_gr(qc.gr_id)
+        # số nhận đạt thay đổi -> đối chiếu lại hóa đơn của PO
+        inv_match.match_invoices_for_po(db.session.get(GoodsReceipt, qc.gr_id).po_id)
     _commit()
     return qc
 
@@ -289,6 +298,10 @@ def finalize_qc(qc_id: int, status: str, lines: List[Dict]) -> QC:
         if affected:
             inv_dao.sync_stock_items(affected)
 
+        ret_bal.refresh_for_gr(qc.gr_id)
+        # số nhận đạt thay đổi -> đối chiếu lại hóa đơn của PO
+        inv_match.match_invoices_for_po(qc.gr.po_id)
+
     _commit()
     return qc
 
@@ -0,0 +1,130 @@
+# dao/report.py
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional
+from flask import current_app
+from sqlalchemy import func, select, or_
+from configs import db
+from db.models.invoice_payment import VendorInvoice, Payment, PaymentStatus
+from db.models.supplier import Supplier
+from dao import cache_version
+from utils.cache import cache
+from utils.db_pool import reports_bind
+
+AP_AGING_CACHE = "ap_aging"
+
+# (key, nhãn, tuổi nợ tối thiểu, tối đa) — tuổi tính theo ngày từ issued_at
+AGING_BUCKETS = [
+    ("current", "0-30", None, 30),
+    ("d31_60", "31-60", 31, 60),
+    ("d61_90", "61-90", 61, 90),
+    ("d90_plus", "90+", 91, None),
+]
+
+_AGING_STATUSES = [
+    PaymentStatus.VALIDATED,
+    PaymentStatus.PARTIALLY_PAID,
+    PaymentStatus.PAID,
+]
+
+
+def _to_date(v) -> date:
+    if not v:
+        return date.today()
+    if isinstance(v, datetime):
+        return v.date()
+    if isinstance(v, date):
+        return v
+    return datetime.strptime(str(v).strip(), "%Y-%m-%d").date()
+
+
+def _aging_select(as_of: date):
+    """1 câu aggregate: còn nợ tại as_of theo NCC, chia bucket bằng FILTER."""
+    paid = (
+        select(
+            Payment.invoice_id.label("invoice_id"),
+            func.sum(Payment.amount).label("paid"),
+        )
+        .where(Payment.paid_at < datetime.combine(as_of + timedelta(days=1), time.min))
+        .group_by(Payment.invoice_id)
+        .subquery("paid")
+    )
+    bal = func.coalesce(VendorInvoice.total, 0) - func.coalesce(paid.c.paid, 0)
+    issued = VendorInvoice.issued_at
+
+    cols = []
+    for key, _, min_age, max_age in AGING_BUCKETS:
+        conds = []
+        if max_age is not None:  # tuổi <= max_age  <=> issued_at >= as_of - max_age
+            conds.append(issued >= as_of - timedelta(days=max_age))
+        if min_age is not None:
+            conds.append(issued <= as_of - timedelta(days=min_age))
+        cond = conds[0] if len(conds) == 1 else conds[0] & conds[1]
+        if min_age is None:  # chưa có ngày HĐ -> coi như trong hạn
+            cond = or_(issued.is_(None), cond)
+        cols.append(func.coalesce(func.sum(bal).filter(cond), 0).label(key))
+
+    return (
+        select(
+            Supplier.id.label("supplier_id"),
+            Supplier.code.label("supplier_code"),
+            Supplier.name.label("supplier_name"),
+            *cols,
+            func.sum(bal).label("total"),
+            func.count(VendorInvoice.id).label("invoice_count"),
+        )
+        .select_from(VendorInvoice)
+        .join(Supplier, Supplier.id == VendorInvoice.supplier_id)
+        .outerjoin(paid, paid.c.invoice_id == VendorInvoice.id)
+        .where(
+            VendorInvoice.status.in_(_AGING_STATUSES),
+            or_(issued.is_(None), issued <= as_of),
+        )
+        .group_by(Supplier.id, Supplier.code, Supplier.name)
+        .having(func.sum(bal) != 0)
+        .order_by(Supplier.name)
+    )
+
+
+def ap_aging(as_of: Optional[object] = None) -> Dict:
+    """
+    Báo cáo tuổi nợ phải trả theo NCC tại ngày as_of (cache theo ngày + version
+    trong DB -> HĐ / thanh toán ghi ở worker nào cũng làm mọi worker dựng lại).
+    Trả về {as_of, buckets, rows: [dict], totals: dict}.
+    """
+    as_of = _to_date(as_of)
+    version = cache_version.current(AP_AGING_CACHE)
+    return cache.get_or_set(
+        AP_AGING_CACHE, as_of, lambda: _build_ap_aging(as_of, version), version=version
+    )
+
+
+def _aging_bind(version: int):
+    """
+    Pool báo cáo riêng: query nặng không chiếm kết nối của form. Pool đó trỏ
+    vào replica mà replica chưa nhận tới version trên primary (trễ sau lần
+    ghi HĐ / thanh toán) -> dựng từ primary, tránh cache lại số liệu cũ.
+    """
+    bind = reports_bind()
+    if (
+        bind is not db.engine
+        and current_app.config.get("REPORTS_ON_REPLICA")
+        and cache_version.current(AP_AGING_CACHE, bind=bind) < version
+    ):
+        return db.engine
+    return bind
+
+
+def _build_ap_aging(as_of: date, version: int = 0) -> Dict:
+    result = db.session.execute(
+        _aging_select(as_of), bind_arguments={"bind": _aging_bind(version)}
+    )
+    rows: List[Dict] = [dict(r._mapping) for r in result]
+    keys = [b[0] for b in AGING_BUCKETS] + ["total"]
+    totals = {k: sum((r[k] or 0) for r in rows) for k in keys}
+    return {"as_of": as_of, "buckets": AGING_BUCKETS, "rows": rows, "totals": totals}
+
+
+def invalidate_ap_aging() -> None:
+    """Gọi sau commit của DAO ghi HĐ / thanh toán."""
+    cache.invalidate(AP_AGING_CACHE)
+    cache_version.bump(AP_AGING_CACHE)
@@ -0,0 +1,137 @@
+# dao/return_balance.py
+"""
+Bảng gr_line_return_balance: số đã nhận (QC PASSED), đã trả (POSTED) và
+còn được trả cho từng GR line.
+
+- QC PASSED thay đổi  -> refresh_for_gr(gr_id) (tính lại cả GR, ít khi xảy ra)
+- Phiếu trả POSTED/xoá -> apply_returned_deltas({gr_line_id: delta})
+Mọi hàm chỉ ghi vào session, commit do DAO gọi đảm nhận (cùng transaction).
+"""
+from decimal import Decimal
+from typing import Dict, Optional
+from sqlalchemy import func, case, select, delete, bindparam
+from configs import db
+from db.models.goods_receipt import GRLine
+from db.models.purchase_return import (
+    PurchaseReturn,
+    ReturnLine,
+    PurchaseReturnStatus,
+    GRLineReturnBalance,
+)
+from db.models.qc import QCLine, QCReport, QCStatus
+
+_QTY = db.Numeric(18, 3)
+
+
+def _dec(x) -> Decimal:
+    return Decimal(str(x or 0))
+
+
+def _returnable_expr(accepted, returned):
+    return case((accepted - returned > 0, accepted - returned), else_=0)
+
+
+def _rebuild(gr_id: Optional[int]) -> None:
+    """DELETE + INSERT ... SELECT lại các dòng cân đối (1 GR hoặc toàn bộ)."""
+    accepted = db.session.query(
+        QCLine.gr_line_id.label("gr_line_id"),
+        func.sum(func.coalesce(QCLine.accepted_qty, 0)).label("qty"),
+    ).join(QCReport, QCReport.id == QCLine.qc_id)
+    accepted = accepted.filter(QCReport.status == QCStatus.PASSED)
+    returned = db.session.query(
+        ReturnLine.gr_line_id.label("gr_line_id"),
+        func.sum(ReturnLine.qty).label("qty"),
+    ).join(PurchaseReturn, PurchaseReturn.id == ReturnLine.return_id)
+    returned = returned.filter(PurchaseReturn.status == PurchaseReturnStatus.POSTED)
+    if gr_id is not None:
+        accepted = accepted.filter(QCReport.gr_id == gr_id)
+        returned = returned.filter(PurchaseReturn.gr_id == gr_id)
+    acc = accepted.group_by(QCLine.gr_line_id).subquery()
+    ret = returned.group_by(ReturnLine.gr_line_id).subquery()
+
+    acc_qty = func.coalesce(acc.c.qty, 0)
+    ret_qty = func.coalesce(ret.c.qty, 0)
+    src = (
+        select(
+            GRLine.id,
+            GRLine.gr_id,
+            acc_qty,
+            ret_qty,
+            _returnable_expr(acc_qty, ret_qty),
+        )
+        .select_from(GRLine)
+        .outerjoin(acc, acc.c.gr_line_id == GRLine.id)
+        .outerjoin(ret, ret.c.gr_line_id == GRLine.id)
+    )
+
+    t = GRLineReturnBalance.__table__
+    purge = delete(t)
+    if gr_id is not None:
+        src = src.where(GRLine.gr_id == gr_id)
+        purge = purge.where(t.c.gr_id == gr_id)
+
+    db.session.execute(purge)
+    db.session.execute(
+        t.insert().from_select(
+            ["gr_line_id", "gr_id", "accepted_qty", "returned_qty", "returnable_qty"],
+            src,
+        )
+    )
+
+
+def refresh_for_gr(gr_id: int) -> None:
+    """Tính lại toàn bộ dòng cân đối của 1 GR (gọi khi QC của GR thay đổi)."""
+    db.session.flush()
+    _rebuild(int(gr_id))
+
+
+def rebuild_all() -> None:
+    """Job sửa dữ liệu: dựng lại toàn bộ bảng từ QC/phiếu trả."""
+    db.session.flush()
+    _rebuild(None)
+
+
+def apply_returned_deltas(deltas: Dict[int, float]) -> None:
+    """Cộng/trừ returned_qty theo delta cho từng GR line (1 câu UPDATE executemany)."""
+    params = [
+        {"b_gr_line_id": int(gid), "b_delta": _dec(d)}
+        for gid, d in (deltas or {}).items()
+        if abs(float(d or 0)) > 1e-9
+    ]
+    if not params:
+        return
+    t = GRLineReturnBalance.__table__
+    delta = bindparam("b_delta", type_=_QTY)
+    new_returned = t.c.returned_qty + delta
+    stmt = (
+        t.update()
+        .where(t.c.gr_line_id == bindparam("b_gr_line_id"))
+        .values(
+            returned_qty=new_returned,
+            returnable_qty=_returnable_expr(t.c.accepted_qty, new_returned),
+        )
+    )
+    db.session.execute(stmt, params)
+
+
+def remaining_for_gr(
+    gr_id: int, released: Optional[Dict[int, float]] = None
+) -> Dict[int, float]:
+    """
+    Số còn được trả theo GR line, đọc thẳng từ bảng cân đối.
+    released: số lượng của chính phiếu đang sửa (đã POSTED) được cộng trả lại.
+    """
+    t = GRLineReturnBalance.__table__
+    rows = db.session.execute(
+        select(
+            t.c.gr_line_id, t.c.accepted_qty, t.c.returned_qty, t.c.returnable_qty
+        ).where(t.c.gr_id == int(gr_id))
+    ).all()
+    released = released or {}
+    out: Dict[int, float] = {}
+    for gid, acc, ret, remain in rows:
+        if gid in released:
+            out[gid] = max(0.0, float(acc or 0) - float(ret or 0) + released[gid])
+        else:
+            out[gid] = float(remain or 0)
+    return out
@@ -1,9 +1,14 @@
-from typing import Optional, List, Dict
+from typing import Optional, List, Dict, Iterable
+from sqlalchemy import select, delete, update, exists, func
 from sqlalchemy.exc import SQLAlchemyError
 from configs import db
-from db.models.rfq import RFQ, RFQLine, RFQStatus
-from db.models.purchase_requisition import PurchaseRequisitionStatus  # <-- dùng enum PR
-from dao import purchase_requisition as pr_dao
+from db.models.rfq import RFQ, RFQLine, RFQStatus, RFQLineSource
+from db.models.purchase_requisition import (  # <-- dùng enum PR
+    PurchaseRequisition,
+    PurchaseRequisitionStatus,
+    PRLine,
+)
+from dao import purchase_requisition as pr_dao, rfq_compare, conversion as conv
 
 # Map string từ form -> Enum RFQStatus (nhận cả alias UI cũ)
 _FORM_TO_ENUM = {
@@ -13,6 +18,10 @@ _FORM_TO_ENUM = {
     "rejected": RFQStatus.REJECTED,
 }
 
+# kết quả theo chứng từ của thao tác hàng loạt
+OK = "OK"
+SKIPPED = "SKIPPED"
+
 
 def _to_rfq_status(value: str | None) -> RFQStatus:
     if not value:
@@ -33,6 +42,29 @@ def _require_approved_pr(pr_id: int):
     return pr
 
 
+def _sources_by_material(rfq_id: int) -> Dict[int, List[Dict]]:
+    """{material_id: [{pr_line_id, qty}]} — liên kết dòng PR của RFQ gộp nhu cầu."""
+    rows = db.session.execute(
+        select(RFQLine.material_id, RFQLineSource.pr_line_id, RFQLineSource.qty)
+        .join(RFQLine, RFQLine.id == RFQLineSource.rfq_line_id)
+        .where(RFQLine.rfq_id == int(rfq_id))
+    ).all()
+    out: Dict[int, List[Dict]] = {}
+    for mid, pr_line_id, qty in rows:
+        out.setdefault(mid, []).append({"pr_line_id": pr_line_id, "qty": qty})
+    return out
+
+
+def _pr_line_ids(pr_id: int) -> Dict[int, int]:
+    """{material_id: pr_line.id} của PR — gán rfq_line.source_line_id cho RFQ nhập tay."""
+    rows = db.session.execute(
+        select(PRLine.material_id, func.min(PRLine.id))
+        .where(PRLine.pr_id == int(pr_id))
+        .group_by(PRLine.material_id)
+    ).all()
+    return {int(mid): lid for mid, lid in rows}
+
+
 def _normalize_lines(lines: List[Dict]) -> List[Dict]:
     """Chuẩn hoá & validate lines: material_id bắt buộc, qty > 0."""
     if not lines:
@@ -68,10 +100,20 @@ def get_rfq_lines_as_dicts(rfq_id: int) -> List[Dict]:
 
 
 def create_rfq_from_pr(pr_id: int, status: str = "draft") -> RFQ:
-    """Tạo RFQ và copy toàn bộ dòng từ PR. PR phải APPROVED."""
-    _require_approved_pr(pr_id)  # <-- bắt PR APPROVED
-    lines = build_lines_from_pr(pr_id)
-    return create_rfq(pr_id=pr_id, status=status, lines=lines)
+    """Tạo RFQ và copy toàn bộ dòng từ PR (1 câu INSERT ... SELECT). PR phải APPROVED."""
+    pr = _require_approved_pr(pr_id)  # <-- bắt PR APPROVED
+    stats = conv.line_stats(PRLine, "pr_id", pr.id)
+    if not stats["count"]:
+        raise ValueError("Vui lòng nhập ít nhất 1 dòng vật tư.")
+    if stats["min_qty"] <= 0:
+        raise ValueError("PR có dòng qty <= 0, không thể tạo RFQ.")
+
+    r = RFQ(pr_id=pr.id, status=_to_rfq_status(status))
+    db.session.add(r)
+    db.session.flush()
+    conv.pr_to_rfq(pr.id, r.id)
+    _commit()
+    return r
 
 
 def list_rfqs() -> List[RFQ]:
@@ -94,16 +136,25 @@ def create_rfq(pr_id: int | None, status: str, lines: List[Dict]) -> RFQ:
     db.session.add(r)
     db.session.flush()  # có r.id để insert RFQLine
 
+    src = _pr_line_ids(r.pr_id)
     for ln in norm_lines:
         db.session.add(
-            RFQLine(rfq_id=r.id, material_id=ln["material_id"], qty=ln["qty"])
+            RFQLine(
+                rfq_id=r.id,
+                material_id=ln["material_id"],
+                qty=ln["qty"],
+                source_line_id=src.get(ln["material_id"]),
+            )
         )
     _commit()
     return r
 
 
 def update_rfq(rfq_id: int, pr_id: int | None, status: str, lines: List[Dict]) -> RFQ:
-    """Nếu đổi/gán PR → PR phải APPROVED. RFQ đã APPROVED thì không cho đổi trạng thái/lines/PR."""
+    """
+    Nếu đổi/gán PR → PR phải APPROVED. RFQ đã APPROVED thì không cho đổi trạng thái/lines/PR.
+    RFQ gộp nhu cầu (không có PR, nguồn là rfq_line_source) được phép để trống PR.
+    """
     r = RFQ.query.get_or_404(rfq_id)
     old_status = r.status
     new_status = _to_rfq_status(status)
@@ -114,29 +165,134 @@ def update_rfq(rfq_id: int, pr_id: int | None, status: str, lines: List[Dict]) -
             raise ValueError("RFQ đã APPROVED, không thể đổi sang trạng thái khác.")
         raise ValueError("RFQ đã APPROVED, không thể chỉnh sửa.")
 
+    pooled = _sources_by_material(r.id) if r.pr_id is None else {}
+
     # Nếu có yêu cầu gán/đổi PR → PR phải APPROVED
-    if pr_id is None:
+    if pr_id:
+        _require_approved_pr(pr_id)
+        r.pr_id = int(pr_id)
+        pooled = {}  # gán PR cụ thể -> trả các dòng PR đã gộp về hàng chờ
+    elif not pooled:
         raise ValueError("Vui lòng chọn Purchase Requisition (PR).")
-    _require_approved_pr(pr_id)
-    r.pr_id = int(pr_id)
     r.status = new_status
 
-    # replace toàn bộ lines (đã validate)
+    # replace toàn bộ lines (đã validate), liên kết dòng PR nguồn theo vật tư
     norm_lines = _normalize_lines(lines)
+    if r.pr_id:
+        old_src = _pr_line_ids(r.pr_id)
+    else:
+        old_src = dict(
+            db.session.query(RFQLine.material_id, RFQLine.source_line_id)
+            .filter(RFQLine.rfq_id == r.id, RFQLine.source_line_id.isnot(None))
+            .all()
+        )
+    db.session.execute(
+        delete(RFQLineSource).where(
+            RFQLineSource.rfq_line_id.in_(
+                select(RFQLine.id).where(RFQLine.rfq_id == r.id)
+            )
+        )
+    )
     RFQLine.query.filter_by(rfq_id=r.id).delete()
     for ln in norm_lines:
-        db.session.add(
-            RFQLine(rfq_id=r.id, material_id=ln["material_id"], qty=ln["qty"])
+        line = RFQLine(
+            rfq_id=r.id,
+            material_id=ln["material_id"],
+            qty=ln["qty"],
+            source_line_id=old_src.get(ln["material_id"]),
         )
+        db.session.add(line)
+        # vật tư bị bỏ khỏi RFQ gộp -> dòng PR quay lại hàng chờ gộp
+        for src in pooled.pop(ln["material_id"], []):
+            line.sources.append(
+                RFQLineSource(pr_line_id=src["pr_line_id"], qty=src["qty"])
+            )
 
     _commit()
+    rfq_compare.invalidate(r.id)
     return r
 
 
+def bulk_set_status(rfq_ids: Iterable[int], status: str) -> List[Dict]:
+    """
+    Đổi trạng thái nhiều RFQ (duyệt/từ chối hàng loạt), không ghi lại dòng RFQ:
+      - 1 câu SELECT ... FOR UPDATE (RFQ + trạng thái PR + có dòng / có nguồn gộp)
+      - 1 câu UPDATE cho các RFQ hợp lệ
+    Luật giống update_rfq: RFQ đã APPROVED bị khóa, PR phải APPROVED (trừ RFQ
+    gộp nhu cầu), RFQ phải có ít nhất 1 dòng.
+    Trả về [{id, result (OK/SKIPPED), message, status}].
+    """
+    key = (status or "").strip().lower()
+    if key not in _FORM_TO_ENUM:
+        raise ValueError(f"Trạng thái RFQ không hợp lệ: {status}")
+    target = _FORM_TO_ENUM[key]
+    ids = sorted({int(x) for x in rfq_ids or [] if x})
+    if not ids:
+        raise ValueError("Chưa chọn RFQ nào.")
+
+    has_lines = exists().where(RFQLine.rfq_id == RFQ.id)
+    pooled = exists().where(
+        RFQLineSource.rfq_line_id == RFQLine.id, RFQLine.rfq_id == RFQ.id
+    )
+    rows = db.session.execute(
+        select(
+            RFQ.id,
+            RFQ.status,
+            RFQ.pr_id,
+            PurchaseRequisition.status.label("pr_status"),
+            has_lines.label("has_lines"),
+            pooled.label("pooled"),
+        )
+        .outerjoin(PurchaseRequisition, PurchaseRequisition.id == RFQ.pr_id)
+        .where(RFQ.id.in_(ids))
+        .with_for_update(of=RFQ)
+    ).all()
+    current = {r.id: r for r in rows}
+
+    report: List[Dict] = []
+    ok_ids: List[int] = []
+    for rid in ids:
+        r = current.get(rid)
+        msg = None
+        if r is None:
+            msg = "RFQ không tồn tại."
+        elif r.status == RFQStatus.APPROVED:
+            msg = "RFQ đã APPROVED, không thể chỉnh sửa."
+        elif r.status == target:
+            msg = f"RFQ đã ở trạng thái {target.value}."
+        elif not r.has_lines:
+            msg = "Vui lòng nhập ít nhất 1 dòng vật tư."
+        elif r.pr_id is None and not r.pooled:
+            msg = "Vui lòng chọn Purchase Requisition (PR)."
+        elif r.pr_id is not None and r.pr_status != PurchaseRequisitionStatus.APPROVED:
+            msg = "Chỉ có thể tạo/ghi RFQ từ PR đã APPROVED."
+        report.append(
+            {
+                "id": rid,
+                "result": SKIPPED if msg else OK,
+                "message": msg or "",
+                "status": (r.status if msg else target).value if r else None,
+            }
+        )
+        if not msg:
+            ok_ids.append(rid)
+
+    if ok_ids:
+        db.session.execute(
+            update(RFQ)
+            .where(RFQ.id.in_(ok_ids), RFQ.status != RFQStatus.APPROVED)
+            .values(status=target)
+            .execution_options(synchronize_session="fetch")
+        )
+        _commit()
+    return report
+
+
 def delete_rfq(rfq_id: int):
     r = RFQ.query.get_or_404(rfq_id)
     db.session.delete(r)
     _commit()
+    rfq_compare.invalidate(rfq_id)
 
 
 def _commit():
@@ -0,0 +1,186 @@
+# dao/rfq_compare.py
+"""
+Bảng so sánh báo giá của 1 RFQ: vật tư x NCC (qty, giá, thành tiền),
+giá tốt nhất theo vật tư, tổng theo NCC và các ô chưa báo giá.
+Cache theo rfq_id + version trong DB (cache_version "rfq_compare:<rfq_id>"),
+DAO VQ/RFQ gọi invalidate(rfq_id) sau khi commit -> mọi worker dựng lại.
+"""
+from decimal import Decimal
+from typing import Dict, List, Optional
+from sqlalchemy import func, select, case
+from configs import db
+from db.models.rfq import RFQLine
+from db.models.material import Material
+from db.models.supplier import Supplier
+from db.models.vendor_quotation import (
+    VendorQuotation,
+    VendorQuotationLine,
+    VendorQuotationStatus,
+)
+from dao import cache_version
+from utils.cache import cache
+
+RFQ_COMPARE_CACHE = "rfq_compare"
+
+
+def _version_name(rfq_id: int) -> str:
+    return f"{RFQ_COMPARE_CACHE}:{int(rfq_id)}"
+
+
+def invalidate(*rfq_ids: Optional[int]) -> None:
+    ids = {int(rid) for rid in rfq_ids if rid}
+    for rid in ids:
+        cache.invalidate(RFQ_COMPARE_CACHE, rid)
+    cache_version.bump(*(_version_name(rid) for rid in ids))
+
+
+def _matrix_select(rfq_id: int):
+    """
+    1 câu: gộp dòng VQ theo (VQ, vật tư), window function lấy giá tốt nhất
+    theo vật tư (bỏ VQ REJECTED và giá 0 = chưa báo) và tổng tiền theo VQ.
+    """
+    cell = (
+        select(
+            VendorQuotation.id.label("vq_id"),
+            VendorQuotation.supplier_id.label("supplier_id"),
+            VendorQuotation.status.label("vq_status"),
+            VendorQuotationLine.material_id.label("material_id"),
+            func.sum(VendorQuotationLine.qty).label("qty"),
+            func.sum(VendorQuotationLine.qty * VendorQuotationLine.price).label(
+                "amount"
+            ),
+        )
+        .join(VendorQuotationLine, VendorQuotationLine.vq_id == VendorQuotation.id)
+        .where(VendorQuotation.rfq_id == int(rfq_id))
+        .group_by(
+            VendorQuotation.id,
+            VendorQuotation.supplier_id,
+            VendorQuotation.status,
+            VendorQuotationLine.material_id,
+        )
+        .subquery("cell")
+    )
+    price = func.round(cell.c.amount / func.nullif(cell.c.qty, 0), 2)
+    quotable = case(
+        (
+            (cell.c.vq_status != VendorQuotationStatus.REJECTED) & (price > 0),
+            price,
+        ),
+    )
+    return (
+        select(
+            cell.c.vq_id,
+            cell.c.supplier_id,
+            Supplier.name.label("supplier_name"),
+            cell.c.vq_status,
+            cell.c.material_id,
+            cell.c.qty,
+            price.label("price"),
+            cell.c.amount,
+            func.min(quotable).over(partition_by=cell.c.material_id).label(
+                "best_price"
+            ),
+            func.sum(cell.c.amount).over(partition_by=cell.c.vq_id).label(
+                "vq_total"
+            ),
+        )
+        .select_from(cell)
+        .outerjoin(Supplier, Supplier.id == cell.c.supplier_id)
+        .order_by(cell.c.vq_id, cell.c.material_id)
+    )
+
+
+def _requested(rfq_id: int) -> Dict[int, Dict]:
+    rows = db.session.execute(
+        select(
+            RFQLine.material_id,
+            Material.sku,
+            Material.name,
+            func.sum(RFQLine.qty).label("requested_qty"),
+        )
+        .join(Material, Material.id == RFQLine.material_id)
+        .where(RFQLine.rfq_id == int(rfq_id))
+        .group_by(RFQLine.material_id, Material.sku, Material.name)
+    ).all()
+    return {r.material_id: dict(r._mapping) for r in rows}
+
+
+def _build(rfq_id: int) -> Dict:
+    materials: Dict[int, Dict] = {
+        mid: {**r, "best_price": None, "cells": {}}
+        for mid, r in _requested(rfq_id).items()
+    }
+    suppliers: Dict[int, Dict] = {}
+    extra_ids = set()
+
+    for r in db.session.execute(_matrix_select(rfq_id)):
+        sup = suppliers.setdefault(
+            r.vq_id,
+            {
+                "vq_id": r.vq_id,
+                "supplier_id": r.supplier_id,
+                "supplier_name": r.supplier_name or "",
+                "status": r.vq_status.value,
+                "total": Decimal(str(r.vq_total or 0)),
+                "quoted": 0,
+                "best_count": 0,
+            },
+        )
+        mat = materials.get(r.material_id)
+        if mat is None:  # VQ có vật tư ngoài RFQ
+            mat = materials[r.material_id] = {
+                "material_id": r.material_id,
+                "requested_qty": None,
+                "best_price": None,
+                "cells": {},
+            }
+            extra_ids.add(r.material_id)
+        mat["best_price"] = r.best_price
+        is_best = r.best_price is not None and r.price == r.best_price
+        mat["cells"][r.vq_id] = {
+            "qty": r.qty,
+            "price": r.price,
+            "amount": r.amount,
+            "is_best": is_best,
+        }
+        if r.price and r.price > 0:
+            sup["quoted"] += 1
+        if is_best:
+            sup["best_count"] += 1
+
+    if extra_ids:
+        for m in Material.query.filter(Material.id.in_(extra_ids)):
+            materials[m.id].update(sku=m.sku, name=m.name)
+
+    vq_ids = list(suppliers)
+    rows: List[Dict] = []
+    for mid in sorted(materials, key=lambda k: (materials[k].get("sku") or "", k)):
+        m = materials[mid]
+        # ô trống hoặc giá 0 = NCC chưa báo giá vật tư này
+        m["missing_vq_ids"] = [
+            v
+            for v in vq_ids
+            if v not in m["cells"] or not (m["cells"][v]["price"] or 0) > 0
+        ]
+        rows.append(m)
+    for s in suppliers.values():
+        s["missing"] = len(rows) - s["quoted"]
+
+    return {
+        "rfq_id": int(rfq_id),
+        "suppliers": list(suppliers.values()),
+        "materials": rows,
+        "gap_count": sum(1 for m in rows if m["missing_vq_ids"]),
+    }
+
+
+def compare_rfq(rfq_id: int) -> Dict:
+    """
+    {rfq_id, suppliers: [{vq_id, supplier_name, status, total, quoted, missing, best_count}],
+     materials: [{material_id, sku, name, requested_qty, best_price, cells: {vq_id: {...}},
+                  missing_vq_ids}], gap_count}
+    """
+    version = cache_version.current(_version_name(rfq_id))
+    return cache.get_or_set(
+        RFQ_COMPARE_CACHE, int(rfq_id), lambda: _build(rfq_id), version=version
+    )
@@ -0,0 +1,158 @@
+# dao/rfq_consolidation.py
+"""
+Gộp nhu cầu: cộng qty các dòng PR APPROVED chưa được đưa vào RFQ nào theo
+vật tư (tùy chọn tách RFQ theo đơn vị tính) bằng 1 câu GROUP BY, rồi tạo RFQ
+gộp (pr_id = NULL) và bảng liên kết rfq_line_source -> dòng PR nguồn.
+
+Dòng PR "đã sourced" khi:
+  - PR đã có RFQ riêng (rfq.pr_id; gồm cả RFQ nhập tay qua create_rfq), hoặc
+  - đã được copy sang RFQ (rfq_line.source_line_id), hoặc
+  - đã có trong rfq_line_source (unique pr_line_id -> 2 lần gộp chạy song song
+    không thể lấy trùng 1 dòng PR).
+"""
+from typing import Dict, List, Optional
+from sqlalchemy import func, select, exists, literal, update
+from sqlalchemy.orm import aliased
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from configs import db
+from db.models.material import Material
+from db.models.unit import Unit
+from db.models.purchase_requisition import (
+    PurchaseRequisition,
+    PurchaseRequisitionStatus,
+    PRLine,
+)
+from db.models.rfq import RFQ, RFQLine, RFQLineSource
+from dao import rfq as rfq_dao
+
+
+def _unsourced_filter():
+    # alias riêng: câu INSERT liên kết JOIN thêm rfq_line ở ngoài
+    copied = aliased(RFQLine)
+    linked = aliased(RFQLineSource)
+    own_rfq = aliased(RFQ)
+    return [
+        PurchaseRequisition.status == PurchaseRequisitionStatus.APPROVED,
+        PRLine.qty > 0,
+        ~exists().where(own_rfq.pr_id == PRLine.pr_id),
+        ~exists().where(copied.source_line_id == PRLine.id),
+        ~exists().where(linked.pr_line_id == PRLine.id),
+    ]
+
+
+def _pending_lines(material_ids: Optional[List[int]] = None):
+    """FROM pr_line JOIN purchase_requisition JOIN material, đã lọc dòng chờ gộp."""
+    stmt = (
+        select()
+        .select_from(PRLine)
+        .join(PurchaseRequisition, PurchaseRequisition.id == PRLine.pr_id)
+        .join(Material, Material.id == PRLine.material_id)
+        .where(*_unsourced_filter())
+    )
+    if material_ids:
+        stmt = stmt.where(PRLine.material_id.in_([int(x) for x in material_ids]))
+    return stmt
+
+
+def pending_demand(
+    material_ids: Optional[List[int]] = None, by_unit: bool = False
+) -> List[Dict]:
+    """
+    Nhu cầu chờ gộp (1 câu GROUP BY):
+      [{material_id, sku, name, unit_id, unit_name, qty, line_count, pr_count}]
+    """
+    stmt = (
+        _pending_lines(material_ids)
+        .add_columns(
+            PRLine.material_id,
+            Material.sku,
+            Material.name,
+            Material.unit_id,
+            Unit.name.label("unit_name"),
+            func.sum(PRLine.qty).label("qty"),
+            func.count(PRLine.id).label("line_count"),
+            func.count(func.distinct(PRLine.pr_id)).label("pr_count"),
+        )
+        .outerjoin(Unit, Unit.id == Material.unit_id)
+        .group_by(
+            PRLine.material_id, Material.sku, Material.name, Material.unit_id, Unit.name
+        )
+    )
+    order = [Unit.name, Material.sku] if by_unit else [Material.sku]
+    return [dict(r._mapping) for r in db.session.execute(stmt.order_by(*order))]
+
+
+def consolidate(
+    material_ids: Optional[List[int]] = None,
+    by_unit: bool = False,
+    status: str = "draft",
+) -> List[RFQ]:
+    """
+    Tạo RFQ gộp từ nhu cầu chờ gộp, trong 1 transaction:
+      - by_unit=False: 1 RFQ chứa mọi vật tư
+      - by_unit=True : 1 RFQ / đơn vị tính
+    Mỗi nhóm: INSERT rfq_line ... SELECT GROUP BY vật tư, rồi INSERT
+    rfq_line_source ... SELECT nối dòng PR chờ gộp với dòng RFQ vừa tạo.
+    """
+    demand = pending_demand(material_ids, by_unit=by_unit)
+    if not demand:
+        raise ValueError("Không có dòng PR APPROVED nào chờ gộp.")
+
+    groups: Dict[Optional[int], List[int]] = {}
+    for d in demand:
+        key = d["unit_id"] if by_unit else None
+        groups.setdefault(key, []).append(d["material_id"])
+
+    rfqs: List[RFQ] = []
+    try:
+        for unit_id, mids in groups.items():
+            r = RFQ(pr_id=None, status=rfq_dao._to_rfq_status(status))
+            db.session.add(r)
+            db.session.flush()
+
+            src = (
+                _pending_lines(mids)
+                .add_columns(literal(r.id), PRLine.material_id, func.sum(PRLine.qty))
+                .group_by(PRLine.material_id)
+                .order_by(PRLine.material_id)
+            )
+            db.session.execute(
+                RFQLine.__table__.insert().from_select(
+                    ["rfq_id", "material_id", "qty"], src
+                )
+            )
+
+            links = _pending_lines(mids).add_columns(
+                RFQLine.id, PRLine.id, PRLine.qty
+            ).join(
+                RFQLine,
+                (RFQLine.rfq_id == r.id) & (RFQLine.material_id == PRLine.material_id),
+            )
+            db.session.execute(
+                RFQLineSource.__table__.insert().from_select(
+                    ["rfq_line_id", "pr_line_id", "qty"], links
+                )
+            )
+            rfqs.append(r)
+
+        # PR được duyệt giữa 2 câu INSERT: đồng bộ qty dòng RFQ = tổng liên kết
+        linked = (
+            select(func.sum(RFQLineSource.qty))
+            .where(RFQLineSource.rfq_line_id == RFQLine.id)
+            .scalar_subquery()
+        )
+        db.session.execute(
+            update(RFQLine)
+            .where(RFQLine.rfq_id.in_([r.id for r in rfqs]))
+            .values(qty=linked)
+            .execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+    except IntegrityError:
+        db.session.rollback()
+        raise ValueError("Dòng PR vừa được đưa vào RFQ khác, vui lòng thử lại.")
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    return rfqs
+
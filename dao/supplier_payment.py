@@ -0,0 +1,186 @@
+# dao/supplier_payment.py
+"""
+Chứng từ thanh toán NCC: 1 lần chuyển khoản phân bổ cho nhiều hóa đơn.
+Mỗi dòng phân bổ là 1 Payment (supplier_payment_id trỏ về chứng từ), nên
+paid_total/balance/trạng thái hóa đơn vẫn tính như thanh toán lẻ.
+"""
+from datetime import datetime
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional
+from sqlalchemy import select, delete
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import selectinload
+from configs import db
+from db.models.invoice_payment import (
+    SupplierPayment,
+    Payment,
+    VendorInvoice,
+)
+from dao import invoice as inv_dao, payment as pay_dao, report as report_dao
+from dao.payment_run import PAYABLE_STATUSES
+
+
+def _d(x) -> Decimal:
+    return Decimal(str(x or 0))
+
+
+def _commit():
+    try:
+        db.session.commit()
+    except SQLAlchemyError:
+        db.session.rollback()
+        raise
+    report_dao.invalidate_ap_aging()
+
+
+def list_supplier_payments() -> List[SupplierPayment]:
+    return (
+        SupplierPayment.query.options(selectinload(SupplierPayment.supplier))
+        .order_by(SupplierPayment.paid_at.desc(), SupplierPayment.id.desc())
+        .all()
+    )
+
+
+def get_supplier_payment(sp_id: int) -> Optional[SupplierPayment]:
+    return SupplierPayment.query.options(
+        selectinload(SupplierPayment.allocations)
+    ).get(sp_id)
+
+
+def _open_invoices(supplier_id: int, ids: Optional[List[int]] = None, lock=False):
+    """Hóa đơn còn nợ của NCC, cũ trước (issued_at, id)."""
+    stmt = select(VendorInvoice).where(
+        VendorInvoice.supplier_id == int(supplier_id),
+        VendorInvoice.status.in_(PAYABLE_STATUSES),
+        VendorInvoice.balance > 0,
+    )
+    if ids is not None:
+        stmt = stmt.where(VendorInvoice.id.in_(ids))
+    stmt = stmt.order_by(VendorInvoice.issued_at.asc().nullsfirst(), VendorInvoice.id)
+    if lock:
+        stmt = stmt.with_for_update()
+    return db.session.scalars(stmt).all()
+
+
+def allocate_oldest_first(supplier_id: int, amount) -> Dict:
+    """
+    Phân bổ tự động: trả hết hóa đơn cũ nhất trước cho tới khi hết tiền.
+    Trả về {allocations: [{invoice_id, issued_at, balance, amount}], unallocated}.
+    """
+    remaining = _d(amount)
+    out = []
+    for inv in _open_invoices(supplier_id):
+        if remaining <= 0:
+            break
+        take = min(remaining, _d(inv.balance))
+        out.append(
+            {
+                "invoice_id": inv.id,
+                "issued_at": inv.issued_at,
+                "balance": _d(inv.balance),
+                "amount": take,
+            }
+        )
+        remaining -= take
+    return {"allocations": out, "unallocated": remaining}
+
+
+def _merge(allocations: Iterable[Dict]) -> Dict[int, Decimal]:
+    out: Dict[int, Decimal] = {}
+    for a in allocations or []:
+        amt = _d(a.get("amount"))
+        if not a.get("invoice_id") or amt == 0:
+            continue
+        iid = int(a["invoice_id"])
+        out[iid] = out.get(iid, Decimal("0")) + amt
+    return out
+
+
+def create_supplier_payment(
+    supplier_id: int,
+    amount,
+    method: str = "bank",
+    note: Optional[str] = None,
+    allocations: Optional[Iterable[Dict]] = None,
+) -> SupplierPayment:
+    """
+    Tạo chứng từ + các dòng phân bổ trong 1 commit.
+    allocations=None -> phân bổ tự động oldest-first; ngược lại dùng [{invoice_id, amount}].
+    Phần tiền chưa phân bổ được giữ trên chứng từ (amount - tổng phân bổ).
+    """
+    if not supplier_id:
+        raise ValueError("Vui lòng chọn nhà cung cấp.")
+    amount = _d(amount)
+    if amount <= 0:
+        raise ValueError("Số tiền thanh toán phải > 0.")
+
+    if allocations is None:
+        alloc = {
+            a["invoice_id"]: a["amount"]
+            for a in allocate_oldest_first(supplier_id, amount)["allocations"]
+        }
+    else:
+        alloc = _merge(allocations)
+    if any(v < 0 for v in alloc.values()):
+        raise ValueError("Số tiền phân bổ phải > 0.")
+    if sum(alloc.values(), Decimal("0")) > amount:
+        raise ValueError("Tổng phân bổ vượt quá số tiền thanh toán.")
+
+    invoices = {
+        inv.id: inv for inv in _open_invoices(supplier_id, list(alloc), lock=True)
+    }
+    for iid, amt in alloc.items():
+        inv = invoices.get(iid)
+        if not inv:
+            raise ValueError(
+                f"INV#{iid} không phải hóa đơn còn nợ của nhà cung cấp này."
+            )
+        if amt > _d(inv.balance):
+            raise ValueError(f"Số tiền phân bổ cho INV#{iid} vượt quá số còn nợ.")
+
+    sp = SupplierPayment(
+        supplier_id=int(supplier_id),
+        amount=amount,
+        method=method,
+        paid_at=datetime.utcnow(),
+        note=note,
+    )
+    db.session.add(sp)
+    db.session.flush()
+    pay_dao.post_payments(
+        [
+            {
+                "invoice_id": iid,
+                "amount": amt,
+                "method": method,
+                "paid_at": sp.paid_at,
+                "note": note,
+                "supplier_payment_id": sp.id,
+            }
+            for iid, amt in alloc.items()
+        ]
+    )
+    _commit()
+    return sp
+
+
+def delete_supplier_payment(sp_id: int) -> None:
+    """Xóa chứng từ + toàn bộ dòng phân bổ, tính lại các hóa đơn liên quan 1 lần."""
+    sp = SupplierPayment.query.get_or_404(sp_id)
+    ids = db.session.scalars(
+        select(Payment.invoice_id).where(Payment.supplier_payment_id == sp.id)
+    ).all()
+    db.session.execute(
+        delete(Payment)
+        .where(Payment.supplier_payment_id == sp.id)
+        .execution_options(synchronize_session="fetch")
+    )
+    db.session.delete(sp)
+    db.session.flush()
+    inv_dao.rebuild_paid_totals(ids)
+    inv_dao.recompute_statuses(ids)
+    _commit()
+
+
+def allocated_total(sp: SupplierPayment) -> Decimal:
+    return sum((_d(p.amount) for p in sp.allocations), Decimal("0"))
@@ -8,9 +8,18 @@ from db.models.vendor_quotation import (
     VendorQuotationLine,
     VendorQuotationStatus,
 )
-from db.models.purchase import PurchaseOrder, POStatus, PurchaseOrderItem
-from dao import rfq as rfq_dao
-from sqlalchemy import exists
+from db.models.purchase import PurchaseOrder, POStatus
+from db.models.rfq import RFQLine
+from db.models.supplier import Supplier
+from dao import (
+    rfq as rfq_dao,
+    rfq_compare,
+    doc_number,
+    conversion as conv,
+    price_history,
+)
+from sqlalchemy import exists, select
+from utils.db_errors import translate_integrity_errors
 
 # map string từ form -> Enum (nhận cả lowercase)
 _VQ_FORM_TO_ENUM = {
@@ -28,11 +37,89 @@ def build_lines_from_rfq(rfq_id: int) -> List[Dict]:
     ]
 
 
+# vi phạm ràng buộc DB -> thông báo nghiệp vụ (xem utils/db_errors.py)
+_UNIQUE_MESSAGES = {
+    "ux_vendor_quotation_rfq_selected": "Đã có VQ khác của RFQ này ở trạng thái SELECTED.",
+    "uq_purchase_order_vq_id": "VQ này đã được dùng để tạo PO khác.",
+    "purchase_order_po_no_key": "Số PO đã tồn tại, vui lòng nhập số khác.",
+}
+
+
+@translate_integrity_errors(_UNIQUE_MESSAGES)
 def create_vq_from_rfq(
     rfq_id: int, supplier_id: int, status: str = "received"
 ) -> VendorQuotation:
-    lines = build_lines_from_rfq(rfq_id)
-    return create_vq(rfq_id=rfq_id, supplier_id=supplier_id, status=status, lines=lines)
+    """Tạo VQ và copy dòng RFQ (giá = 0) bằng 1 câu INSERT ... SELECT."""
+    rfq = _require_approved_rfq(rfq_id)
+    if not conv.line_stats(RFQLine, "rfq_id", rfq.id)["count"]:
+        raise ValueError("Vui lòng nhập ít nhất 1 dòng báo giá.")
+
+    vq = VendorQuotation(
+        rfq_id=rfq.id,
+        supplier_id=int(supplier_id) if supplier_id else None,
+        status=_to_vq_status(status),
+    )
+    db.session.add(vq)
+    db.session.flush()
+    conv.rfq_to_vq(rfq.id, vq.id)
+    _commit()
+    rfq_compare.invalidate(vq.rfq_id)
+    return vq
+
+
+@translate_integrity_errors(_UNIQUE_MESSAGES)
+def create_vqs_from_rfq(
+    rfq_id: int, supplier_ids: List[int], status: str = "received"
+) -> Dict[str, List[int]]:
+    """
+    Gửi 1 RFQ cho nhiều NCC trong 1 transaction:
+      - validate RFQ + dòng RFQ 1 lần
+      - 1 câu INSERT ... RETURNING cho tất cả header VQ
+      - 1 câu INSERT ... SELECT copy dòng RFQ cho mọi VQ mới
+    NCC đã có VQ cho RFQ này được bỏ qua.
+    Trả về {created: [vq_id], skipped: [supplier_id], unknown: [supplier_id]}.
+    """
+    rfq = _require_approved_rfq(rfq_id)
+    if not conv.line_stats(RFQLine, "rfq_id", rfq.id)["count"]:
+        raise ValueError("Vui lòng nhập ít nhất 1 dòng báo giá.")
+
+    wanted = sorted({int(x) for x in supplier_ids or [] if x})
+    if not wanted:
+        raise ValueError("Vui lòng chọn ít nhất 1 nhà cung cấp.")
+
+    existing = set(
+        db.session.scalars(
+            select(Supplier.id).where(Supplier.id.in_(wanted))
+        ).all()
+    )
+    quoted = set(
+        db.session.scalars(
+            select(VendorQuotation.supplier_id).where(
+                VendorQuotation.rfq_id == rfq.id,
+                VendorQuotation.supplier_id.in_(wanted),
+            )
+        ).all()
+    )
+    targets = [sid for sid in wanted if sid in existing and sid not in quoted]
+
+    created: List[int] = []
+    if targets:
+        t = VendorQuotation.__table__
+        st = _to_vq_status(status)
+        rows = db.session.execute(
+            t.insert().returning(t.c.id),
+            [{"rfq_id": rfq.id, "supplier_id": sid, "status": st} for sid in targets],
+        )
+        created = [r.id for r in rows]
+        conv.rfq_to_vqs(rfq.id, created)
+        _commit()
+        rfq_compare.invalidate(rfq.id)
+
+    return {
+        "created": created,
+        "skipped": sorted(quoted),
+        "unknown": [sid for sid in wanted if sid not in existing],
+    }
 
 
 def _to_vq_status(value: Optional[str]) -> VendorQuotationStatus:
@@ -51,17 +138,22 @@ def get_vq(vq_id: int) -> Optional[VendorQuotation]:
 
 
 # ======== Mutations ========
-def create_vq(
-    rfq_id: Optional[int], supplier_id: Optional[int], status: str, lines: list[dict]
-) -> VendorQuotation:
+def _require_approved_rfq(rfq_id: Optional[int]):
     if not rfq_id:
         raise ValueError("Vui lòng chọn RFQ trước khi tạo VQ.")
-
     rfq = rfq_dao.get_rfq(int(rfq_id))
     if not rfq:
         raise ValueError("RFQ không tồn tại.")
     if rfq.status != rfq_dao._to_rfq_status("APPROVED"):
         raise ValueError("Chỉ có thể tạo VQ từ RFQ đã được APPROVED.")
+    return rfq
+
+
+@translate_integrity_errors(_UNIQUE_MESSAGES)
+def create_vq(
+    rfq_id: Optional[int], supplier_id: Optional[int], status: str, lines: list[dict]
+) -> VendorQuotation:
+    rfq = _require_approved_rfq(rfq_id)
 
     norm_lines = _normalize_vq_lines(lines)
 
@@ -84,9 +176,11 @@ def create_vq(
         )
 
     _commit()
+    rfq_compare.invalidate(vq.rfq_id)
     return vq
 
 
+@translate_integrity_errors(_UNIQUE_MESSAGES)
 def update_vq(
     vq_id: int,
     rfq_id: Optional[int],
@@ -94,12 +188,21 @@ def update_vq(
     status: str,
     lines: List[Dict],
 ) -> Optional[VendorQuotation]:
-    vq = get_vq(vq_id)
-    if not vq:
+    # 1 câu: VQ + cờ đã có PO
+    row = db.session.execute(
+        select(
+            VendorQuotation,
+            exists().where(PurchaseOrder.vq_id == VendorQuotation.id).label("has_po"),
+        ).where(VendorQuotation.id == int(vq_id))
+    ).first()
+    if not row:
         return None
+    vq = row.VendorQuotation
 
     # Cấm sửa nếu VQ đã được dùng để tạo PO
-    _ensure_vq_not_used_by_po(vq.id)
+    if row.has_po:
+        raise ValueError("VQ đã được dùng để tạo PO, không thể chỉnh sửa.")
+    old_rfq_id = vq.rfq_id
 
     # Nếu đổi RFQ -> RFQ phải tồn tại & APPROVED
     if rfq_id is not None:
@@ -113,14 +216,15 @@ def update_vq(
     vq.supplier_id = int(supplier_id) if supplier_id else None
     new_status = _to_vq_status(status)
 
-    # Nếu set SELECTED -> đảm bảo không có VQ SELECTED khác thuộc cùng RFQ
-    if new_status == VendorQuotationStatus.SELECTED:
-        if not vq.rfq_id:
-            raise ValueError("VQ phải gắn với RFQ trước khi SELECTED.")
-        _ensure_no_other_selected_for_rfq(vq.rfq_id, exclude_vq_id=vq.id)
+    # SELECTED: index ux_vendor_quotation_rfq_selected chặn VQ SELECTED thứ 2 của RFQ
+    if new_status == VendorQuotationStatus.SELECTED and not vq.rfq_id:
+        raise ValueError("VQ phải gắn với RFQ trước khi SELECTED.")
     vq.status = new_status
 
-    # thay toàn bộ lines (đã validate)
+    # thay toàn bộ lines (đã validate), giữ liên kết dòng RFQ nguồn theo vật tư
+    old_src = {
+        ln.material_id: ln.source_line_id for ln in vq.lines if ln.source_line_id
+    }
     vq.lines.clear()
     db.session.flush()
     norm_lines = _normalize_vq_lines(lines)
@@ -131,10 +235,12 @@ def update_vq(
                 material_id=ln["material_id"],
                 qty=ln["qty"],
                 price=ln["price"],
+                source_line_id=old_src.get(ln["material_id"]),
             )
         )
 
     _commit()
+    rfq_compare.invalidate(old_rfq_id, vq.rfq_id)
     return vq
 
 
@@ -142,8 +248,10 @@ def delete_vq(vq_id: int) -> bool:
     vq = get_vq(vq_id)
     if not vq:
         return False
+    rfq_id = vq.rfq_id
     db.session.delete(vq)
     _commit()
+    rfq_compare.invalidate(rfq_id)
     return True
 
 
@@ -160,9 +268,10 @@ def _parse_date(d):
     return datetime.strptime(d, "%Y-%m-%d")
 
 
+@translate_integrity_errors(_UNIQUE_MESSAGES)
 def create_po_from_vq(
     vq_id: int,
-    po_no: str,
+    po_no: Optional[str] = None,
     *,
     status: str = "DRAFT",
     order_date: Optional[str | datetime] = None,
@@ -177,23 +286,17 @@ def create_po_from_vq(
     if vq.status != VendorQuotationStatus.SELECTED:
         raise ValueError("Chỉ có thể tạo PO từ VQ ở trạng thái SELECTED.")
 
-    # 1 VQ chỉ được tạo đúng 1 PO
-    if db.session.query(exists().where(PurchaseOrder.vq_id == vq.id)).scalar():
-        raise ValueError("VQ này đã được dùng để tạo PO khác.")
+    # 1 VQ chỉ được tạo đúng 1 PO: unique uq_purchase_order_vq_id
 
-    if not vq.lines:
+    # validate + subtotal bằng aggregate, không load vq.lines
+    stats = conv.line_stats(VendorQuotationLine, "vq_id", vq.id)
+    if not stats["count"]:
         raise ValueError("VQ không có dòng báo giá, không thể tạo PO")
-
-    # Tính tiền từ dòng báo giá (và qty/price phải hợp lệ)
-    subtotal = Decimal("0.00")
-    for idx, ln in enumerate(vq.lines, 1):
-        qty = _dec(ln.qty)
-        price = _dec(ln.price)
-        if qty <= 0:
-            raise ValueError(f"Dòng VQ #{idx}: qty phải > 0.")
-        if price < 0:
-            raise ValueError(f"Dòng VQ #{idx}: price không được âm.")
-        subtotal += qty * price
+    if stats["min_qty"] <= 0:
+        raise ValueError("Dòng VQ: qty phải > 0.")
+    if stats["min_price"] < 0:
+        raise ValueError("Dòng VQ: price không được âm.")
+    subtotal = _dec(conv.vq_subtotal(vq.id))
 
     if tax_amount is not None:
         tax = _dec(tax_amount)
@@ -213,7 +316,7 @@ def create_po_from_vq(
         po_status = POStatus.DRAFT
 
     po = PurchaseOrder(
-        po_no=po_no.strip(),
+        po_no=(po_no or "").strip() or doc_number.next_number("PO"),
         supplier_id=vq.supplier_id,
         status=po_status,
         order_date=_parse_date(order_date),
@@ -225,17 +328,8 @@ def create_po_from_vq(
     )
     db.session.add(po)
     db.session.flush()
-
-    for ln in vq.lines:
-        db.session.add(
-            PurchaseOrderItem(
-                po_id=po.id,
-                material_id=ln.material_id,
-                qty=_dec(ln.qty),
-                price=_dec(ln.price),
-                line_total=(_dec(ln.qty) * _dec(ln.price)).quantize(Decimal("0.01")),
-            )
-        )
+    conv.vq_to_po(vq.id, po.id)
+    price_history.refresh_for_po(po.id)
 
     _commit()
     return po
@@ -266,23 +360,6 @@ def _normalize_vq_lines(lines: list[dict]) -> list[dict]:
     return out
 
 
-def _ensure_no_other_selected_for_rfq(rfq_id: int, exclude_vq_id: int | None = None):
-    q = VendorQuotation.query.filter(
-        VendorQuotation.rfq_id == int(rfq_id),
-        VendorQuotation.status == VendorQuotationStatus.SELECTED,
-    )
-    if exclude_vq_id:
-        q = q.filter(VendorQuotation.id != int(exclude_vq_id))
-    if db.session.query(q.exists()).scalar():
-        raise ValueError("Đã có VQ khác của RFQ này ở trạng thái SELECTED.")
-
-
-def _ensure_vq_not_used_by_po(vq_id: int):
-    used = db.session.query(exists().where(PurchaseOrder.vq_id == int(vq_id))).scalar()
-    if used:
-        raise ValueError("VQ đã được dùng để tạo PO, không thể chỉnh sửa.")
-
-
 def _commit():
     try:
         db.session.commit()
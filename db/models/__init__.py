@@ -4,7 +4,7 @@ from .unit import Unit
 from .material import Material
 
 from .purchase_requisition import PurchaseRequisition, PRLine
-from .rfq import RFQ, RFQLine
+from .rfq import RFQ, RFQLine, RFQLineSource
 from .vendor_quotation import VendorQuotation, VendorQuotationLine
 
 from .purchase import PurchaseOrder, PurchaseOrderItem
@@ -15,7 +15,10 @@ from .goods_receipt import (
 from .qc import QCReport, QCLine  # chú ý: file đổi thành qc.py
 
 from .inventory import StockItem, StockMovement
-from .invoice_payment import VendorInvoice, InvoiceLine, Payment
-from .purchase_return import PurchaseReturn, ReturnLine
+from .invoice_payment import VendorInvoice, InvoiceLine, Payment, SupplierPayment
+from .invoice_match import InvoiceMatchLine
+from .purchase_return import PurchaseReturn, ReturnLine, GRLineReturnBalance
+from .price_history import MaterialPriceHistory
+from .cache_version import CacheVersion
 
 __all__ = [n for n in dir() if n[:1].isupper()]
@@ -0,0 +1,13 @@
+from configs import db
+
+
+class CacheVersion(db.Model):
+    """
+    Phiên bản dữ liệu của 1 cache (dùng chung mọi worker / process): DAO ghi
+    tăng version sau commit, cache in-process chỉ dùng kết quả dựng với đúng
+    version hiện tại (xem utils/cache.py, dao/cache_version.py).
+    """
+
+    __tablename__ = "cache_version"
+    name = db.Column(db.String(100), primary_key=True)
+    version = db.Column(db.BigInteger, nullable=False, default=0)
@@ -12,9 +12,14 @@ class GRStatus(enum.Enum):
 class GoodsReceipt(db.Model):
     __tablename__ = "goods_receipt"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    po_id = db.Column(db.Integer, db.ForeignKey("purchase_order.id"), nullable=False)
+    po_id = db.Column(
+        db.Integer, db.ForeignKey("purchase_order.id"), nullable=False, index=True
+    )
     status = db.Column(
-        db.Enum(GRStatus, name="grstatus"), default=GRStatus.DRAFT, nullable=False
+        db.Enum(GRStatus, name="grstatus"),
+        default=GRStatus.DRAFT,
+        nullable=False,
+        index=True,
     )  # draft/checked/posted
     received_at = db.Column(db.DateTime, default=datetime.utcnow)
     po = db.relationship("PurchaseOrder")
@@ -27,9 +32,14 @@ class GRLine(db.Model):
         db.Integer,
         db.ForeignKey("goods_receipt.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
+    )
+    po_line_id = db.Column(
+        db.Integer, db.ForeignKey("purchase_order_item.id"), index=True
     )
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
-    po_line_id = db.Column(db.Integer, db.ForeignKey("purchase_order_item.id"))
     qty = db.Column(db.Numeric(18, 3), nullable=False)
     gr = db.relationship(
         "GoodsReceipt", backref=db.backref("lines", cascade="all, delete-orphan")
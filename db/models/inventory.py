@@ -14,8 +14,14 @@ class StockItem(db.Model):
 
 class StockMovement(db.Model):
     __tablename__ = "stock_movement"
+    __table_args__ = (
+        # tra cứu phiếu nhập/xuất nguồn của 1 chứng từ (GRN/RETURN...)
+        db.Index("ix_stock_movement_ref_type_ref_id", "ref_type", "ref_id"),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
+    )
     ref_type = db.Column(db.String(30))  # GRN/RETURN/ADJUSTMENT/ISSUE
     ref_id = db.Column(db.Integer)  # id tham chiếu (gr_line, return_line…)
     qty_change = db.Column(db.Numeric(18, 3), nullable=False)
@@ -0,0 +1,35 @@
+# db/models/invoice_match.py
+from configs import db
+from datetime import datetime
+
+
+class InvoiceMatchLine(db.Model):
+    """Kết quả đối chiếu 3 chiều (PO - GR/QC - Hóa đơn) theo hóa đơn x vật tư."""
+
+    __tablename__ = "invoice_match_line"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    invoice_id = db.Column(
+        db.Integer,
+        db.ForeignKey("vendor_invoice.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    po_id = db.Column(db.Integer, db.ForeignKey("purchase_order.id"), index=True)
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
+    )
+
+    invoiced_qty = db.Column(db.Numeric(18, 3), default=0)  # qty trên hóa đơn này
+    invoice_price = db.Column(db.Numeric(18, 2), default=0)  # giá bình quân trên HĐ
+    ordered_qty = db.Column(db.Numeric(18, 3), default=0)  # qty trên PO
+    po_price = db.Column(db.Numeric(18, 2), default=0)  # giá bình quân trên PO
+    received_qty = db.Column(db.Numeric(18, 3), default=0)  # QC PASSED accepted
+    billed_qty = db.Column(db.Numeric(18, 3), default=0)  # tổng HĐ (không CANCELED) của PO
+
+    qty_variance = db.Column(db.Numeric(18, 3), default=0)  # billed - received
+    price_variance = db.Column(db.Numeric(18, 2), default=0)  # invoice_price - po_price
+    # MATCHED/QTY_VARIANCE/PRICE_VARIANCE/QTY_PRICE_VARIANCE/NOT_ON_PO/NO_PO
+    status = db.Column(db.String(20), nullable=False, index=True)
+    matched_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    material = db.relationship("Material")
@@ -16,12 +16,27 @@ class VendorInvoice(db.Model):
     __tablename__ = "vendor_invoice"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     supplier_id = db.Column(db.Integer, db.ForeignKey("supplier.id"), nullable=False)
-    po_id = db.Column(db.Integer, db.ForeignKey("purchase_order.id"))
+    po_id = db.Column(db.Integer, db.ForeignKey("purchase_order.id"), index=True)
     issued_at = db.Column(db.Date)  # ngày hóa đơn (nếu cần, form có thể bổ sung)
     status = db.Column(
-        db.Enum(PaymentStatus), default=PaymentStatus.DRAFT, nullable=False
+        db.Enum(PaymentStatus),
+        default=PaymentStatus.DRAFT,
+        nullable=False,
+        index=True,
     )
     total = db.Column(db.Numeric(18, 2), default=0)  # tổng tiền từ các line
+    # tổng đã thanh toán / còn nợ, DAO payment cập nhật theo delta
+    paid_total = db.Column(db.Numeric(18, 2), default=0, nullable=False)
+    balance = db.Column(db.Numeric(18, 2), default=0, nullable=False, index=True)
+    # kết quả đối chiếu 3 chiều: MATCHED / EXCEPTION / NO_PO (None = chưa đối chiếu)
+    match_status = db.Column(db.String(20), index=True)
+    # sha256 của (NCC, ngày HĐ, tổng, các dòng đã chuẩn hóa) -> phát hiện HĐ nhập trùng
+    fingerprint = db.Column(db.String(64), index=True)
+
+    __table_args__ = (
+        # tra cứu HĐ gần trùng: cùng NCC + cùng tổng + ngày HĐ lân cận
+        db.Index("ix_vendor_invoice_supplier_total_issued", "supplier_id", "total", "issued_at"),
+    )
 
     supplier = db.relationship("Supplier")
     po = db.relationship("PurchaseOrder")
@@ -29,13 +44,13 @@ class VendorInvoice(db.Model):
         "InvoiceLine",
         backref=db.backref("invoice"),
         cascade="all, delete-orphan",
-        lazy="joined",
+        lazy="select",
     )
     payments = db.relationship(
         "Payment",
         backref=db.backref("invoice"),
         cascade="all, delete-orphan",
-        lazy="selectin",
+        lazy="select",
     )
 
 
@@ -46,8 +61,11 @@ class InvoiceLine(db.Model):
         db.Integer,
         db.ForeignKey("vendor_invoice.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
     )
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
     qty = db.Column(db.Numeric(18, 3), default=0)
     price = db.Column(db.Numeric(18, 2), default=0)
     line_total = db.Column(db.Numeric(18, 2), default=0)
@@ -62,8 +80,37 @@ class Payment(db.Model):
         db.Integer,
         db.ForeignKey("vendor_invoice.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    amount = db.Column(db.Numeric(18, 2), nullable=False)
+    method = db.Column(db.String(30))  # bank/cash/...
+    paid_at = db.Column(db.DateTime, default=datetime.utcnow)
+    note = db.Column(db.Text)
+    # dòng phân bổ của 1 chứng từ thanh toán NCC (None = thanh toán lẻ cho 1 HĐ)
+    supplier_payment_id = db.Column(
+        db.Integer,
+        db.ForeignKey("supplier_payment.id", ondelete="CASCADE"),
+        index=True,
+    )
+
+
+class SupplierPayment(db.Model):
+    """Chứng từ thanh toán NCC (1 lần chuyển khoản) phân bổ cho nhiều hóa đơn."""
+
+    __tablename__ = "supplier_payment"
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    supplier_id = db.Column(
+        db.Integer, db.ForeignKey("supplier.id"), nullable=False, index=True
     )
     amount = db.Column(db.Numeric(18, 2), nullable=False)
     method = db.Column(db.String(30))  # bank/cash/...
     paid_at = db.Column(db.DateTime, default=datetime.utcnow)
     note = db.Column(db.Text)
+
+    supplier = db.relationship("Supplier")
+    allocations = db.relationship(
+        "Payment",
+        backref=db.backref("supplier_payment"),
+        cascade="all, delete-orphan",
+        order_by="Payment.id",
+    )
@@ -1,5 +1,5 @@
 from configs import db
-from sqlalchemy.dialects.postgresql import JSONB
+from db.types import PortableJSON
 
 
 class Material(db.Model):
@@ -10,10 +10,12 @@ class Material(db.Model):
     name = db.Column(db.String(255), nullable=False)
     category = db.Column(db.String(100))
 
-    unit_id = db.Column(db.Integer, db.ForeignKey("unit.id"), nullable=False)
+    unit_id = db.Column(
+        db.Integer, db.ForeignKey("unit.id"), nullable=False, index=True
+    )
     unit = db.relationship("Unit", backref="materials")
 
-    attrs = db.Column(JSONB, default=dict)
+    attrs = db.Column(PortableJSON, default=dict)
     is_active = db.Column(db.Boolean, default=True)
 
     def __str__(self):
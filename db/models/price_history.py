@@ -0,0 +1,49 @@
+# db/models/price_history.py
+from configs import db
+from datetime import datetime
+
+
+class MaterialPriceHistory(db.Model):
+    """
+    Lịch sử giá mua theo (vật tư, NCC, ngày): 1 dòng / vật tư / chứng từ nguồn
+    (PO CONFIRMED hoặc hóa đơn NCC), giá = bình quân gia quyền trên chứng từ.
+    Dùng cho gợi ý giá mua gần nhất / bình quân 12 tháng.
+    """
+
+    __tablename__ = "material_price_history"
+    __table_args__ = (
+        db.Index(
+            "ix_material_price_history_material_supplier_date",
+            "material_id",
+            "supplier_id",
+            "price_date",
+        ),
+        db.Index(
+            "ix_material_price_history_material_date", "material_id", "price_date"
+        ),
+    )
+
+    id = db.Column(db.Integer, primary_key=True, autoincrement=True)
+    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
+    supplier_id = db.Column(
+        db.Integer, db.ForeignKey("supplier.id"), nullable=False, index=True
+    )
+    price_date = db.Column(db.Date, nullable=False)
+    price = db.Column(db.Numeric(18, 2), nullable=False)
+    qty = db.Column(db.Numeric(18, 3), default=0, nullable=False)
+
+    source = db.Column(db.String(10), nullable=False)  # PO / INV
+    po_id = db.Column(
+        db.Integer,
+        db.ForeignKey("purchase_order.id", ondelete="CASCADE"),
+        index=True,
+    )
+    invoice_id = db.Column(
+        db.Integer,
+        db.ForeignKey("vendor_invoice.id", ondelete="CASCADE"),
+        index=True,
+    )
+    recorded_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    material = db.relationship("Material")
+    supplier = db.relationship("Supplier")
@@ -12,15 +12,22 @@ class POStatus(enum.Enum):
 
 class PurchaseOrder(db.Model):
     __tablename__ = "purchase_order"
+    # 1 VQ -> 1 PO (DB giữ luật, DAO dịch lỗi vi phạm thành ValueError)
+    __table_args__ = (db.UniqueConstraint("vq_id", name="uq_purchase_order_vq_id"),)
 
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     po_no = db.Column(db.String(40), unique=True, nullable=False)
 
-    supplier_id = db.Column(db.Integer, db.ForeignKey("supplier.id"), nullable=False)
+    supplier_id = db.Column(
+        db.Integer, db.ForeignKey("supplier.id"), nullable=False, index=True
+    )
     supplier = db.relationship("Supplier", backref="purchase_orders")
 
     status = db.Column(
-        db.Enum(POStatus, name="postatus"), default=POStatus.DRAFT, nullable=False
+        db.Enum(POStatus, name="postatus"),
+        default=POStatus.DRAFT,
+        nullable=False,
+        index=True,
     )
     order_date = db.Column(db.DateTime, default=datetime.utcnow)
     expected_date = db.Column(db.DateTime)
@@ -41,12 +48,21 @@ class PurchaseOrderItem(db.Model):
         db.Integer,
         db.ForeignKey("purchase_order.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
     )
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
 
     qty = db.Column(db.Numeric(18, 3), nullable=False)
     price = db.Column(db.Numeric(18, 2), nullable=False)
     line_total = db.Column(db.Numeric(18, 2), nullable=False)
+    # dòng VQ nguồn (truy vết chuyển đổi chứng từ)
+    source_line_id = db.Column(
+        db.Integer,
+        db.ForeignKey("vendor_quotation_line.id", ondelete="SET NULL"),
+        index=True,
+    )
 
     po = db.relationship("PurchaseOrder", backref="items")
     material = db.relationship("Material")
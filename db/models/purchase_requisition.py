@@ -14,12 +14,16 @@ class PurchaseRequisition(db.Model):
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     # dept_id = db.Column(db.Integer, db.ForeignKey("department.id"), nullable=False)
     requester_id = db.Column(
-        db.Integer, db.ForeignKey("user_account.id"), nullable=False
+        db.Integer,
+        db.ForeignKey("user_account.id"),
+        nullable=False,
+        index=True,
     )
     status = db.Column(
         db.Enum(PurchaseRequisitionStatus),
         default=PurchaseRequisitionStatus.DRAFT,
         nullable=False,
+        index=True,
     )  # draft/submitted/approved/rejected
     note = db.Column(db.Text)
     # department = db.relationship("Department")
@@ -33,8 +37,11 @@ class PRLine(db.Model):
         db.Integer,
         db.ForeignKey("purchase_requisition.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
     )
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
     qty = db.Column(db.Numeric(18, 3), nullable=False)
     pr = db.relationship(
         "PurchaseRequisition", backref=db.backref("lines", cascade="all, delete-orphan")
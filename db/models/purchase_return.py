@@ -14,11 +14,14 @@ class PurchaseReturnStatus(enum.Enum):
 class PurchaseReturn(db.Model):
     __tablename__ = "purchase_return"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    gr_id = db.Column(db.Integer, db.ForeignKey("goods_receipt.id"), nullable=False)
+    gr_id = db.Column(
+        db.Integer, db.ForeignKey("goods_receipt.id"), nullable=False, index=True
+    )
     status = db.Column(
         db.Enum(PurchaseReturnStatus),
         default=PurchaseReturnStatus.DRAFT,
         nullable=False,
+        index=True,
     )
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
@@ -38,9 +41,32 @@ class ReturnLine(db.Model):
         db.Integer,
         db.ForeignKey("purchase_return.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    gr_line_id = db.Column(
+        db.Integer, db.ForeignKey("gr_line.id"), nullable=False, index=True
     )
-    gr_line_id = db.Column(db.Integer, db.ForeignKey("gr_line.id"), nullable=False)
     qty = db.Column(db.Numeric(18, 3), nullable=False)
     reason = db.Column(db.Text)
 
     gr_line = db.relationship("GRLine")
+
+
+class GRLineReturnBalance(db.Model):
+    """Số đã nhận (QC PASSED), đã trả (POSTED) và còn được trả theo từng GR line."""
+
+    __tablename__ = "gr_line_return_balance"
+    gr_line_id = db.Column(
+        db.Integer,
+        db.ForeignKey("gr_line.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    gr_id = db.Column(
+        db.Integer,
+        db.ForeignKey("goods_receipt.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    accepted_qty = db.Column(db.Numeric(18, 3), default=0, nullable=False)
+    returned_qty = db.Column(db.Numeric(18, 3), default=0, nullable=False)
+    returnable_qty = db.Column(db.Numeric(18, 3), default=0, nullable=False)
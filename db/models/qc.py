@@ -12,10 +12,15 @@ class QCStatus(enum.Enum):
 class QCReport(db.Model):
     __tablename__ = "qc_report"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    gr_id = db.Column(db.Integer, db.ForeignKey("goods_receipt.id"), nullable=False)
+    gr_id = db.Column(
+        db.Integer, db.ForeignKey("goods_receipt.id"), nullable=False, index=True
+    )
 
     status = db.Column(
-        db.Enum(QCStatus), default=QCStatus.PENDING, nullable=False
+        db.Enum(QCStatus),
+        default=QCStatus.PENDING,
+        nullable=False,
+        index=True,
     )  # pending/passed/failed
     checked_at = db.Column(DateTime(timezone=True), nullable=True, index=True)
     gr = db.relationship("GoodsReceipt")
@@ -25,9 +30,14 @@ class QCLine(db.Model):
     __tablename__ = "qc_line"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     qc_id = db.Column(
-        db.Integer, db.ForeignKey("qc_report.id", ondelete="CASCADE"), nullable=False
+        db.Integer,
+        db.ForeignKey("qc_report.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    gr_line_id = db.Column(
+        db.Integer, db.ForeignKey("gr_line.id"), nullable=False, index=True
     )
-    gr_line_id = db.Column(db.Integer, db.ForeignKey("gr_line.id"), nullable=False)
     result = db.Column(db.String(10))  # pass/fail
     accepted_qty = db.Column(db.Numeric(18, 3), default=0)
     note = db.Column(db.Text)
@@ -12,9 +12,12 @@ class RFQStatus(enum.Enum):
 class RFQ(db.Model):
     __tablename__ = "rfq"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
-    pr_id = db.Column(db.Integer, db.ForeignKey("purchase_requisition.id"))
+    pr_id = db.Column(db.Integer, db.ForeignKey("purchase_requisition.id"), index=True)
     status = db.Column(
-        db.Enum(RFQStatus), default=RFQStatus.DRAFT, nullable=False
+        db.Enum(RFQStatus),
+        default=RFQStatus.DRAFT,
+        nullable=False,
+        index=True,
     )  # draft/submitted/approved/rejected
 
     pr = db.relationship("PurchaseRequisition")
@@ -33,10 +36,19 @@ class RFQLine(db.Model):
     __tablename__ = "rfq_line"
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     rfq_id = db.Column(
-        db.Integer, db.ForeignKey("rfq.id", ondelete="CASCADE"), nullable=False
+        db.Integer,
+        db.ForeignKey("rfq.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
     )
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
     qty = db.Column(db.Numeric(18, 3), nullable=False)
+    # dòng PR nguồn (truy vết chuyển đổi chứng từ)
+    source_line_id = db.Column(
+        db.Integer, db.ForeignKey("pr_line.id", ondelete="SET NULL"), index=True
+    )
 
     rfq = db.relationship(
         "RFQ",
@@ -45,3 +57,32 @@ class RFQLine(db.Model):
         ),
     )
     material = db.relationship("Material")
+
+
+class RFQLineSource(db.Model):
+    """
+    Liên kết dòng RFQ gộp nhu cầu -> các dòng PR nguồn (nhiều PR / 1 dòng RFQ).
+    pr_line_id unique: 1 dòng PR chỉ được đưa vào 1 RFQ.
+    """
+
+    __tablename__ = "rfq_line_source"
+    rfq_line_id = db.Column(
+        db.Integer,
+        db.ForeignKey("rfq_line.id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    pr_line_id = db.Column(
+        db.Integer,
+        db.ForeignKey("pr_line.id", ondelete="CASCADE"),
+        primary_key=True,
+        unique=True,
+    )
+    qty = db.Column(db.Numeric(18, 3), nullable=False)
+
+    rfq_line = db.relationship(
+        "RFQLine",
+        backref=db.backref(
+            "sources", cascade="all, delete-orphan", lazy="select", passive_deletes=True
+        ),
+    )
+    pr_line = db.relationship("PRLine")
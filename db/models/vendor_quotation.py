@@ -10,15 +10,31 @@ class VendorQuotationStatus(enum.Enum):
 
 class VendorQuotation(db.Model):
     __tablename__ = "vendor_quotation"
+    # mỗi RFQ chỉ 1 VQ SELECTED (partial unique index)
+    __table_args__ = (
+        db.Index(
+            "ux_vendor_quotation_rfq_selected",
+            "rfq_id",
+            unique=True,
+            postgresql_where=db.text("status = 'SELECTED'"),
+            sqlite_where=db.text("status = 'SELECTED'"),
+        ),
+    )
     id = db.Column(db.Integer, primary_key=True, autoincrement=True)
     rfq_id = db.Column(
-        db.Integer, db.ForeignKey("rfq.id", ondelete="CASCADE"), nullable=False
+        db.Integer,
+        db.ForeignKey("rfq.id", ondelete="CASCADE"),
+        nullable=False,
+        index=True,
+    )
+    supplier_id = db.Column(
+        db.Integer, db.ForeignKey("supplier.id"), nullable=False, index=True
     )
-    supplier_id = db.Column(db.Integer, db.ForeignKey("supplier.id"), nullable=False)
     status = db.Column(
         db.Enum(VendorQuotationStatus),
         default=VendorQuotationStatus.RECEIVED,
         nullable=False,
+        index=True,
     )  # received/selected/rejected
 
     # Ghép với RFQ.vqs
@@ -33,10 +49,17 @@ class VendorQuotationLine(db.Model):
         db.Integer,
         db.ForeignKey("vendor_quotation.id", ondelete="CASCADE"),
         nullable=False,
+        index=True,
+    )
+    material_id = db.Column(
+        db.Integer, db.ForeignKey("material.id"), nullable=False, index=True
     )
-    material_id = db.Column(db.Integer, db.ForeignKey("material.id"), nullable=False)
     qty = db.Column(db.Numeric(18, 3), nullable=False)
     price = db.Column(db.Numeric(18, 2), nullable=False)
+    # dòng RFQ nguồn (truy vết chuyển đổi chứng từ)
+    source_line_id = db.Column(
+        db.Integer, db.ForeignKey("rfq_line.id", ondelete="SET NULL"), index=True
+    )
 
     vq = db.relationship(
         "VendorQuotation",
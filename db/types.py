@@ -0,0 +1,7 @@
+# db/types.py
+from sqlalchemy import JSON
+from sqlalchemy.dialects.postgresql import JSONB
+
+# JSONB trên Postgres (giữ nguyên schema/migration hiện có), JSON ở dialect
+# khác -> model chạy được trên SQLite in-memory cho bench / kiểm thử DAO
+PortableJSON = JSON().with_variant(JSONB(), "postgresql")
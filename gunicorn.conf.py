@@ -0,0 +1,38 @@
+# gunicorn.conf.py
+# Chạy: gunicorn -c gunicorn.conf.py wsgi:app
+# Env: GUNICORN_BIND, WEB_CONCURRENCY (số worker), GUNICORN_THREADS,
+#      GUNICORN_TIMEOUT, GUNICORN_PRELOAD (1/0), WARMUP (1/0)
+# Tổng kết nối DB tối đa ~ workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW):
+# đặt pool_size ~ threads để mỗi thread có sẵn 1 kết nối.
+import multiprocessing
+import os
+
+bind = os.getenv("GUNICORN_BIND", "0.0.0.0:8000")
+workers = int(os.getenv("WEB_CONCURRENCY", multiprocessing.cpu_count() * 2 + 1))
+threads = int(os.getenv("GUNICORN_THREADS", "4"))
+worker_class = "gthread"
+preload_app = os.getenv("GUNICORN_PRELOAD", "1") == "1"
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = 30
+keepalive = 5
+accesslog = "-"
+
+
+def post_fork(server, worker):
+    # kết nối mở ở master khi preload không được dùng chung giữa các process:
+    # bỏ pool kế thừa (close=False: không đóng socket của master)
+    from app import app
+    from configs import db
+
+    with app.app_context():
+        for engine in db.engines.values():
+            engine.dispose(close=False)
+
+
+def post_worker_init(worker):
+    # chạy trước khi worker nhận request đầu tiên
+    from app import app
+    from utils import warmup
+
+    if warmup.enabled():
+        warmup.warm_up_db(app, connections=threads)
@@ -0,0 +1,35 @@
+# jobs/consolidate_demand.py
+# Gộp dòng PR APPROVED chưa được đưa vào RFQ thành RFQ gộp nhu cầu.
+# Chạy: python -m jobs.consolidate_demand [--by-unit] [--status draft] [--dry-run]
+import argparse
+from dao import rfq_consolidation as cons
+from app import app
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Consolidate approved PR demand into RFQs")
+    ap.add_argument("--by-unit", action="store_true", help="1 RFQ / đơn vị tính")
+    ap.add_argument("--status", default="draft")
+    ap.add_argument("--dry-run", action="store_true")
+    args = ap.parse_args()
+
+    demand = cons.pending_demand(by_unit=args.by_unit)
+    for d in demand:
+        print(
+            f"  {d['sku'] or d['material_id']:<20} {d['qty']:>14} {d['unit_name'] or ''}"
+            f"  ({d['line_count']} dòng / {d['pr_count']} PR)"
+        )
+    if not demand:
+        print("✓ Không có nhu cầu chờ gộp")
+        return
+    if args.dry_run:
+        print(f"✓ {len(demand)} vật tư chờ gộp (dry-run)")
+        return
+
+    rfqs = cons.consolidate(by_unit=args.by_unit, status=args.status)
+    print(f"✓ Created {len(rfqs)} RFQ: " + ", ".join(f"#{r.id}" for r in rfqs))
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
@@ -0,0 +1,25 @@
+# jobs/precompile_templates.py
+# Biên dịch toàn bộ template Jinja vào bytecode cache (JINJA_CACHE_DIR) ở bước
+# build / deploy -> worker khởi động lạnh không phải compile template nữa.
+# Chạy: python -m jobs.precompile_templates
+from utils import template_cache, warmup
+from app import app
+
+
+def main():
+    path = template_cache.cache_dir(app)
+    if app.jinja_env.bytecode_cache is None:
+        raise SystemExit(
+            f"Bytecode cache đang tắt (JINJA_BYTECODE_CACHE=0 hoặc không tạo được {path})."
+        )
+    res = warmup.warm_up_code(app)
+    for err in res["template_errors"]:
+        print(f"✗ {err}")
+    print(f"✓ Precompiled {res['templates']} templates -> {path} ({res['ms']} ms)")
+    if res["template_errors"]:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
@@ -0,0 +1,17 @@
+# jobs/rebuild_invoice_balances.py
+# Tính lại vendor_invoice.paid_total / balance từ bảng payment.
+# Chạy: python -m jobs.rebuild_invoice_balances
+from configs import db
+from dao import invoice as inv_dao
+from app import app
+
+
+def main():
+    inv_dao.rebuild_paid_totals()
+    db.session.commit()
+    print("✓ vendor_invoice.paid_total/balance rebuilt")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
@@ -0,0 +1,20 @@
+# jobs/rebuild_invoice_fingerprints.py
+# Tính lại vendor_invoice.fingerprint (phát hiện hóa đơn trùng) theo lô.
+# Chạy: python -m jobs.rebuild_invoice_fingerprints [--batch-size 2000]
+import argparse
+from dao import invoice as inv_dao
+from app import app
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Rebuild vendor invoice fingerprints")
+    ap.add_argument("--batch-size", type=int, default=2000)
+    args = ap.parse_args()
+
+    n = inv_dao.rebuild_fingerprints(batch_size=args.batch_size)
+    print(f"✓ Rebuilt fingerprint for {n} invoices")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
@@ -0,0 +1,20 @@
+# jobs/rebuild_price_history.py
+# Backfill / dựng lại bảng material_price_history từ PO CONFIRMED/COMPLETED
+# và hóa đơn NCC (không CANCELED).
+# Chạy: python -m jobs.rebuild_price_history
+from configs import db
+from db.models.price_history import MaterialPriceHistory
+from dao import price_history
+from app import app
+
+
+def main():
+    price_history.rebuild_all()
+    db.session.commit()
+    n = db.session.query(MaterialPriceHistory).count()
+    print(f"✓ material_price_history rebuilt ({n} rows)")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
@@ -0,0 +1,17 @@
+# jobs/rebuild_return_balance.py
+# Dựng lại bảng gr_line_return_balance từ QC PASSED + phiếu trả POSTED.
+# Chạy: python -m jobs.rebuild_return_balance
+from configs import db
+from dao import return_balance as ret_bal
+from app import app
+
+
+def main():
+    ret_bal.rebuild_all()
+    db.session.commit()
+    print("✓ gr_line_return_balance rebuilt")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
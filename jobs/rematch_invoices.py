@@ -0,0 +1,25 @@
+# jobs/rematch_invoices.py
+# Đối chiếu 3 chiều lại toàn bộ hóa đơn theo lô.
+# Chạy: python -m jobs.rematch_invoices [--batch-size 2000] [--all]
+import argparse
+import time
+from dao import invoice_match as inv_match
+from app import app
+
+
+def main():
+    ap = argparse.ArgumentParser(description="Re-match vendor invoices (PO/GR/INV)")
+    ap.add_argument("--batch-size", type=int, default=2000)
+    ap.add_argument(
+        "--all", action="store_true", help="gồm cả hóa đơn PAID/CANCELED"
+    )
+    args = ap.parse_args()
+
+    t0 = time.perf_counter()
+    n = inv_match.rematch_all(batch_size=args.batch_size, include_closed=args.all)
+    print(f"✓ Re-matched {n} invoices in {time.perf_counter() - t0:.1f}s")
+
+
+if __name__ == "__main__":
+    with app.app_context():
+        main()
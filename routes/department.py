@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import department as department_dao
 
 department_bp = Blueprint("department_web", __name__)
@@ -7,6 +8,7 @@ department_bp = Blueprint("department_web", __name__)
 
 @department_bp.route("/departments")
 @login_required
+@read_replica()
 def departments_list():
     deps = department_dao.list_departments()
     return render_template("department/departments.html", departments=deps)
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import goods_receipt as gr_dao, purchase as po_dao, material as material_dao
 from sqlalchemy import func
 from db.models.purchase import POStatus
@@ -9,6 +10,7 @@ gr_bp = Blueprint("gr_web", __name__)
 
 @gr_bp.route("/goods-receipts")
 @login_required
+@read_replica()
 def gr_list():
     goods_receipts = gr_dao.list_grs()
     return render_template("receipt/goods_receipt.html", goods_receipts=goods_receipts)
@@ -16,6 +18,7 @@ def gr_list():
 
 @gr_bp.route("/goods-receipts/api/po/<int:po_id>/remaining")
 @login_required
+@read_replica()
 def gr_api_po_remaining(po_id: int):
     po = po_dao.get_po(po_id)
     # chỉ cho PO đã CONFIRMED
@@ -101,6 +104,18 @@ def gr_from_po(po_id: int):
     )
 
 
+@gr_bp.route("/goods-receipts/from-po/<int:po_id>/receive-all", methods=["POST"])
+@login_required
+def gr_receive_all(po_id: int):
+    try:
+        gr = gr_dao.create_gr_from_po(po_id, request.form.get("status", "draft"))
+        flash(f"Đã tạo GR#{gr.id} cho toàn bộ phần còn lại của PO", "success")
+        return redirect(url_for("gr_web.gr_edit", gr_id=gr.id))
+    except ValueError as e:
+        flash(str(e), "warning")
+        return redirect(url_for("gr_web.gr_from_po", po_id=po_id))
+
+
 @gr_bp.route("/goods-receipts/edit/<int:gr_id>", methods=["GET", "POST"])
 @login_required
 def gr_edit(gr_id: int):
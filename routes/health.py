@@ -0,0 +1,32 @@
+# routes/health.py
+import time
+from flask import Blueprint, jsonify
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from configs import db
+from utils.db_pool import pool_stats
+
+health_bp = Blueprint("health", __name__)
+
+
+@health_bp.route("/health/db")
+def db_health():
+    """Ping từng engine (mặc định + bind) và trả số liệu pool; 503 nếu có engine lỗi."""
+    ok = True
+    engines = {}
+    for key, engine in db.engines.items():
+        info = {"dialect": engine.dialect.name}
+        t0 = time.perf_counter()
+        try:
+            with engine.connect() as conn:
+                conn.execute(text("SELECT 1"))
+            info["status"] = "ok"
+        except SQLAlchemyError as ex:
+            ok = False
+            info["status"] = "error"
+            info["error"] = type(ex).__name__
+        info["ping_ms"] = round((time.perf_counter() - t0) * 1000, 3)
+        info.update(pool_stats(engine))
+        engines[key or "default"] = info
+    body = {"status": "ok" if ok else "error", "engines": engines}
+    return jsonify(body), 200 if ok else 503
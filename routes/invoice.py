@@ -2,8 +2,10 @@
 from decimal import Decimal, InvalidOperation
 from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import (
     invoice as inv_dao,
+    invoice_match as inv_match_dao,
     supplier as supplier_dao,
     purchase as po_dao,
     material as material_dao,
@@ -26,6 +28,19 @@ def _form_deps():
     }
 
 
+def _flash_duplicates(inv):
+    dup = getattr(inv, "duplicates", None) or {}
+    if dup.get("exact"):
+        ids = ", ".join(f"INV#{i}" for i in dup["exact"])
+        flash(f"Cảnh báo: hóa đơn trùng hoàn toàn với {ids}.", "warning")
+    if dup.get("near"):
+        ids = ", ".join(f"INV#{i}" for i in dup["near"])
+        flash(
+            f"Cảnh báo: có thể trùng với {ids} (cùng NCC, cùng tổng tiền, ngày gần nhau).",
+            "warning",
+        )
+
+
 def _to_decimal(v, default="0"):
     try:
         return Decimal(
@@ -71,6 +86,7 @@ def _extract_lines(req):
 # ---------------- routes ----------------
 @invoice_bp.route("/invoices/api/po/<int:po_id>/supplier")
 @login_required
+@read_replica()
 def invoice_api_po_supplier(po_id: int):
     po = db.session.get(PurchaseOrder, po_id)
     if not po:
@@ -81,9 +97,19 @@ def invoice_api_po_supplier(po_id: int):
 
 @invoice_bp.route("/invoices")
 @login_required
+@read_replica()
 def invoice_list():
-    invoices = inv_dao.list_invoices()
-    return render_template("invoice/invoice_payment.html", invoices=invoices)
+    register = inv_dao.list_invoice_register(
+        page=request.args.get("page", 1, type=int),
+        per_page=request.args.get("per_page", 50, type=int),
+        status=request.args.get("status") or None,
+    )
+    return render_template(
+        "invoice/invoice_payment.html",
+        invoices=register["items"],
+        register=register,
+        status_filter=request.args.get("status") or "",
+    )
 
 
 @invoice_bp.route("/invoices/add", methods=["GET", "POST"])
@@ -114,10 +140,11 @@ def invoice_add():
             flash("Hóa đơn cần ít nhất một dòng hợp lệ.", "warning")
         else:
             try:
-                inv_dao.create_invoice(
+                inv = inv_dao.create_invoice(
                     supplier_id, po_id, status, lines, issued_at=issued_at
                 )
                 flash("Tạo hóa đơn thành công", "success")
+                _flash_duplicates(inv)
                 return redirect(url_for("invoice_web.invoice_list"))
             except Exception as ex:
                 flash(str(ex), "danger")
@@ -148,10 +175,11 @@ def invoice_edit(invoice_id: int):
         issued_at = request.form.get("issued_at")
         lines = _extract_lines(request)
         try:
-            inv_dao.update_invoice(
+            inv = inv_dao.update_invoice(
                 invoice_id, supplier_id, po_id, status, lines, issued_at=issued_at
             )
             flash("Cập nhật hóa đơn thành công", "success")
+            _flash_duplicates(inv)
             return redirect(url_for("invoice_web.invoice_list"))
         except Exception as ex:
             flash(str(ex), "danger")
@@ -161,6 +189,7 @@ def invoice_edit(invoice_id: int):
         "invoice/invoice_form.html",
         action="edit",
         inv=inv,
+        match_lines=inv_match_dao.list_match_lines(invoice_id),
         **deps,
     )
 
@@ -176,9 +205,33 @@ def invoice_delete(invoice_id: int):
     return redirect(url_for("invoice_web.invoice_list"))
 
 
+# --- API: kết quả đối chiếu 3 chiều của hóa đơn ---
+@invoice_bp.route("/invoices/api/<int:invoice_id>/match")
+@login_required
+@read_replica()
+def invoice_api_match(invoice_id: int):
+    data = [
+        {
+            "material_id": m.material_id,
+            "invoiced_qty": float(m.invoiced_qty or 0),
+            "invoice_price": float(m.invoice_price or 0),
+            "ordered_qty": float(m.ordered_qty or 0),
+            "po_price": float(m.po_price or 0),
+            "received_qty": float(m.received_qty or 0),
+            "billed_qty": float(m.billed_qty or 0),
+            "qty_variance": float(m.qty_variance or 0),
+            "price_variance": float(m.price_variance or 0),
+            "status": m.status,
+        }
+        for m in inv_match_dao.list_match_lines(invoice_id)
+    ]
+    return jsonify(data)
+
+
 # --- API: lấy lines từ PO (PO Items) ---
 @invoice_bp.route("/invoices/api/po/<int:po_id>/lines")
 @login_required
+@read_replica()
 def invoice_api_po_lines(po_id: int):
     po = PurchaseOrder.query.get(po_id)
     if not po:
@@ -208,6 +261,7 @@ def invoice_api_po_lines(po_id: int):
 # --- API: lấy lines từ GR (GR Lines) + cố gắng map price theo PO Item ---
 @invoice_bp.route("/invoices/api/gr/<int:gr_id>/lines")
 @login_required
+@read_replica()
 def invoice_api_gr_lines(gr_id: int):
     gr = GoodsReceipt.query.get(gr_id)
     if not gr:
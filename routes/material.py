@@ -1,12 +1,14 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import Blueprint, render_template, request, redirect, url_for, flash, jsonify
 from flask_login import login_required
-from dao import material as material_dao, unit as unit_dao
+from utils.read_replica import read_replica
+from dao import material as material_dao, unit as unit_dao, price_history
 
 material_bp = Blueprint("material_web", __name__)
 
 
 @material_bp.route("/materials")
 @login_required
+@read_replica()
 def materials_list():
     materials = material_dao.list_materials()
     return render_template("material/materials.html", materials=materials)
@@ -59,3 +61,37 @@ def materials_delete(material_id: int):
     material_dao.delete_material(material_id)
     flash("Xóa nguyên liệu thành công", "success")
     return redirect(url_for("material_web.materials_list"))
+
+
+# --- API: gợi ý giá (giá gần nhất + bình quân 12 tháng) cho nhiều vật tư ---
+# GET /materials/api/price-hints?ids=1,2,3&supplier_id=5
+@material_bp.route("/materials/api/price-hints")
+@login_required
+@read_replica()
+def materials_api_price_hints():
+    ids = []
+    for part in request.args.getlist("ids"):
+        ids += [int(x) for x in part.split(",") if x.strip().isdigit()]
+    supplier_id = request.args.get("supplier_id", type=int)
+    hints = price_history.price_hints(ids[:500], supplier_id=supplier_id)
+
+    def num(v):
+        return float(v) if v is not None else None
+
+    def day(v):
+        return str(v) if v is not None else None
+
+    return jsonify(
+        {
+            str(mid): {
+                "last_price": num(h["last_price"]),
+                "last_date": day(h["last_date"]),
+                "last_supplier_id": h["last_supplier_id"],
+                "supplier_last_price": num(h["supplier_last_price"]),
+                "supplier_last_date": day(h["supplier_last_date"]),
+                "avg_price": num(h["avg_price"]),
+                "samples": h["samples"],
+            }
+            for mid, h in hints.items()
+        }
+    )
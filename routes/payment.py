@@ -1,7 +1,22 @@
 # routes/payments.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    jsonify,
+)
 from flask_login import login_required
-from dao import payment as pay_dao, invoice as inv_dao
+from utils.read_replica import read_replica
+from dao import (
+    payment as pay_dao,
+    invoice as inv_dao,
+    payment_run as run_dao,
+    supplier_payment as sp_dao,
+    supplier as supplier_dao,
+)
 
 payment_bp = Blueprint("payment_web", __name__)
 
@@ -20,7 +35,7 @@ def payment_add():
         except Exception as ex:
             flash(str(ex), "danger")
         return redirect(url_for("invoice_web.invoice_list"))
-    invoices = inv_dao.list_invoices()
+    invoices = inv_dao.list_invoice_options()
     return render_template(
         "invoice/payment_form.html", action="add", payment=None, invoices=invoices
     )
@@ -43,7 +58,7 @@ def payment_edit(payment_id: int):
         except Exception as ex:
             flash(str(ex), "danger")
         return redirect(url_for("invoice_web.invoice_list"))
-    invoices = inv_dao.list_invoices()
+    invoices = inv_dao.list_invoice_options()
     return render_template(
         "invoice/payment_form.html", action="edit", payment=payment, invoices=invoices
     )
@@ -58,3 +73,133 @@ def payment_delete(payment_id: int):
     except Exception as ex:
         flash(str(ex), "danger")
     return redirect(url_for("invoice_web.invoice_list"))
+
+
+@payment_bp.route("/payments/run", methods=["GET", "POST"])
+@login_required
+def payment_run():
+    filters = {
+        "supplier_id": request.args.get("supplier_id") or None,
+        "issued_before": request.args.get("issued_before") or None,
+        "min_balance": request.args.get("min_balance") or None,
+    }
+    results = None
+    if request.method == "POST":
+        ids = request.form.getlist("invoice_id")
+        items = [
+            {"invoice_id": iid, "amount": request.form.get(f"amount_{iid}")}
+            for iid in ids
+        ]
+        try:
+            results = run_dao.execute_payment_run(
+                items,
+                request.form.get("method", "bank"),
+                request.form.get("note") or None,
+            )
+            ok = sum(1 for r in results if r["result"] == run_dao.OK)
+            flash(f"Đã thanh toán {ok}/{len(results)} hóa đơn.", "success")
+        except Exception as ex:
+            flash(str(ex), "danger")
+    try:
+        proposals = run_dao.propose_payment_run(**filters)
+    except ValueError as ex:
+        flash(str(ex), "danger")
+        proposals = []
+    return render_template(
+        "invoice/payment_run.html",
+        proposals=proposals,
+        results=results,
+        filters=filters,
+        suppliers=supplier_dao.list_suppliers(),
+    )
+
+
+# ---------------- chứng từ thanh toán NCC (phân bổ nhiều hóa đơn) ----------------
+@payment_bp.route("/supplier-payments")
+@login_required
+@read_replica()
+def supplier_payment_list():
+    return render_template(
+        "invoice/supplier_payment_list.html",
+        payments=sp_dao.list_supplier_payments(),
+        allocated_total=sp_dao.allocated_total,
+    )
+
+
+@payment_bp.route("/supplier-payments/add", methods=["GET", "POST"])
+@login_required
+def supplier_payment_add():
+    if request.method == "POST":
+        ids = request.form.getlist("alloc_invoice_id")
+        allocations = None
+        if request.form.get("mode") == "manual":
+            allocations = [
+                {"invoice_id": iid, "amount": request.form.get(f"alloc_{iid}")}
+                for iid in ids
+            ]
+        try:
+            sp = sp_dao.create_supplier_payment(
+                request.form.get("supplier_id"),
+                request.form.get("amount"),
+                request.form.get("method", "bank"),
+                request.form.get("note") or None,
+                allocations,
+            )
+            flash(f"Đã ghi chứng từ thanh toán SP#{sp.id}.", "success")
+            return redirect(
+                url_for("payment_web.supplier_payment_view", sp_id=sp.id)
+            )
+        except Exception as ex:
+            flash(str(ex), "danger")
+    return render_template(
+        "invoice/supplier_payment_form.html",
+        suppliers=supplier_dao.list_suppliers(),
+    )
+
+
+@payment_bp.route("/supplier-payments/api/allocate")
+@login_required
+def supplier_payment_allocate_api():
+    supplier_id = request.args.get("supplier_id", type=int)
+    if not supplier_id:
+        return jsonify({"allocations": [], "unallocated": 0})
+    res = sp_dao.allocate_oldest_first(supplier_id, request.args.get("amount") or 0)
+    return jsonify(
+        {
+            "allocations": [
+                {
+                    "invoice_id": a["invoice_id"],
+                    "issued_at": a["issued_at"].isoformat() if a["issued_at"] else None,
+                    "balance": float(a["balance"]),
+                    "amount": float(a["amount"]),
+                }
+                for a in res["allocations"]
+            ],
+            "unallocated": float(res["unallocated"]),
+        }
+    )
+
+
+@payment_bp.route("/supplier-payments/<int:sp_id>")
+@login_required
+def supplier_payment_view(sp_id: int):
+    sp = sp_dao.get_supplier_payment(sp_id)
+    if not sp:
+        flash("Không tìm thấy chứng từ thanh toán", "warning")
+        return redirect(url_for("payment_web.supplier_payment_list"))
+    return render_template(
+        "invoice/supplier_payment_view.html",
+        sp=sp,
+        allocated=sp_dao.allocated_total(sp),
+    )
+
+
+@payment_bp.route("/supplier-payments/delete/<int:sp_id>", methods=["POST"])
+@login_required
+def supplier_payment_delete(sp_id: int):
+    try:
+        sp_dao.delete_supplier_payment(sp_id)
+        flash("Đã xóa chứng từ thanh toán.", "success")
+    except Exception as ex:
+        flash(str(ex), "danger")
+    return redirect(url_for("payment_web.supplier_payment_list"))
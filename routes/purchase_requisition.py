@@ -1,5 +1,14 @@
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    jsonify,
+)
 from flask_login import login_required, current_user
+from utils.read_replica import read_replica
 from db.models.user import UserRole
 from db.models.purchase_requisition import PurchaseRequisitionStatus
 from dao import (
@@ -15,6 +24,7 @@ pr_bp = Blueprint("pr_web", __name__)
 
 @pr_bp.route("/prs")
 @login_required
+@read_replica()
 def pr_list():
     prs = pr_dao.list_prs()
     return render_template("purchase/purchase_requisition.html", requisitions=prs)
@@ -90,6 +100,41 @@ def pr_edit(pr_id: int):
     )
 
 
+@pr_bp.route("/prs/bulk-status", methods=["POST"])
+@login_required
+def pr_bulk_status():
+    """Duyệt/từ chối nhiều PR: ids=..&ids=..&status=APPROVED|REJECTED|..."""
+    ids = request.form.getlist("ids", type=int)
+    status = request.form.get("status", "")
+    wants_json = request.accept_mimetypes.best == "application/json"
+
+    # giống pr_edit: chỉ APPROVER được đổi trạng thái PR
+    if not current_user.has_role(UserRole.APPROVER):
+        msg = "Bạn không có quyền đổi trạng thái PR."
+        if wants_json:
+            return jsonify({"error": msg}), 403
+        flash(msg, "danger")
+        return redirect(url_for("pr_web.pr_list"))
+
+    try:
+        report = pr_dao.bulk_set_status(ids, status)
+    except ValueError as e:
+        if wants_json:
+            return jsonify({"error": str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(url_for("pr_web.pr_list"))
+
+    if wants_json:
+        return jsonify(report)
+    done = [r for r in report if r["result"] == pr_dao.OK]
+    if done:
+        flash(f"Đã cập nhật {len(done)} PR.", "success")
+    for r in report:
+        if r["result"] != pr_dao.OK:
+            flash(f"PR#{r['id']}: {r['message']}", "warning")
+    return redirect(url_for("pr_web.pr_list"))
+
+
 @pr_bp.route("/prs/delete/<int:pr_id>", methods=["POST"])
 @login_required
 def pr_delete(pr_id: int):
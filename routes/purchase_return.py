@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import purchase_return as ret_dao, goods_receipt as gr_dao, qc as qc_dao
 
 preturn_bp = Blueprint("preturn_web", __name__)
@@ -7,6 +8,7 @@ preturn_bp = Blueprint("preturn_web", __name__)
 
 @preturn_bp.route("/returns")
 @login_required
+@read_replica()
 def return_list():
     returns = ret_dao.list_returns()
     return render_template("purchase/purchase_return.html", returns=returns)
@@ -1,6 +1,7 @@
 # routes/purchase.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import purchase as po_dao, supplier as supplier_dao
 from dao import vendor_quotation as vq_dao  # 👈 thêm để load VQ
 
@@ -9,6 +10,7 @@ purchase_bp = Blueprint("purchase_web", __name__)
 
 @purchase_bp.route("/purchases")
 @login_required
+@read_replica()
 def purchases_list():
     purchases = po_dao.list_purchases()
     return render_template("purchase/purchases.html", purchases=purchases)
@@ -30,7 +32,7 @@ def purchases_add():
         "subtotal": 0,
         "tax": 0,
         "total": 0,
-        "suggest_po_no": "",  # bạn có thể tự sinh mã
+        "suggest_po_no": "",  # để trống -> DAO tự cấp số theo sequence
     }
 
     if from_vq:
@@ -47,7 +49,6 @@ def purchases_add():
             prefill["subtotal"] = round(s, 2)
             prefill["tax"] = 0
             prefill["total"] = round(s, 2)
-            prefill["suggest_po_no"] = f"PO-VQ{vq.id}"
 
     if request.method == "POST":
         po_no = request.form.get("po_no", prefill["suggest_po_no"] or "")
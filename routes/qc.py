@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import qc as qc_dao, goods_receipt as gr_dao
 
 qc_bp = Blueprint("qc_web", __name__)
@@ -7,6 +8,7 @@ qc_bp = Blueprint("qc_web", __name__)
 
 @qc_bp.route("/qcs")
 @login_required
+@read_replica()
 def qc_list():
     qcs = qc_dao.list_qcs()
     return render_template("qc/qc.html", qcs=qcs)
@@ -0,0 +1,62 @@
+# routes/report.py
+import csv
+import io
+from flask import Blueprint, render_template, request, Response, stream_with_context
+from flask_login import login_required
+from utils.read_replica import read_replica
+from dao import report as report_dao
+
+report_bp = Blueprint("report_web", __name__)
+
+
+def _load_aging():
+    try:
+        return report_dao.ap_aging(request.args.get("as_of") or None)
+    except ValueError:  # as_of sai định dạng -> lấy hôm nay
+        return report_dao.ap_aging(None)
+
+
+@report_bp.route("/reports/ap-aging")
+@login_required
+@read_replica()
+def ap_aging():
+    return render_template("report/ap_aging.html", report=_load_aging())
+
+
+@report_bp.route("/reports/ap-aging.csv")
+@login_required
+@read_replica()
+def ap_aging_csv():
+    data = _load_aging()
+    keys = [b[0] for b in data["buckets"]]
+
+    def generate():
+        buf = io.StringIO()
+        w = csv.writer(buf)
+
+        def flush():
+            out = buf.getvalue()
+            buf.seek(0)
+            buf.truncate(0)
+            return out
+
+        w.writerow(
+            ["supplier_code", "supplier_name"]
+            + [b[1] for b in data["buckets"]]
+            + ["total", "invoice_count"]
+        )
+        yield flush()
+        for r in data["rows"]:
+            w.writerow(
+                [r["supplier_code"], r["supplier_name"]]
+                + [f"{r[k]:.2f}" for k in keys]
+                + [f"{r['total']:.2f}", r["invoice_count"]]
+            )
+            yield flush()
+
+    filename = f"ap_aging_{data['as_of'].isoformat()}.csv"
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/csv",
+        headers={"Content-Disposition": f"attachment; filename={filename}"},
+    )
@@ -1,7 +1,17 @@
 # routes/rfq.py
-from flask import Blueprint, render_template, request, redirect, url_for, flash
+from flask import (
+    Blueprint,
+    render_template,
+    request,
+    redirect,
+    url_for,
+    flash,
+    jsonify,
+)
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import rfq as rfq_dao, material as material_dao, purchase_requisition as pr_dao
+from dao import rfq_compare as compare_dao, rfq_consolidation as cons_dao
 from dao import purchase_requisition as pr_dao  # ở đầu file
 
 rfq_bp = Blueprint("rfq_web", __name__)
@@ -9,6 +19,7 @@ rfq_bp = Blueprint("rfq_web", __name__)
 
 @rfq_bp.route("/rfqs")
 @login_required
+@read_replica()
 def rfq_list():
     rfqs = rfq_dao.list_rfqs()
     prs = pr_dao.list_prs_approved()  # hoặc list_prs(), tuỳ bạn
@@ -82,6 +93,33 @@ def rfq_add():
 #     )
 
 
+@rfq_bp.route("/rfqs/consolidate", methods=["GET", "POST"])
+@login_required
+def rfq_consolidate():
+    """Gộp nhu cầu: dòng PR APPROVED chưa có RFQ -> RFQ gộp theo vật tư."""
+    by_unit = bool(request.values.get("by_unit"))
+    if request.method == "POST":
+        material_ids = request.form.getlist("material_ids", type=int)
+        if not material_ids:
+            flash("Vui lòng chọn ít nhất 1 vật tư để gộp.", "danger")
+            return redirect(url_for("rfq_web.rfq_consolidate", by_unit=by_unit or None))
+        try:
+            rfqs = cons_dao.consolidate(material_ids, by_unit=by_unit)
+        except ValueError as e:
+            flash(str(e), "danger")
+            return redirect(url_for("rfq_web.rfq_consolidate", by_unit=by_unit or None))
+        flash(
+            "Đã tạo RFQ gộp nhu cầu: " + ", ".join(f"#{r.id}" for r in rfqs), "success"
+        )
+        return redirect(url_for("rfq_web.rfq_list"))
+
+    return render_template(
+        "rfq/rfq_consolidate.html",
+        demand=cons_dao.pending_demand(by_unit=by_unit),
+        by_unit=by_unit,
+    )
+
+
 @rfq_bp.route("/rfqs/edit/<int:rfq_id>", methods=["GET", "POST"])
 @login_required
 def rfq_edit(rfq_id: int):
@@ -103,6 +141,32 @@ def rfq_edit(rfq_id: int):
     )
 
 
+@rfq_bp.route("/rfqs/bulk-status", methods=["POST"])
+@login_required
+def rfq_bulk_status():
+    """Duyệt/từ chối nhiều RFQ: ids=..&ids=..&status=approved|rejected|..."""
+    ids = request.form.getlist("ids", type=int)
+    status = request.form.get("status", "")
+    wants_json = request.accept_mimetypes.best == "application/json"
+    try:
+        report = rfq_dao.bulk_set_status(ids, status)
+    except ValueError as e:
+        if wants_json:
+            return jsonify({"error": str(e)}), 400
+        flash(str(e), "danger")
+        return redirect(url_for("rfq_web.rfq_list"))
+
+    if wants_json:
+        return jsonify(report)
+    done = [r for r in report if r["result"] == rfq_dao.OK]
+    if done:
+        flash(f"Đã cập nhật {len(done)} RFQ.", "success")
+    for r in report:
+        if r["result"] != rfq_dao.OK:
+            flash(f"RFQ#{r['id']}: {r['message']}", "warning")
+    return redirect(url_for("rfq_web.rfq_list"))
+
+
 @rfq_bp.route("/rfqs/delete/<int:rfq_id>", methods=["POST"])
 @login_required
 def rfq_delete(rfq_id: int):
@@ -111,6 +175,18 @@ def rfq_delete(rfq_id: int):
     return redirect(url_for("rfq_web.rfq_list"))
 
 
+@rfq_bp.route("/rfqs/<int:rfq_id>/compare")
+@login_required
+def rfq_compare(rfq_id: int):
+    rfq = rfq_dao.get_rfq(rfq_id)
+    if not rfq:
+        flash("Không tìm thấy RFQ", "warning")
+        return redirect(url_for("rfq_web.rfq_list"))
+    return render_template(
+        "rfq/rfq_compare.html", rfq=rfq, cmp=compare_dao.compare_rfq(rfq_id)
+    )
+
+
 def _extract_lines(req):
     lines = []
     for key in req.form:
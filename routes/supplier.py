@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import supplier as supplier_dao
 
 supplier_bp = Blueprint("supplier_web", __name__)
@@ -7,6 +8,7 @@ supplier_bp = Blueprint("supplier_web", __name__)
 
 @supplier_bp.route("/suppliers")
 @login_required
+@read_replica()
 def suppliers_list():
     suppliers = supplier_dao.list_suppliers()
     return render_template("supplier/suppliers.html", suppliers=suppliers)
@@ -1,5 +1,6 @@
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import unit as unit_dao
 from dao.unit import UnitInUseError
 
@@ -8,6 +9,7 @@ unit_bp = Blueprint("unit_web", __name__)
 
 @unit_bp.route("/units")
 @login_required
+@read_replica()
 def units_list():
     units = unit_dao.list_units()
     return render_template("unit/units.html", units=units)
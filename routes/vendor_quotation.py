@@ -1,6 +1,7 @@
 # routes/vendor_quotation.py
 from flask import Blueprint, render_template, request, redirect, url_for, flash
 from flask_login import login_required
+from utils.read_replica import read_replica
 from dao import (
     vendor_quotation as vq_dao,
     rfq as rfq_dao,
@@ -13,6 +14,7 @@ vq_bp = Blueprint("vq_web", __name__)
 
 @vq_bp.route("/vqs")
 @login_required
+@read_replica()
 def vq_list():
     vqs = vq_dao.list_vqs()
     return render_template("vendor/vendor_quotation.html", vqs=vqs)
@@ -93,6 +95,44 @@ def vq_from_rfq(rfq_id: int):
     )
 
 
+@vq_bp.route("/vqs/fan-out/<int:rfq_id>", methods=["GET", "POST"])
+@login_required
+def vq_fan_out(rfq_id: int):
+    """Gửi 1 RFQ cho nhiều NCC: tạo VQ (dòng copy từ RFQ, giá 0) cho từng NCC."""
+    rfq = rfq_dao.get_rfq(rfq_id)
+    if not rfq:
+        flash("Không tìm thấy RFQ", "warning")
+        return redirect(url_for("rfq_web.rfq_list"))
+
+    if request.method == "POST":
+        supplier_ids = request.form.getlist("supplier_ids", type=int)
+        try:
+            res = vq_dao.create_vqs_from_rfq(rfq.id, supplier_ids)
+        except ValueError as e:
+            flash(str(e), "danger")
+        else:
+            if res["created"]:
+                flash(
+                    f"Đã tạo {len(res['created'])} báo giá từ RFQ #{rfq.id}", "success"
+                )
+            if res["skipped"]:
+                flash(
+                    f"Bỏ qua {len(res['skipped'])} NCC đã có báo giá cho RFQ này",
+                    "info",
+                )
+            if res["unknown"]:
+                flash(f"{len(res['unknown'])} NCC không tồn tại", "warning")
+            return redirect(url_for("vq_web.vq_list"))
+
+    quoted = {vq.supplier_id for vq in rfq.vqs}
+    return render_template(
+        "vendor/vendor_quotation_fan_out.html",
+        rfq=rfq,
+        suppliers=supplier_dao.list_suppliers(),
+        quoted=quoted,
+    )
+
+
 @vq_bp.route("/vqs/edit/<int:vq_id>", methods=["GET", "POST"])
 @login_required
 def vq_edit(vq_id: int):
@@ -0,0 +1,61 @@
+// Gợi ý giá dưới ô đơn giá cho bảng có data-price-hints.
+// <table data-price-hints data-supplier-select="select[name=supplier_id]">
+// Mỗi lần đổi vật tư / NCC: 1 request cho tất cả dòng (/materials/api/price-hints).
+(function(){
+  const fmt = v => Number(v).toLocaleString('vi-VN', {minimumFractionDigits: 2, maximumFractionDigits: 2});
+
+  document.querySelectorAll('table[data-price-hints]').forEach(table=>{
+    const tbody  = table.tBodies[0];
+    const supSel = document.querySelector(table.dataset.supplierSelect || 'select[name="supplier_id"]');
+    let timer = null;
+
+    function rows(){
+      return [...tbody.querySelectorAll('tr')].map(tr=>({
+        tr,
+        sel:   tr.querySelector('select[name$="[material_id]"]'),
+        price: tr.querySelector('input[name$="[price]"]'),
+      })).filter(r => r.sel && r.price);
+    }
+
+    function hintEl(price){
+      let el = price.parentElement.querySelector('.price-hint');
+      if (!el){
+        el = document.createElement('div');
+        el.className = 'form-text price-hint';
+        price.parentElement.appendChild(el);
+      }
+      return el;
+    }
+
+    function render(r, h){
+      const el = hintEl(r.price);
+      if (!h){ el.textContent = ''; return; }
+      const parts = [];
+      if (h.supplier_last_price != null) parts.push(`NCC này: ${fmt(h.supplier_last_price)} (${h.supplier_last_date})`);
+      if (h.last_price != null) parts.push(`Gần nhất: ${fmt(h.last_price)} (${h.last_date})`);
+      if (h.avg_price != null) parts.push(`TB 12 tháng: ${fmt(h.avg_price)}`);
+      el.textContent = parts.join(' · ');
+    }
+
+    async function refresh(){
+      const rs  = rows();
+      const ids = [...new Set(rs.map(r => r.sel.value).filter(Boolean))];
+      if (!ids.length){ rs.forEach(r => render(r, null)); return; }
+      const qs = new URLSearchParams({ids: ids.join(',')});
+      if (supSel?.value) qs.set('supplier_id', supSel.value);
+      try{
+        const res = await fetch(`/materials/api/price-hints?${qs}`);
+        if (!res.ok) return;
+        const data = await res.json();
+        rows().forEach(r => render(r, data[r.sel.value]));
+      }catch(_){}
+    }
+
+    const schedule = () => { clearTimeout(timer); timer = setTimeout(refresh, 250); };
+    tbody.addEventListener('change', e => { if (e.target.matches('select')) schedule(); });
+    supSel?.addEventListener('change', schedule);
+    // dòng thêm/xóa/nạp lại bằng JS của form
+    new MutationObserver(schedule).observe(tbody, {childList: true});
+    refresh();
+  });
+})();
@@ -0,0 +1,39 @@
+# tests/conftest.py
+# Chạy: python -m pytest -q   (SQLite in-memory, không cần Postgres)
+#   - app (1 lần / phiên): sqlite_app() + seed_flow() của bench.harness
+#   - session (mỗi test): rollback_session() -> commit() của DAO chỉ giải phóng
+#     SAVEPOINT, hết test rollback toàn bộ -> các test không ảnh hưởng nhau
+#   - @pytest.mark.postgres: test cần Postgres (sequence, COPY...) -> bỏ qua
+#     trên SQLite thay vì dừng như @requires_postgres của script bench
+import pytest
+from configs import db
+from bench.harness import is_postgres, rollback_session, seed_flow, sqlite_app
+from utils.cache import cache
+
+SEED_CHAINS = 8
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", "postgres: cần Postgres, bỏ qua trên SQLite")
+    # DAO cũ còn dùng Query.get()
+    config.addinivalue_line("filterwarnings", "ignore::sqlalchemy.exc.LegacyAPIWarning")
+
+
+@pytest.fixture(scope="session")
+def app():
+    app = sqlite_app()
+    with app.app_context():
+        seed_flow(SEED_CHAINS)
+        db.session.remove()
+    return app
+
+
+@pytest.fixture
+def session(app, request):
+    with app.app_context():
+        if request.node.get_closest_marker("postgres") and not is_postgres():
+            pytest.skip("cần Postgres")
+        cache.clear()  # cache in-process không biết tới rollback của test trước
+        with rollback_session() as s:
+            yield s
+        cache.clear()
@@ -0,0 +1,36 @@
+# tests/factories.py
+# Dựng nhanh chứng từ qua đúng DAO (dữ liệu nền: seed_flow của bench.harness).
+from configs import db
+from db.models import Material, Supplier, User
+from db.models.purchase_requisition import PurchaseRequisitionStatus
+from dao import purchase_requisition as pr_dao
+
+
+def user() -> User:
+    return User.query.filter_by(username="bench").one()
+
+
+def materials(n: int = 1):
+    return Material.query.order_by(Material.id).limit(n).all()
+
+
+def supplier() -> Supplier:
+    return Supplier.query.order_by(Supplier.id).first()
+
+
+def approved_pr(lines):
+    """lines: [(Material, qty)] -> PR APPROVED."""
+    pr = pr_dao.create_pr(
+        user().id, None, [{"material_id": m.id, "qty": q} for m, q in lines]
+    )
+    pr.status = PurchaseRequisitionStatus.APPROVED
+    db.session.commit()
+    return pr
+
+
+def invoice_lines(po):
+    """Dòng hóa đơn khớp PO: cùng vật tư / số lượng / đơn giá."""
+    return [
+        {"material_id": it.material_id, "qty": float(it.qty), "price": float(it.price)}
+        for it in po.items
+    ]
@@ -0,0 +1,64 @@
+# tests/test_bulk_status.py
+from types import SimpleNamespace
+import pytest
+from db.models.purchase_requisition import (
+    PurchaseRequisition,
+    PurchaseRequisitionStatus,
+)
+from db.models.rfq import RFQ, RFQStatus
+from db.models.user import UserRole
+from dao import purchase_requisition as pr_dao, rfq as rfq_dao
+from dao import rfq_consolidation as cons
+from tests import factories as f
+
+
+def _by_id(report):
+    return {r["id"]: r for r in report}
+
+
+def _draft_pr():
+    (m,) = f.materials(1)
+    return pr_dao.create_pr(f.user().id, None, [{"material_id": m.id, "qty": 1}])
+
+
+def test_bulk_pr_skips_approved_and_approves_rest(session):
+    locked = PurchaseRequisition.query.filter_by(
+        status=PurchaseRequisitionStatus.APPROVED
+    ).first()
+    draft = _draft_pr()
+
+    out = _by_id(pr_dao.bulk_set_status([locked.id, draft.id, 10**9], "approved"))
+
+    assert out[locked.id]["result"] == pr_dao.SKIPPED
+    assert out[locked.id]["message"] == "PR đã APPROVED, không thể chỉnh sửa."
+    assert out[10**9]["message"] == "PR không tồn tại."
+    assert out[draft.id]["result"] == pr_dao.OK
+    assert (
+        session.get(PurchaseRequisition, draft.id).status
+        == PurchaseRequisitionStatus.APPROVED
+    )
+
+
+def test_bulk_pr_buyer_cannot_approve(session, monkeypatch):
+    draft = _draft_pr()
+    monkeypatch.setattr(pr_dao, "current_user", SimpleNamespace(role=UserRole.BUYER))
+
+    with pytest.raises(ValueError, match="APPROVED"):
+        pr_dao.bulk_set_status([draft.id], "approved")
+    out = _by_id(pr_dao.bulk_set_status([draft.id], "rejected"))
+    assert out[draft.id]["result"] == pr_dao.OK
+
+
+def test_bulk_rfq_locks_approved_and_allows_pooled_without_pr(session):
+    locked = RFQ.query.filter_by(status=RFQStatus.APPROVED).first()
+    (m,) = f.materials(1)
+    f.approved_pr([(m, 2)])
+    (pooled,) = cons.consolidate([m.id])
+    assert pooled.pr_id is None
+
+    out = _by_id(rfq_dao.bulk_set_status([locked.id, pooled.id], "approved"))
+
+    assert out[locked.id]["result"] == rfq_dao.SKIPPED
+    assert out[locked.id]["message"] == "RFQ đã APPROVED, không thể chỉnh sửa."
+    assert out[pooled.id]["result"] == rfq_dao.OK
+    assert session.get(RFQ, pooled.id).status == RFQStatus.APPROVED
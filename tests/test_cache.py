@@ -0,0 +1,52 @@
+# tests/test_cache.py
+from decimal import Decimal
+from configs import db
+from db.models.invoice_payment import VendorInvoice, PaymentStatus
+from db.models.vendor_quotation import VendorQuotation, VendorQuotationLine
+from dao import cache_version, report as report_dao, rfq_compare
+from utils.cache import KeyedCache
+
+
+def test_invalidate_during_build_drops_result():
+    c = KeyedCache(ttl_seconds=0)
+
+    def build():
+        c.invalidate("ns")  # commit của worker khác xảy ra khi đang dựng
+        return "stale"
+
+    assert c.get_or_set("ns", 1, build) == "stale"
+    assert c.get_or_set("ns", 1, lambda: "fresh") == "fresh"
+
+
+def test_version_change_rebuilds():
+    c = KeyedCache(ttl_seconds=0)
+    assert c.get_or_set("ns", 1, lambda: "v1", version=1) == "v1"
+    assert c.get_or_set("ns", 1, lambda: "x", version=1) == "v1"
+    assert c.get_or_set("ns", 1, lambda: "v2", version=2) == "v2"
+
+
+def test_db_version_bump_reaches_cached_ap_aging(session):
+    before = report_dao.ap_aging()["totals"]["total"]
+    inv = VendorInvoice.query.filter_by(status=PaymentStatus.VALIDATED).first()
+    inv.total = Decimal(inv.total) + 100
+    db.session.commit()
+
+    # worker khác ghi: chỉ tăng version trong DB, cache của process này còn nguyên
+    assert report_dao.ap_aging()["totals"]["total"] == before
+    cache_version.bump(report_dao.AP_AGING_CACHE)
+    assert report_dao.ap_aging()["totals"]["total"] == before + 100
+
+
+def test_db_version_bump_reaches_cached_rfq_compare(session):
+    vq = VendorQuotation.query.first()
+    before = rfq_compare.compare_rfq(vq.rfq_id)
+    line = VendorQuotationLine.query.filter_by(vq_id=vq.id).first()
+    line.price = Decimal(line.price) + 1
+    db.session.commit()
+
+    assert rfq_compare.compare_rfq(vq.rfq_id) == before
+    cache_version.bump(f"{rfq_compare.RFQ_COMPARE_CACHE}:{vq.rfq_id}")
+    after = rfq_compare.compare_rfq(vq.rfq_id)
+    total = next(s["total"] for s in after["suppliers"] if s["vq_id"] == vq.id)
+    old = next(s["total"] for s in before["suppliers"] if s["vq_id"] == vq.id)
+    assert total == old + Decimal(line.qty)
@@ -0,0 +1,59 @@
+# tests/test_doc_number.py
+import re
+from datetime import date
+import pytest
+from sqlalchemy import text
+from configs import db
+from db.models.purchase import PurchaseOrder
+from dao import doc_number, rfq as rfq_dao, vendor_quotation as vq_dao
+from tests import factories as f
+
+
+def _selected_vq():
+    (m,) = f.materials(1)
+    pr = f.approved_pr([(m, 2)])
+    rfq = rfq_dao.create_rfq_from_pr(pr.id, "approved")
+    sup = f.supplier()
+    vq = vq_dao.create_vq_from_rfq(rfq.id, sup.id)
+    vq_dao.update_vq(
+        vq.id,
+        rfq.id,
+        sup.id,
+        "selected",
+        [{"material_id": m.id, "qty": 2, "price": 10}],
+    )
+    return vq
+
+
+def test_number_pattern_matches_format(session):
+    m = re.match(doc_number.number_pattern("PO", 2026), "PO-2026-00042")
+    assert m.group(1) == "00042"
+
+
+def test_next_number_skips_existing_po_no(session):
+    year = date.today().year
+    taken = {doc_number.number_format("PO").format(year=year, seq=s) for s in (1, 2, 3)}
+    for po, no in zip(PurchaseOrder.query.order_by(PurchaseOrder.id), sorted(taken)):
+        po.po_no = no
+    db.session.commit()
+
+    assert doc_number.next_number("PO") not in taken
+
+
+def test_duplicate_po_no_is_business_error(session):
+    existing = PurchaseOrder.query.first().po_no
+    vq = _selected_vq()
+    with pytest.raises(ValueError, match="Số PO đã tồn tại"):
+        vq_dao.create_po_from_vq(vq.id, existing)
+
+
+@pytest.mark.postgres
+def test_new_sequence_starts_after_existing_numbers(session):
+    year = 1998  # năm riêng, sequence chưa có
+    name = doc_number.sequence_name("PO", year)
+    db.session.execute(text(f"DROP SEQUENCE IF EXISTS {name}"))
+    doc_number._known_sequences.discard(name)
+    PurchaseOrder.query.first().po_no = f"PO-{year}-00007"
+    db.session.commit()
+
+    assert doc_number.next_number("PO", year) == f"PO-{year}-00008"
@@ -0,0 +1,25 @@
+# tests/test_index_check.py
+from sqlalchemy import Column, ForeignKey, Index, Integer, MetaData, String, Table
+from configs import db
+from db import models  # noqa: F401  đăng ký toàn bộ model vào metadata
+from utils.index_check import find_unindexed
+
+
+def test_models_have_no_unindexed_fk_or_filter_column():
+    assert find_unindexed(db.metadata) == []
+
+
+def test_reports_missing_index():
+    md = MetaData()
+    Table("parent", md, Column("id", Integer, primary_key=True))
+    child = Table(
+        "child",
+        md,
+        Column("id", Integer, primary_key=True),
+        Column("parent_id", Integer, ForeignKey("parent.id")),
+        Column("status", String(20)),
+    )
+    assert len(find_unindexed(md)) == 2
+
+    Index("ix_child_parent_status", child.c.parent_id, child.c.status)
+    assert find_unindexed(md) == ["child(status): cột lọc chưa có index"]
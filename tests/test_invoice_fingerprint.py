@@ -0,0 +1,38 @@
+# tests/test_invoice_fingerprint.py
+import importlib.util
+from pathlib import Path
+from alembic.migration import MigrationContext
+from alembic.operations import Operations
+from sqlalchemy import update
+from configs import db
+from db.models.invoice_payment import VendorInvoice
+
+MIGRATION = (
+    Path(__file__).resolve().parent.parent
+    / "alembic/versions/b7d41e9a2c68_backfill_vendor_invoice_fingerprint.py"
+)
+
+
+def _run_upgrade(path: Path) -> None:
+    spec = importlib.util.spec_from_file_location(path.stem, path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    ctx = MigrationContext.configure(db.session.connection())
+    with Operations.context(ctx):
+        module.upgrade()
+
+
+def test_backfill_migration_restores_fingerprints(session):
+    expected = dict(
+        db.session.execute(db.select(VendorInvoice.id, VendorInvoice.fingerprint)).all()
+    )
+    assert expected and all(expected.values())
+    db.session.execute(update(VendorInvoice).values(fingerprint=None))
+
+    _run_upgrade(MIGRATION)
+
+    db.session.expire_all()
+    got = dict(
+        db.session.execute(db.select(VendorInvoice.id, VendorInvoice.fingerprint)).all()
+    )
+    assert got == expected
@@ -0,0 +1,100 @@
+# tests/test_invoice_match.py
+from configs import db
+from db.models.invoice_payment import VendorInvoice, PaymentStatus
+from db.models.qc import QCReport, QCStatus
+from dao import invoice as inv_dao, invoice_match as inv_match, qc as qc_dao
+from tests import factories as f
+
+
+def _status(invoice_id):
+    db.session.expire_all()
+    return db.session.get(VendorInvoice, invoice_id).match_status
+
+
+def _validated_invoice():
+    return VendorInvoice.query.filter_by(status=PaymentStatus.VALIDATED).first()
+
+
+def test_seeded_invoice_matches(session):
+    inv = _validated_invoice()
+    assert inv.match_status == inv_match.MATCHED
+    assert {m.status for m in inv_match.list_match_lines(inv.id)} == {inv_match.MATCHED}
+
+
+def test_draft_duplicate_does_not_flag_validated_invoice(session):
+    # hồi quy: HĐ DRAFT đang nhập từng làm HĐ VALIDATED cùng PO thành EXCEPTION
+    inv = _validated_invoice()
+    lines = [
+        {"material_id": ln.material_id, "qty": float(ln.qty), "price": float(ln.price)}
+        for ln in inv.lines
+    ]
+    draft = inv_dao.create_invoice(inv.supplier_id, inv.po_id, "draft", lines)
+
+    assert _status(inv.id) == inv_match.MATCHED
+    assert _status(draft.id) == inv_match.EXCEPTION  # chính nó thì vượt số nhận
+
+
+def _pass_pending_qc():
+    """QC PENDING -> finalize PASSED (nhận đạt đủ số GR); trả về PO."""
+    qc = QCReport.query.filter_by(status=QCStatus.PENDING).first()
+    qc_dao.finalize_qc(
+        qc.id,
+        "passed",
+        [
+            {"gr_line_id": ln.id, "result": "pass", "accepted_qty": float(ln.qty)}
+            for ln in qc.gr.lines
+        ],
+    )
+    return qc.gr.po
+
+
+def test_over_billing_is_qty_variance(session):
+    po = _pass_pending_qc()
+    lines = f.invoice_lines(po)
+    lines[0]["qty"] += 1
+    draft = inv_dao.create_invoice(po.supplier_id, po.id, "draft", lines)
+
+    statuses = {m.material_id: m.status for m in inv_match.list_match_lines(draft.id)}
+    assert statuses.pop(lines[0]["material_id"]) == "QTY_VARIANCE"
+    assert set(statuses.values()) == {inv_match.MATCHED}
+    assert draft.match_status == inv_match.EXCEPTION
+
+
+def test_update_qc_passed_rematches_invoices(session):
+    # hồi quy: update_qc sang PASSED không đối chiếu lại hóa đơn của PO
+    qc = QCReport.query.filter_by(status=QCStatus.PENDING).first()
+    po = qc.gr.po
+    inv = inv_dao.create_invoice(po.supplier_id, po.id, "draft", f.invoice_lines(po))
+    assert inv.match_status == inv_match.EXCEPTION  # chưa có số nhận đạt
+
+    qc_dao.update_qc(
+        qc.id,
+        None,
+        "passed",
+        [
+            {"gr_line_id": ln.id, "result": "pass", "accepted_qty": float(ln.qty)}
+            for ln in qc.gr.lines
+        ],
+    )
+    assert _status(inv.id) == inv_match.MATCHED
+
+
+def test_create_qc_passed_rematches_invoices(session):
+    # hồi quy: QC tạo thẳng PASSED không đối chiếu lại hóa đơn của PO
+    pending = QCReport.query.filter_by(status=QCStatus.PENDING).first()
+    gr = pending.gr
+    inv = inv_dao.create_invoice(
+        gr.po.supplier_id, gr.po_id, "draft", f.invoice_lines(gr.po)
+    )
+    qc_dao.delete_qc(pending.id)
+    assert inv.match_status == inv_match.EXCEPTION
+
+    qc_dao.create_qc(
+        gr.id,
+        "passed",
+        [
+            {"gr_line_id": ln.id, "result": "pass", "accepted_qty": float(ln.qty)}
+            for ln in gr.lines
+        ],
+    )
+    assert _status(inv.id) == inv_match.MATCHED
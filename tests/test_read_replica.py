@@ -0,0 +1,91 @@
+# tests/test_read_replica.py
+# App riêng: primary + replica là 2 file SQLite khác nhau (replica không tự
+# đồng bộ -> ghi thẳng vào replica để biết câu SELECT đã đi đâu).
+import pytest
+from sqlalchemy import insert, select, text
+from configs import db
+from bench.harness import sqlite_app
+from db.models.cache_version import CacheVersion
+from db.models.unit import Unit
+from dao import cache_version, report as report_dao
+from utils.db_pool import REPLICA_BIND, reports_bind
+from utils.read_replica import read_replica
+
+
+@pytest.fixture
+def replica_app(tmp_path):
+    app = sqlite_app(
+        f"sqlite:///{tmp_path / 'primary.db'}",
+        replica_url=f"sqlite:///{tmp_path / 'replica.db'}",
+    )
+    with app.app_context():
+        with db.engines[REPLICA_BIND].begin() as conn:
+            conn.execute(insert(Unit).values(code="REPLICA", name="chỉ có ở replica"))
+        yield app
+        db.session.remove()
+
+
+def _on_replica() -> bool:
+    return Unit.query.filter_by(code="REPLICA").first() is not None
+
+
+def test_plain_select_reads_replica(replica_app):
+    assert not _on_replica()
+    with read_replica():
+        assert _on_replica()
+    assert not _on_replica()
+
+
+def test_reads_return_to_primary_after_flush(replica_app):
+    with read_replica():
+        db.session.add(Unit(code="NEW", name="mới"))
+        db.session.flush()
+        assert not _on_replica()
+        assert Unit.query.filter_by(code="NEW").first() is not None
+
+
+def test_for_update_and_text_stay_on_primary(replica_app):
+    with read_replica():
+        locked = db.session.execute(
+            select(Unit).where(Unit.code == "REPLICA").with_for_update()
+        ).first()
+        raw = db.session.execute(
+            text("SELECT count(*) FROM unit WHERE code = 'REPLICA'")
+        ).scalar()
+        assert _on_replica()  # khối vẫn đọc replica: 2 câu trên không phải ghi
+    assert locked is None
+    assert raw == 0
+
+
+def test_ap_aging_built_on_primary_while_replica_lags(replica_app):
+    cache_version.bump(report_dao.AP_AGING_CACHE)  # ghi HĐ / thanh toán vừa commit
+    version = cache_version.current(report_dao.AP_AGING_CACHE)
+    assert report_dao._aging_bind(version) is db.engine
+    db.session.rollback()  # SQLite: nhả khóa đọc trên file replica trước khi ghi
+
+    with db.engines[REPLICA_BIND].begin() as conn:  # replica bắt kịp
+        conn.execute(
+            insert(CacheVersion).values(name=report_dao.AP_AGING_CACHE, version=version)
+        )
+    assert report_dao._aging_bind(version) is reports_bind()
+    assert reports_bind() is not db.engine
+
+
+def _write_route(app):
+    @app.post("/_write")
+    def _write():
+        db.session.add(Unit(code="W", name="ghi"))
+        db.session.commit()
+        return "ok"
+
+
+def test_write_pins_primary_only_with_replica(replica_app, tmp_path):
+    _write_route(replica_app)
+    resp = replica_app.test_client().post("/_write")
+    assert "Set-Cookie" in resp.headers
+
+    plain = sqlite_app(f"sqlite:///{tmp_path / 'plain.db'}")
+    _write_route(plain)
+    resp = plain.test_client().post("/_write")
+    assert resp.status_code == 200
+    assert "Set-Cookie" not in resp.headers
@@ -0,0 +1,51 @@
+# tests/test_rfq_consolidation.py
+import pytest
+from db.models.rfq import RFQLine, RFQLineSource
+from dao import rfq as rfq_dao, rfq_consolidation as cons
+from tests import factories as f
+
+
+def _pending_qty(material_id):
+    return {d["material_id"]: d["qty"] for d in cons.pending_demand([material_id])}
+
+
+def test_pr_without_rfq_is_pending(session):
+    (m,) = f.materials(1)
+    f.approved_pr([(m, 5)])
+    assert _pending_qty(m.id) == {m.id: 5}
+
+
+def test_manual_rfq_removes_pr_from_pending(session):
+    # hồi quy: RFQ nhập tay (create_rfq) không set source_line_id -> PR bị gộp lần 2
+    (m,) = f.materials(1)
+    pr = f.approved_pr([(m, 5)])
+    r = rfq_dao.create_rfq(pr.id, "draft", [{"material_id": m.id, "qty": 5}])
+
+    assert _pending_qty(m.id) == {}
+    assert [ln.source_line_id for ln in r.lines] == [pr.lines[0].id]
+
+
+def test_update_rfq_keeps_source_line(session):
+    (m,) = f.materials(1)
+    pr = f.approved_pr([(m, 5)])
+    r = rfq_dao.create_rfq(pr.id, "draft", [{"material_id": m.id, "qty": 5}])
+    rfq_dao.update_rfq(r.id, pr.id, "draft", [{"material_id": m.id, "qty": 4}])
+
+    lines = RFQLine.query.filter_by(rfq_id=r.id).all()
+    assert [ln.source_line_id for ln in lines] == [pr.lines[0].id]
+
+
+def test_consolidate_pools_demand_once(session):
+    m1, m2 = f.materials(2)
+    pr_a = f.approved_pr([(m1, 3), (m2, 1)])
+    pr_b = f.approved_pr([(m1, 4)])
+
+    (r,) = cons.consolidate([m1.id, m2.id])
+
+    qty = {ln.material_id: ln.qty for ln in r.lines}
+    assert qty == {m1.id: 7, m2.id: 1}
+    linked = {s.pr_line_id for s in RFQLineSource.query.all()}
+    assert {ln.id for ln in pr_a.lines + pr_b.lines} <= linked
+    assert cons.pending_demand([m1.id, m2.id]) == []
+    with pytest.raises(ValueError):
+        cons.consolidate([m1.id, m2.id])
@@ -0,0 +1,58 @@
+# tests/test_supplier_payment.py
+from decimal import Decimal
+import pytest
+from configs import db
+from db.models.invoice_payment import VendorInvoice, PaymentStatus
+from dao import supplier_payment as sp_dao
+
+
+def _open(supplier_id):
+    return sp_dao._open_invoices(supplier_id)
+
+
+def _supplier_with_invoices(n=2):
+    rows = (
+        db.session.query(VendorInvoice.supplier_id)
+        .filter(VendorInvoice.status == PaymentStatus.VALIDATED)
+        .group_by(VendorInvoice.supplier_id)
+        .having(db.func.count() >= n)
+        .all()
+    )
+    return rows[0][0]
+
+
+def test_allocate_oldest_first(session):
+    sid = _supplier_with_invoices()
+    first, second = _open(sid)[:2]
+    amount = Decimal(first.balance) + Decimal("10")
+
+    res = sp_dao.allocate_oldest_first(sid, amount)
+
+    assert [(a["invoice_id"], a["amount"]) for a in res["allocations"]][:2] == [
+        (first.id, Decimal(first.balance)),
+        (second.id, Decimal("10")),
+    ]
+    assert res["unallocated"] == 0
+
+
+def test_supplier_payment_updates_balances(session):
+    sid = _supplier_with_invoices()
+    first = _open(sid)[0]
+    full = Decimal(first.balance)
+
+    sp_dao.create_supplier_payment(sid, full + 5, allocations=None)
+
+    db.session.expire_all()
+    paid = db.session.get(VendorInvoice, first.id)
+    assert paid.balance == 0
+    assert paid.status == PaymentStatus.PAID
+
+
+def test_allocation_over_balance_is_rejected(session):
+    sid = _supplier_with_invoices()
+    first = _open(sid)[0]
+    too_much = Decimal(first.balance) + 1
+    with pytest.raises(ValueError):
+        sp_dao.create_supplier_payment(
+            sid, too_much, allocations=[{"invoice_id": first.id, "amount": too_much}]
+        )
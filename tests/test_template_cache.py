@@ -0,0 +1,31 @@
+# tests/test_template_cache.py
+from flask import Flask
+from jinja2 import DictLoader, bccache
+from utils.template_cache import init_template_cache
+
+
+def _app(monkeypatch, cache_dir) -> Flask:
+    monkeypatch.setenv("JINJA_CACHE_DIR", str(cache_dir))
+    app = Flask(__name__)
+    app.jinja_env.loader = DictLoader({"t.html": "{{ 1 + 1 }}"})
+    return app
+
+
+def test_uncreatable_cache_dir_runs_without_cache(tmp_path, monkeypatch):
+    blocker = tmp_path / "file"
+    blocker.write_text("")  # cha là file -> makedirs lỗi (kể cả khi chạy root)
+    app = _app(monkeypatch, blocker / "cache")
+    assert init_template_cache(app) is None
+    assert app.jinja_env.bytecode_cache is None
+    assert app.jinja_env.get_template("t.html").render() == "2"
+
+
+def test_read_only_cache_dir_still_renders(tmp_path, monkeypatch):
+    app = _app(monkeypatch, tmp_path / "cache")
+    assert init_template_cache(app) == str(tmp_path / "cache")
+
+    def read_only(*args, **kwargs):
+        raise PermissionError(13, "Read-only file system")
+
+    monkeypatch.setattr(bccache.tempfile, "NamedTemporaryFile", read_only)
+    assert app.jinja_env.get_template("t.html").render() == "2"
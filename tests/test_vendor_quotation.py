@@ -0,0 +1,33 @@
+# tests/test_vendor_quotation.py
+import pytest
+from db.models.vendor_quotation import VendorQuotation, VendorQuotationStatus
+from dao import vendor_quotation as vq_dao
+
+SECOND_SELECTED = "Đã có VQ khác của RFQ này ở trạng thái SELECTED."
+
+
+def _selected_vq():
+    return VendorQuotation.query.filter_by(
+        status=VendorQuotationStatus.SELECTED
+    ).first()
+
+
+def _lines(vq):
+    return [
+        {"material_id": ln.material_id, "qty": ln.qty, "price": ln.price}
+        for ln in vq.lines
+    ]
+
+
+def test_second_selected_vq_is_rejected_on_create(session):
+    vq = _selected_vq()
+    with pytest.raises(ValueError, match=SECOND_SELECTED):
+        vq_dao.create_vq(vq.rfq_id, vq.supplier_id, "selected", _lines(vq))
+
+
+def test_second_selected_vq_is_rejected_on_update(session):
+    vq = _selected_vq()
+    other = vq_dao.create_vq(vq.rfq_id, vq.supplier_id, "received", _lines(vq))
+    with pytest.raises(ValueError, match=SECOND_SELECTED):
+        vq_dao.update_vq(other.id, vq.rfq_id, vq.supplier_id, "selected", _lines(vq))
+    assert vq_dao.get_vq(other.id).status == VendorQuotationStatus.RECEIVED
@@ -0,0 +1,60 @@
+# utils/cache.py
+import os
+import threading
+import time
+from typing import Any, Callable, Hashable, Optional
+
+_ALL = object()
+
+
+class KeyedCache:
+    """
+    Cache in-process theo (namespace, key) + TTL.
+    DAO ghi dữ liệu gọi invalidate() sau commit; TTL giới hạn độ trễ giữa các worker.
+
+    - generation theo namespace: invalidate() tăng generation, kết quả đang
+      dựng dở từ trước đó (fn() chạy ngoài lock) không được lưu lại.
+    - version (tùy chọn, đọc từ DB — dao/cache_version.py): mục cache chỉ dùng
+      khi dựng với đúng version hiện tại -> worker khác ghi cũng thấy ngay.
+    """
+
+    def __init__(self, ttl_seconds: float = 300.0):
+        self.ttl = ttl_seconds
+        self._data: dict[str, dict[Hashable, tuple[float, Any, Any]]] = {}
+        self._generations: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def get_or_set(
+        self,
+        namespace: str,
+        key: Hashable,
+        fn: Callable[[], Any],
+        version: Optional[Hashable] = None,
+    ) -> Any:
+        now = time.monotonic()
+        with self._lock:
+            generation = self._generations.get(namespace, 0)
+            hit = self._data.get(namespace, {}).get(key)
+        if hit and hit[1] == version and (self.ttl <= 0 or now - hit[0] < self.ttl):
+            return hit[2]
+        value = fn()
+        with self._lock:
+            if self._generations.get(namespace, 0) == generation:
+                self._data.setdefault(namespace, {})[key] = (now, version, value)
+        return value
+
+    def invalidate(self, namespace: str, key: Hashable = _ALL) -> None:
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            if key is _ALL:
+                self._data.pop(namespace, None)
+            else:
+                self._data.get(namespace, {}).pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._generations.clear()
+
+
+cache = KeyedCache(ttl_seconds=float(os.getenv("CACHE_TTL_SECONDS", "300")))
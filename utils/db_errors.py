@@ -0,0 +1,81 @@
+# utils/db_errors.py
+"""
+Dịch lỗi vi phạm ràng buộc (IntegrityError) thành ValueError với thông báo
+nghiệp vụ. DAO giao luật cho DB (unique / partial unique index) thay vì
+SELECT kiểm tra trước rồi mới ghi (tốn 1 round trip và không an toàn khi
+nhiều người lưu cùng lúc).
+
+    _UNIQUE_MESSAGES = {"uq_purchase_order_vq_id": "VQ này đã được dùng để tạo PO khác."}
+
+    @translate_integrity_errors(_UNIQUE_MESSAGES)
+    def create_po(...): ...
+"""
+import functools
+import re
+from typing import Callable, Dict, Optional
+from sqlalchemy import UniqueConstraint
+from sqlalchemy.exc import IntegrityError
+from configs import db
+
+# Postgres: duplicate key value violates unique constraint "uq_..."
+_PG_CONSTRAINT = re.compile(r'constraint "([^"]+)"')
+# SQLite: UNIQUE constraint failed: purchase_order.vq_id[, ...]
+_SQLITE_UNIQUE = re.compile(r"UNIQUE constraint failed: ([\w.]+(?:, [\w.]+)*)")
+
+
+def _sqlite_constraint_name(message: str) -> Optional[str]:
+    """SQLite không báo tên ràng buộc -> tìm index/constraint unique theo cột."""
+    m = _SQLITE_UNIQUE.search(message)
+    if not m:
+        return None
+    cols = [c.split(".", 1) for c in m.group(1).split(", ")]
+    table = db.metadata.tables.get(cols[0][0])
+    if table is None:
+        return None
+    wanted = {c for _, c in cols}
+    candidates = [ix for ix in table.indexes if ix.unique] + [
+        c for c in table.constraints if isinstance(c, UniqueConstraint)
+    ]
+    for cons in candidates:
+        cols_of = [c.name for c in cons.columns]
+        if set(cols_of) == wanted:
+            # ràng buộc không đặt tên (unique=True) -> tên mặc định của Postgres
+            return cons.name or f"{table.name}_{'_'.join(cols_of)}_key"
+    return None
+
+
+def constraint_name(exc: IntegrityError) -> Optional[str]:
+    """Tên ràng buộc bị vi phạm (psycopg diag, thông báo Postgres, hoặc SQLite)."""
+    orig = getattr(exc, "orig", None)
+    diag = getattr(orig, "diag", None)
+    name = getattr(diag, "constraint_name", None)
+    if name:
+        return name
+    message = str(orig or exc)
+    m = _PG_CONSTRAINT.search(message)
+    if m:
+        return m.group(1)
+    return _sqlite_constraint_name(message)
+
+
+def translate_integrity_errors(messages: Dict[str, str]) -> Callable:
+    """
+    Decorator cho hàm ghi của DAO: IntegrityError của ràng buộc có trong
+    `messages` -> rollback + ValueError(thông báo). Lỗi khác: rollback + raise.
+    """
+
+    def decorator(fn):
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            try:
+                return fn(*args, **kwargs)
+            except IntegrityError as e:
+                db.session.rollback()
+                msg = messages.get(constraint_name(e))
+                if msg:
+                    raise ValueError(msg) from e
+                raise
+
+        return wrapper
+
+    return decorator
@@ -0,0 +1,179 @@
+# utils/db_pool.py
+"""
+Cấu hình engine theo env (chỉ áp dụng cho Postgres; SQLite giữ mặc định của
+Flask-SQLAlchemy) + pool có đo thời gian chờ để xem trên /health/db.
+
+2 pool riêng:
+  - mặc định (DB_*)         : request tương tác (lưu form, tra cứu)
+  - bind "reports" (DB_REPORTS_*, URL = REPORTS_DATABASE_URL, REPLICA_DATABASE_URL
+    hoặc DATABASE_URL): báo cáo chạy lâu, pool nhỏ + statement_timeout dài ->
+    không chiếm hết kết nối của form.
+  - bind "replica" (DB_REPLICA_*, chỉ khi có REPLICA_DATABASE_URL): SELECT của
+    trang danh sách / API tra cứu, xem utils.read_replica.
+
+Env (thay DB_ bằng DB_REPORTS_ cho pool báo cáo):
+  DB_POOL_SIZE, DB_MAX_OVERFLOW, DB_POOL_TIMEOUT (giây), DB_POOL_RECYCLE (giây),
+  DB_POOL_PRE_PING (1/0), DB_STATEMENT_TIMEOUT_MS (0 = không giới hạn),
+  DB_APPLICATION_NAME
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+from sqlalchemy import exc
+from sqlalchemy.pool import QueuePool
+
+REPORTS_BIND = "reports"
+REPLICA_BIND = "replica"
+
+_DEFAULTS = {
+    "POOL_SIZE": 10,
+    "MAX_OVERFLOW": 20,
+    "POOL_TIMEOUT": 30,
+    "POOL_RECYCLE": 1800,
+    "POOL_PRE_PING": 1,
+    "STATEMENT_TIMEOUT_MS": 30000,
+    "APPLICATION_NAME": "erp-kido",
+}
+
+_REPLICA_DEFAULTS = {
+    "APPLICATION_NAME": "erp-kido-replica",
+}
+
+_REPORTS_DEFAULTS = {
+    "POOL_SIZE": 3,
+    "MAX_OVERFLOW": 2,
+    "POOL_TIMEOUT": 60,
+    "STATEMENT_TIMEOUT_MS": 300000,
+    "APPLICATION_NAME": "erp-kido-reports",
+}
+
+
+class TimedQueuePool(QueuePool):
+    """QueuePool ghi lại số lần lấy kết nối, tổng / max thời gian chờ, số lần timeout."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self._checkouts = 0
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+        self._timeouts = 0
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            with self._stats_lock:
+                self._timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - t0
+            with self._stats_lock:
+                self._checkouts += 1
+                self._wait_total += waited
+                self._wait_max = max(self._wait_max, waited)
+
+    def wait_stats(self) -> Dict:
+        with self._stats_lock:
+            n = self._checkouts
+            return {
+                "checkouts": n,
+                "wait_avg_ms": round(self._wait_total / n * 1000, 3) if n else 0.0,
+                "wait_max_ms": round(self._wait_max * 1000, 3),
+                "timeouts": self._timeouts,
+            }
+
+
+def _is_postgres(url: Optional[str]) -> bool:
+    return bool(url) and url.startswith(("postgresql", "postgres"))
+
+
+def engine_options(url: Optional[str], prefix: str = "DB_", defaults=None) -> Dict:
+    """SQLALCHEMY_ENGINE_OPTIONS từ env; {} nếu không phải Postgres."""
+    if not _is_postgres(url):
+        return {}
+    d = {**_DEFAULTS, **(defaults or {})}
+
+    def env(key):
+        return os.getenv(prefix + key, str(d[key]))
+
+    options = {
+        "poolclass": TimedQueuePool,
+        "pool_size": int(env("POOL_SIZE")),
+        "max_overflow": int(env("MAX_OVERFLOW")),
+        "pool_timeout": float(env("POOL_TIMEOUT")),
+        "pool_recycle": int(env("POOL_RECYCLE")),
+        "pool_pre_ping": env("POOL_PRE_PING") == "1",
+        "connect_args": {"application_name": env("APPLICATION_NAME")},
+    }
+    timeout_ms = int(env("STATEMENT_TIMEOUT_MS"))
+    if timeout_ms > 0:
+        # psycopg2/libpq: đặt statement_timeout cho cả phiên ngay khi kết nối
+        options["connect_args"]["options"] = f"-c statement_timeout={timeout_ms}"
+    return options
+
+
+def engine_binds(url: Optional[str]) -> Dict:
+    """SQLALCHEMY_BINDS: pool riêng cho báo cáo + replica (chỉ Postgres)."""
+    binds: Dict = {}
+    replica_url = os.getenv("REPLICA_DATABASE_URL")
+    if _is_postgres(replica_url):
+        binds[REPLICA_BIND] = {
+            "url": replica_url,
+            **engine_options(replica_url, "DB_REPLICA_", _REPLICA_DEFAULTS),
+        }
+    reports_url = os.getenv("REPORTS_DATABASE_URL") or replica_url or url
+    if _is_postgres(reports_url):
+        binds[REPORTS_BIND] = {
+            "url": reports_url,
+            **engine_options(reports_url, "DB_REPORTS_", _REPORTS_DEFAULTS),
+        }
+    return binds
+
+
+def configure_engines(app) -> None:
+    url = app.config.get("SQLALCHEMY_DATABASE_URI")
+    app.config["SQLALCHEMY_ENGINE_OPTIONS"] = engine_options(url)
+    binds = engine_binds(url)
+    app.config["SQLALCHEMY_BINDS"] = binds
+    app.config["REPORTS_ON_REPLICA"] = (
+        REPLICA_BIND in binds
+        and binds.get(REPORTS_BIND, {}).get("url") == binds[REPLICA_BIND]["url"]
+    )
+
+
+def reports_bind():
+    """
+    Engine của pool báo cáo (không cấu hình -> engine mặc định). Pool báo cáo
+    trỏ vào replica mà người dùng vừa ghi -> đọc primary (read-your-own-writes).
+    """
+    from flask import current_app
+    from configs import db
+    from utils.read_replica import primary_pinned
+
+    engine = db.engines.get(REPORTS_BIND)
+    if engine is None:
+        return db.engine
+    if current_app.config.get("REPORTS_ON_REPLICA") and primary_pinned():
+        return db.engine
+    return engine
+
+
+def pool_stats(engine) -> Dict:
+    pool = engine.pool
+    out: Dict = {"pool": type(pool).__name__}
+    if isinstance(pool, QueuePool):
+        out.update(
+            size=pool.size(),
+            checked_in=pool.checkedin(),
+            checked_out=pool.checkedout(),
+            overflow=pool.overflow(),
+            timeout_s=pool.timeout(),
+        )
+    if isinstance(pool, TimedQueuePool):
+        out.update(pool.wait_stats())
+    return out
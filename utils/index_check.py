@@ -0,0 +1,81 @@
+# utils/index_check.py
+"""
+Kiểm tra index trên db.metadata (không cần kết nối DB):
+  - mọi foreign key phải có index bắt đầu bằng (các) cột FK
+  - các cột lọc thường dùng (status, ...) phải có index
+
+Chạy: python -m utils.index_check   (exit code 1 nếu còn cột thiếu index);
+bộ test gọi find_unindexed() trong tests/test_index_check.py.
+"""
+
+import sys
+from typing import Iterable, List, Sequence, Tuple
+from sqlalchemy import MetaData, Table
+
+# cột lọc không phải FK nhưng nằm trong WHERE của các truy vấn chính
+FILTER_COLUMN_NAMES = ("status",)
+FILTER_COLUMN_GROUPS: Sequence[Tuple[str, Tuple[str, ...]]] = (
+    ("stock_movement", ("ref_type", "ref_id")),
+)
+
+
+def _leading_columns(table: Table) -> List[Tuple[str, ...]]:
+    """Danh sách cột (theo thứ tự) của PK, unique constraint và index."""
+    out = []
+    if table.primary_key.columns:
+        out.append(tuple(c.name for c in table.primary_key.columns))
+    for ix in table.indexes:
+        cols = tuple(c.name for c in ix.columns)
+        if cols:
+            out.append(cols)
+    for cons in table.constraints:
+        if cons.__class__.__name__ == "UniqueConstraint":
+            out.append(tuple(c.name for c in cons.columns))
+    return out
+
+
+def is_covered(table: Table, columns: Iterable[str]) -> bool:
+    """Có index nào mà các cột đầu tiên trùng (không kể thứ tự) với `columns`."""
+    wanted = set(columns)
+    n = len(wanted)
+    return any(
+        len(cols) >= n and set(cols[:n]) == wanted for cols in _leading_columns(table)
+    )
+
+
+def find_unindexed(metadata: MetaData) -> List[str]:
+    problems: List[str] = []
+    for table in sorted(metadata.tables.values(), key=lambda t: t.name):
+        for fk in table.foreign_key_constraints:
+            cols = [c.name for c in fk.columns]
+            if not is_covered(table, cols):
+                problems.append(
+                    f"{table.name}({', '.join(cols)}) -> {fk.referred_table.name}: "
+                    "foreign key chưa có index"
+                )
+        for name in FILTER_COLUMN_NAMES:
+            if name in table.c and not is_covered(table, [name]):
+                problems.append(f"{table.name}({name}): cột lọc chưa có index")
+    for tname, cols in FILTER_COLUMN_GROUPS:
+        table = metadata.tables.get(tname)
+        if table is not None and not is_covered(table, cols):
+            problems.append(f"{tname}({', '.join(cols)}): cột lọc chưa có index")
+    return problems
+
+
+def main() -> int:
+    import db.models  # noqa: F401  đăng ký toàn bộ model vào metadata
+    from configs import db
+
+    problems = find_unindexed(db.metadata)
+    for p in problems:
+        print(f"✗ {p}")
+    if problems:
+        print(f"{len(problems)} cột thiếu index")
+        return 1
+    print(f"✓ {len(db.metadata.tables)} bảng, mọi FK / cột lọc đều có index")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,133 @@
+# utils/read_replica.py
+"""
+Đọc từ replica (tùy chọn, bật khi có REPLICA_DATABASE_URL):
+
+  - RoutingSession: session của db; trong khối @read_replica / with
+    read_replica(), câu SELECT đi sang bind "replica", mọi thứ khác (flush,
+    UPDATE/DELETE hàng loạt, text(), SELECT ... FOR UPDATE) vẫn ở primary.
+  - Read-your-own-writes: session đã ghi (flush / DML) thì cả phần còn lại
+    của request đọc primary; sau request có ghi, người dùng đó được "ghim"
+    vào primary REPLICA_STICKY_SECONDS giây (cookie session của Flask) để
+    không thấy dữ liệu cũ do replica trễ.
+  - Không cấu hình replica -> mọi thứ chạy trên primary như cũ.
+
+Dùng cho trang danh sách, API tra cứu (GET) và báo cáo:
+
+    @gr_bp.route("/goods-receipts")
+    @login_required
+    @read_replica()
+    def gr_list(): ...
+"""
+
+import os
+import time
+from contextlib import contextmanager
+
+from flask import g, has_request_context, session as flask_session
+from flask_sqlalchemy.session import Session
+from sqlalchemy import event
+
+from utils.db_pool import REPLICA_BIND
+
+_DEPTH = "_replica_depth"  # > 0: đang trong khối read_replica
+_WROTE = "_replica_wrote"  # session đã ghi -> đọc primary tới hết request
+_PIN_KEY = "_primary_until"  # cookie: ghim primary tới thời điểm này (epoch)
+
+
+def sticky_seconds() -> int:
+    return int(os.getenv("REPLICA_STICKY_SECONDS", "10"))
+
+
+def primary_pinned() -> bool:
+    """Request hiện tại phải đọc primary (vừa ghi ở request này / gần đây)?"""
+    if not has_request_context():
+        return False
+    if g.get(_WROTE):
+        return True
+    return flask_session.get(_PIN_KEY, 0) > time.time()
+
+
+def _is_plain_select(clause) -> bool:
+    return (
+        clause is not None
+        and getattr(clause, "is_select", False)
+        and getattr(clause, "_for_update_arg", None) is None
+    )
+
+
+class RoutingSession(Session):
+    """Session của Flask-SQLAlchemy + định tuyến SELECT sang replica."""
+
+    def _mark_wrote(self) -> None:
+        self.info[_WROTE] = True
+        if has_request_context():
+            g._replica_wrote = True
+
+    def _use_replica(self, clause) -> bool:
+        return (
+            self.info.get(_DEPTH, 0) > 0
+            and not self._flushing
+            and not self.info.get(_WROTE)
+            and _is_plain_select(clause)
+            and not primary_pinned()
+        )
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if bind is None:
+            if getattr(clause, "is_dml", False):
+                self._mark_wrote()
+            elif self._use_replica(clause):
+                replica = self._db.engines.get(REPLICA_BIND)
+                if replica is not None:
+                    return replica
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, _flush_context):
+    session._mark_wrote()
+
+
+@contextmanager
+def read_replica():
+    """
+    Các SELECT trong khối được phép đọc replica (lồng nhau được). Dùng làm
+    decorator: @read_replica().
+    """
+    from configs import db
+
+    info = db.session().info
+    info[_DEPTH] = info.get(_DEPTH, 0) + 1
+    try:
+        yield
+    finally:
+        info[_DEPTH] -= 1
+
+
+@contextmanager
+def on_primary():
+    """Trong khối read_replica(): các câu trong khối này vẫn đọc primary."""
+    from configs import db
+
+    info = db.session().info
+    saved = info.get(_DEPTH, 0)
+    info[_DEPTH] = 0
+    try:
+        yield
+    finally:
+        info[_DEPTH] = saved
+
+
+def init_read_replica(app) -> None:
+    """
+    Sau request có ghi: ghim người dùng vào primary vài giây (đọc lại được dữ
+    liệu vừa ghi). Không có bind replica -> không đăng ký (khỏi Set-Cookie thừa).
+    """
+    if REPLICA_BIND not in (app.config.get("SQLALCHEMY_BINDS") or {}):
+        return
+
+    @app.after_request
+    def _pin_primary_after_write(response):
+        if g.get(_WROTE) and sticky_seconds() > 0:
+            flask_session[_PIN_KEY] = time.time() + sticky_seconds()
+        return response
@@ -0,0 +1,166 @@
+# utils/sql_profiler.py
+"""
+Đo SQL theo request (bật bằng env, mặc định tắt):
+  - đếm số câu lệnh, tổng thời gian DB, số lần lặp của cùng 1 "dạng" câu lệnh
+    (bỏ giá trị tham số, gộp IN (...) -> phát hiện N+1)
+  - header Server-Timing: db;dur=<ms>;desc="<n> queries"
+  - panel debug chèn cuối trang HTML
+  - log warning khi vượt ngân sách số câu lệnh / 1 dạng lặp quá N lần
+
+Env:
+  SQL_PROFILE=1            bật đo + header + warning
+  SQL_PROFILE_PANEL=1      thêm panel debug vào trang HTML
+  SQL_QUERY_BUDGET=30      số câu lệnh tối đa / request
+  SQL_REPEAT_LIMIT=5       số lần tối đa 1 dạng câu lệnh được lặp / request
+"""
+
+import os
+import re
+import time
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+
+from flask import Flask, current_app, g, has_request_context, render_template, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+# %(name)s (psycopg2), $1 (asyncpg), :name, ? (sqlite) -> ?   (bỏ qua ::cast)
+_PARAM = re.compile(r"%\(\w+\)s|\$\d+|(?<![:\w]):\w+|\?")
+_NUMBER = re.compile(r"\b\d+(?:\.\d+)?\b")
+# IN (?, ?, ?) -> IN (?): danh sách id dài ngắn khác nhau vẫn là 1 dạng
+_PARAM_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_SPACE = re.compile(r"\s+")
+
+_listening = False
+
+
+def statement_shape(sql: str) -> str:
+    """Chuẩn hóa câu lệnh: bỏ giá trị tham số / literal, gộp khoảng trắng."""
+    s = _STRING.sub("?", sql)
+    s = _PARAM.sub("?", s)
+    s = _NUMBER.sub("?", s)
+    s = _PARAM_LIST.sub("(?)", s)
+    return _SPACE.sub(" ", s).strip()
+
+
+class RequestStats:
+    def __init__(self):
+        self.count = 0
+        self.duration = 0.0  # giây
+        self.shapes: Counter = Counter()
+        self.shape_time: Dict[str, float] = {}
+
+    def add(self, sql: str, elapsed: float) -> None:
+        shape = statement_shape(sql)
+        self.count += 1
+        self.duration += elapsed
+        self.shapes[shape] += 1
+        self.shape_time[shape] = self.shape_time.get(shape, 0.0) + elapsed
+
+    def repeated(self, limit: int) -> List[Tuple[str, int]]:
+        return [(s, n) for s, n in self.shapes.most_common() if n > limit]
+
+    def top(self, n: int = 10) -> List[Dict]:
+        rows = [
+            {"shape": s, "count": c, "ms": self.shape_time[s] * 1000}
+            for s, c in self.shapes.items()
+        ]
+        rows.sort(key=lambda r: (r["count"], r["ms"]), reverse=True)
+        return rows[:n]
+
+
+def current_stats() -> Optional[RequestStats]:
+    if not has_request_context():
+        return None
+    return g.get("_sql_stats")
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if context is not None:
+        context._sql_profiler_start = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    stats = current_stats()
+    start = getattr(context, "_sql_profiler_start", None)
+    if stats is None or start is None:
+        return
+    stats.add(statement, time.perf_counter() - start)
+
+
+def _listen_engines() -> None:
+    """Nghe trên class Engine: áp dụng cho mọi engine / bind, kể cả tạo sau."""
+    global _listening
+    if _listening:
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    _listening = True
+
+
+def _server_timing(stats: RequestStats) -> str:
+    return f'db;dur={stats.duration * 1000:.1f};desc="{stats.count} queries"'
+
+
+def _warn(stats: RequestStats, budget: int, repeat_limit: int) -> None:
+    route = request.endpoint or request.path
+    if stats.count > budget:
+        current_app.logger.warning(
+            "SQL: %s %s chạy %d câu lệnh (ngân sách %d, %.1f ms)",
+            request.method,
+            route,
+            stats.count,
+            budget,
+            stats.duration * 1000,
+        )
+    for shape, n in stats.repeated(repeat_limit):
+        current_app.logger.warning(
+            "SQL: %s %s lặp %d lần (nghi N+1): %s",
+            request.method,
+            route,
+            n,
+            shape[:300],
+        )
+
+
+def _inject_panel(response, stats: RequestStats, budget: int, repeat_limit: int):
+    if response.direct_passthrough or response.mimetype != "text/html":
+        return
+    html = response.get_data(as_text=True)
+    pos = html.rfind("</body>")
+    if pos < 0:
+        return
+    panel = render_template(
+        "layout/sql_profiler.html",
+        stats=stats,
+        top=stats.top(),
+        budget=budget,
+        repeat_limit=repeat_limit,
+    )
+    response.set_data(html[:pos] + panel + html[pos:])
+
+
+def init_sql_profiler(app: Flask) -> None:
+    """Gắn profiler vào app nếu SQL_PROFILE=1 (không đổi gì khi tắt)."""
+    if os.getenv("SQL_PROFILE", "0") != "1":
+        return
+    show_panel = os.getenv("SQL_PROFILE_PANEL", "0") == "1"
+    budget = int(os.getenv("SQL_QUERY_BUDGET", "30"))
+    repeat_limit = int(os.getenv("SQL_REPEAT_LIMIT", "5"))
+    _listen_engines()
+
+    @app.before_request
+    def _sql_profiler_start():
+        g._sql_stats = RequestStats()
+
+    @app.after_request
+    def _sql_profiler_report(response):
+        stats = current_stats()
+        if stats is None or request.endpoint == "static":
+            return response
+        response.headers.add("Server-Timing", _server_timing(stats))
+        _warn(stats, budget, repeat_limit)
+        if show_panel:
+            _inject_panel(response, stats, budget, repeat_limit)
+        return response
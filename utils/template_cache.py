@@ -0,0 +1,51 @@
+# utils/template_cache.py
+"""
+Cache bytecode của template Jinja trên đĩa: worker mới khởi động nạp bytecode
+đã biên dịch thay vì parse + compile lại templates/* (form lớn như
+goods_receipt_form.html, invoice_form.html, qc_form.html tốn nhất).
+
+Jinja tự so checksum mã nguồn template -> sửa template thì bytecode cũ bị
+bỏ qua và ghi lại, không cần xóa cache bằng tay.
+
+Env:
+  JINJA_BYTECODE_CACHE=0   tắt
+  JINJA_CACHE_DIR          thư mục cache (mặc định <app>/.jinja_cache)
+
+Dựng sẵn khi build / deploy: python -m jobs.precompile_templates
+Thư mục app chỉ đọc (container): không tạo được thư mục -> chạy không có
+cache; thư mục có sẵn nhưng không ghi được -> vẫn nạp bytecode dựng sẵn.
+"""
+
+import os
+from typing import Optional
+
+from flask import Flask
+from jinja2 import FileSystemBytecodeCache
+
+
+class _BytecodeCache(FileSystemBytecodeCache):
+    def dump_bytecode(self, bucket) -> None:
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:  # thư mục chỉ đọc: bỏ qua, lần sau compile lại
+            pass
+
+
+def cache_dir(app: Flask) -> str:
+    return os.getenv("JINJA_CACHE_DIR") or os.path.join(app.root_path, ".jinja_cache")
+
+
+def init_template_cache(app: Flask) -> Optional[str]:
+    """Gắn FileSystemBytecodeCache vào app.jinja_env; trả về thư mục (None nếu tắt)."""
+    if os.getenv("JINJA_BYTECODE_CACHE", "1") != "1":
+        return None
+    path = cache_dir(app)
+    try:
+        os.makedirs(path, exist_ok=True)
+    except OSError as ex:
+        app.logger.warning(
+            "Không tạo được JINJA_CACHE_DIR %s (%s): tắt bytecode cache", path, ex
+        )
+        return None
+    app.jinja_env.bytecode_cache = _BytecodeCache(path)
+    return path
@@ -0,0 +1,82 @@
+# utils/warmup.py
+"""
+Làm nóng worker trước khi nhận request (gọi từ wsgi.py / gunicorn.conf.py):
+
+  warm_up_code(app)  : biên dịch toàn bộ template Jinja vào cache của
+                       jinja_env (nạp từ bytecode cache nếu đã precompile, xem
+                       utils.template_cache) + configure_mappers() của
+                       SQLAlchemy. Chạy 1 lần ở master khi preload -> worker
+                       fork ra dùng chung.
+  warm_up_db(app)    : mở sẵn kết nối trong pool, chạy các truy vấn danh mục
+                       (đơn vị, NCC, vật tư, phòng ban) để điền cache câu lệnh
+                       đã biên dịch của SQLAlchemy và buffer của Postgres.
+                       Chạy trong từng worker (sau fork, kết nối không dùng chung).
+
+Env: WARMUP=0 tắt; WARMUP_DB_CONNECTIONS = số kết nối mở sẵn / engine.
+"""
+
+import os
+import time
+from typing import Dict
+
+from flask import Flask
+from jinja2 import TemplateError
+from sqlalchemy import text
+from sqlalchemy.orm import configure_mappers
+from sqlalchemy.pool import QueuePool
+
+
+def enabled() -> bool:
+    return os.getenv("WARMUP", "1") == "1"
+
+
+def warm_up_code(app: Flask) -> Dict:
+    t0 = time.perf_counter()
+    env = app.jinja_env
+    loaded, failed = 0, []
+    for name in env.list_templates(extensions=["html"]):
+        try:
+            env.get_template(name)
+            loaded += 1
+        except TemplateError as ex:
+            failed.append(f"{name}: {ex}")
+    configure_mappers()
+    out = {
+        "templates": loaded,
+        "template_errors": failed,
+        "ms": round((time.perf_counter() - t0) * 1000, 1),
+    }
+    app.logger.info(
+        "warm-up code: %d template (%d lỗi), %.1f ms", loaded, len(failed), out["ms"]
+    )
+    for err in failed:
+        app.logger.warning("warm-up template lỗi: %s", err)
+    return out
+
+
+def warm_up_db(app: Flask, connections: int = 0) -> Dict:
+    from configs import db
+    from dao import department, material, supplier, unit
+
+    t0 = time.perf_counter()
+    connections = connections or int(os.getenv("WARMUP_DB_CONNECTIONS", "1"))
+    with app.app_context():
+        for engine in db.engines.values():
+            n = max(connections, 1)
+            if isinstance(engine.pool, QueuePool):
+                # không vượt pool_size: kết nối overflow bị đóng ngay khi trả
+                n = min(n, engine.pool.size())
+            conns = [engine.connect() for _ in range(n)]
+            for conn in conns:
+                conn.execute(text("SELECT 1"))
+                conn.close()  # trả về pool, giữ kết nối mở
+        rows = {
+            "units": len(unit.list_units()),
+            "suppliers": len(supplier.list_suppliers()),
+            "materials": len(material.list_materials()),
+            "departments": len(department.list_departments()),
+        }
+        db.session.remove()
+    out = {**rows, "ms": round((time.perf_counter() - t0) * 1000, 1)}
+    app.logger.info("warm-up db: %s", out)
+    return out
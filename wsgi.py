@@ -0,0 +1,11 @@
+# wsgi.py
+# Entry point production (dev vẫn chạy: python app.py):
+#   gunicorn -c gunicorn.conf.py wsgi:app
+# Preload: module này được import 1 lần ở master -> template / mapper đã làm
+# nóng được các worker fork ra dùng chung; phần DB làm nóng trong từng worker
+# (post_worker_init của gunicorn.conf.py).
+from app import app
+from utils import warmup
+
+if warmup.enabled():
+    warmup.warm_up_code(app)